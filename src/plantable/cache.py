@@ -0,0 +1,224 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List
+
+import orjson
+
+from .model import BaseToken, Metadata, UserInfo
+
+logger = logging.getLogger()
+
+CACHE_PREFIX = "plantable"
+CACHE_SIZE = 1024
+CACHE_TTL = 300
+
+
+# Hash Key - api token 등 credential 원문은 key로 보관하지 않음
+def hash_key(*parts: str) -> str:
+    return hashlib.sha256("\x00".join(parts).encode()).hexdigest()
+
+
+################################################################
+# LRUCache
+################################################################
+class LRUCache:
+    """
+    in-process LRU cache (key 별 ttl).
+     - python object를 그대로 보관 - 같은 process의 client들은 같은 object를 공유
+    """
+
+    def __init__(self, max_size: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self.store = OrderedDict()  # {key: (value, expires_at)}
+
+    def get(self, key: str) -> Any:
+        if key not in self.store:
+            return None
+        value, expires_at = self.store[key]
+        if expires_at < time.monotonic():
+            del self.store[key]
+            return None
+        self.store.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        self.store[key] = (value, time.monotonic() + (ttl or self.ttl))
+        self.store.move_to_end(key)
+        while len(self.store) > self.max_size:
+            self.store.popitem(last=False)
+
+    def delete(self, key: str):
+        self.store.pop(key, None)
+
+    def clear(self):
+        self.store.clear()
+
+
+################################################################
+# RedisCache
+################################################################
+class RedisCache:
+    """
+    worker 간 공유하는 redis cache - value는 orjson으로 serialize.
+     - redis 오류는 cache miss로 처리 (warning만 남김)
+    """
+
+    def __init__(self, url: str, prefix: str = CACHE_PREFIX, ttl: float = CACHE_TTL):
+        self.url = url
+        self.prefix = prefix
+        self.ttl = ttl
+
+        self._redis = None
+
+    @property
+    def redis(self):
+        # [NOTE] event loop 안에서 처음 사용할 때 connection pool 생성
+        if self._redis is None:
+            import redis.asyncio as aioredis
+
+            self._redis = aioredis.from_url(self.url)
+        return self._redis
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def get(self, key: str) -> Any:
+        try:
+            value = await self.redis.get(self._key(key))
+        except Exception as ex:
+            _msg = f"redis get '{key}' failed: {ex}"
+            logger.warning(_msg)
+            return None
+        if value is None:
+            return None
+        return orjson.loads(value)
+
+    async def set(self, key: str, value: Any, ttl: float = None):
+        try:
+            await self.redis.set(
+                self._key(key), orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS), px=int((ttl or self.ttl) * 1000)
+            )
+        except Exception as ex:
+            _msg = f"redis set '{key}' failed: {ex}"
+            logger.warning(_msg)
+
+    async def delete(self, key: str):
+        try:
+            await self.redis.delete(self._key(key))
+        except Exception as ex:
+            _msg = f"redis delete '{key}' failed: {ex}"
+            logger.warning(_msg)
+
+    async def close(self):
+        if self._redis is not None:
+            # [NOTE] redis-py 5 미만은 aclose가 없음
+            close = getattr(self._redis, "aclose", None) or self._redis.close
+            await close()
+            self._redis = None
+
+
+################################################################
+# TieredCache
+################################################################
+class TieredCache:
+    """
+    LRU (process) + Redis (optional, worker 간 공유) 2단계 cache.
+     - get은 local -> remote 순서로 찾고, remote에서 찾으면 local에 채움
+     - set은 local, remote 모두에 씀
+     - base token은 만료까지 남은 시간 동안, metadata는 version이 낮아지지 않도록 보관
+    """
+
+    def __init__(self, local: LRUCache = None, remote: RedisCache = None):
+        self.local = local or LRUCache()
+        self.remote = remote
+
+    async def get(self, key: str, loads=None) -> Any:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        if self.remote is None:
+            return None
+        value = await self.remote.get(key)
+        if value is None:
+            return None
+        if loads:
+            value = loads(value)
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float = None, dumps=None):
+        self.local.set(key, value, ttl=ttl)
+        if self.remote is not None:
+            await self.remote.set(key, dumps(value) if dumps else value, ttl=ttl)
+
+    async def delete(self, key: str):
+        self.local.delete(key)
+        if self.remote is not None:
+            await self.remote.delete(key)
+
+    async def close(self):
+        self.local.clear()
+        if self.remote is not None:
+            await self.remote.close()
+
+    # Base Token
+    async def get_base_token(self, api_token: str) -> BaseToken:
+        return await self.get(f"base-token:{hash_key(api_token)}", loads=lambda x: BaseToken(**x))
+
+    async def set_base_token(self, api_token: str, base_token: BaseToken, refresh_sec: int = 86400):
+        ttl = refresh_sec - (datetime.now() - base_token.generated_at).total_seconds()
+        if ttl <= 0:
+            return
+        await self.set(f"base-token:{hash_key(api_token)}", base_token, ttl=ttl, dumps=lambda x: x.dict(by_alias=True))
+
+    async def delete_base_token(self, api_token: str):
+        await self.delete(f"base-token:{hash_key(api_token)}")
+
+    # Metadata
+    async def get_metadata(self, dtable_uuid: str) -> Metadata:
+        return await self.get(f"metadata:{dtable_uuid}", loads=lambda x: Metadata(**x))
+
+    async def set_metadata(self, dtable_uuid: str, metadata: Metadata, ttl: float = None):
+        # [NOTE] 늦게 끝난 요청이 더 오래된 version으로 덮어쓰지 않도록 함
+        cached = await self.get_metadata(dtable_uuid)
+        if cached is not None and cached.version > metadata.version:
+            return
+        await self.set(f"metadata:{dtable_uuid}", metadata, ttl=ttl, dumps=lambda x: x.dict(by_alias=True))
+
+    async def delete_metadata(self, dtable_uuid: str):
+        await self.delete(f"metadata:{dtable_uuid}")
+
+    # Collaborators
+    async def get_collaborators(self, dtable_uuid: str) -> List[UserInfo]:
+        return await self.get(f"collaborators:{dtable_uuid}", loads=lambda x: [UserInfo(**u) for u in x])
+
+    async def set_collaborators(self, dtable_uuid: str, collaborators: List[UserInfo], ttl: float = None):
+        await self.set(
+            f"collaborators:{dtable_uuid}",
+            collaborators,
+            ttl=ttl,
+            dumps=lambda x: [u.dict(by_alias=True) for u in x],
+        )
+
+    # Row IDs - {key column value: row id}
+    async def get_row_ids(self, dtable_uuid: str, table_name: str, key_column: str) -> Dict[Any, str]:
+        return await self.get(f"row-ids:{dtable_uuid}:{hash_key(table_name, key_column)}", loads=dict)
+
+    async def set_row_ids(
+        self, dtable_uuid: str, table_name: str, key_column: str, row_ids: Dict[Any, str], ttl: float = None
+    ):
+        # [NOTE] json object의 key는 str만 가능 - number key가 str로 바뀌지 않도록 (key, row id) list로 보관
+        await self.set(
+            f"row-ids:{dtable_uuid}:{hash_key(table_name, key_column)}",
+            row_ids,
+            ttl=ttl,
+            dumps=lambda x: list(x.items()),
+        )
+
+    async def delete_row_ids(self, dtable_uuid: str, table_name: str, key_column: str):
+        await self.delete(f"row-ids:{dtable_uuid}:{hash_key(table_name, key_column)}")
@@ -1,4 +1,4 @@
 from .account import AccountClient
 from .admin import AdminClient
-from .base import BaseClient
+from .base import BaseClient, BufferedBaseClient
 from .user import UserClient
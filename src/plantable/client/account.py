@@ -38,6 +38,7 @@ class AccountClient(HttpClient):
         seatable_url: str = SEATABLE_URL,
         seatable_username: str = SEATABLE_USERNAME,
         seatable_password: str = SEATABLE_PASSWORD,
+        auto_login: bool = True,
     ):
         super().__init__(seatable_url=seatable_url)
         self.username = seatable_username
@@ -47,7 +48,8 @@ class AccountClient(HttpClient):
         self.is_admin = False
 
         # do login
-        self.login()
+        if auto_login:
+            self.login()
 
     def login(self):
         auth_url = self.seatable_url + "/api2/auth-token/"
@@ -56,6 +58,16 @@ class AccountClient(HttpClient):
         results = response.json()
         self.account_token = results["token"]
 
+    # login without blocking event loop
+    async def async_login(self):
+        METHOD = "POST"
+        URL = "/api2/auth-token/"
+        JSON = {"username": self.username, "password": self.password}
+
+        async with self.session_maker() as session:
+            results = await self.request(session=session, method=METHOD, url=URL, json=JSON)
+        self.account_token = results["token"]
+
     ################################################################
     # AUTHENTICATION - API TOKEN
     ################################################################
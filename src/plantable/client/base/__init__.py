@@ -1 +1,2 @@
 from .base import BaseClient
+from .buffer import BufferedBaseClient, RowWriteBuffer
@@ -1,27 +1,38 @@
 import asyncio
 import logging
 from datetime import datetime
-from typing import Any, Callable, List, Tuple, Union
+from typing import Any, Callable, Dict, List, Tuple, Union
 
 import pyarrow as pa
 from pydantic import BaseModel
 from pypika import MySQLQuery as PikaQuery
 from pypika import Order
 from pypika import Table as PikaTable
+from pypika import functions as fn
+from pypika.dialects import QueryBuilder
+from pypika.terms import Criterion, EmptyCriterion, LiteralValue, Star
 from tabulate import tabulate
 
-from ...const import DT_FMT, TZ
+from ...const import DELETE_OP_TYPES, DT_FMT, TZ
 from ...model import BaseActivity, BaseToken, Column, Metadata, SelectOption, Table, UserInfo, View
 from ...model.column import COLUMN_DATA
 from ...serde import Deserializer, FromPython, ToPython
-from ...utils import divide_chunks, parse_str_datetime, extract_table_name, extract_columns_from_select
-from ..conf import SEATABLE_URL
+from ...utils import (
+    divide_chunks,
+    extract_deleted_row_ids,
+    parse_query,
+    parse_str_datetime,
+)
+from ..conf import REPLICA_DIR, SEATABLE_URL
 from ..core import TABULATE_CONF
 from .builtin import BuiltInBaseClient
+from .replica import TableReplica
+from .where import WhereCompiler
 
 logger = logging.getLogger()
 
 FIRST_COLUMN_TYPES = ["text", "number", "date", "single-select", "formular", "autonumber"]
+AGGREGATE_FUNCTIONS = {"count": fn.Count, "sum": fn.Sum, "avg": fn.Avg, "min": fn.Min, "max": fn.Max}
 
 
 class LinkValueNotExists(Exception):
@@ -36,6 +47,76 @@ class KeyNotUnique(Exception):
     pass
 
 
+################################################################
+# LinkContext
+################################################################
+class LinkContext:
+    """
+    link column 하나에 대한 resolution 결과를 batch 동안 memoize.
+     - host/other table, display column, display value -> row_id map을 한 번만 조회
+     - 없는 display value는 한 번의 append_rows로 추가하고 반환된 row_ids로 map 갱신
+    """
+
+    def __init__(
+        self,
+        client: "BaseClient",
+        table: Table,
+        other_table: Table,
+        column: Column,
+        display_column: Column,
+        row_id_map: dict,
+        raise_key_not_unique_error: bool = True,
+    ):
+        self.client = client
+        self.table = table
+        self.other_table = other_table
+        self.column = column
+        self.display_column = display_column
+        self.row_id_map = row_id_map
+        self.raise_key_not_unique_error = raise_key_not_unique_error
+
+    @property
+    def link_id(self):
+        return self.column.data["link_id"]
+
+    # resolve display values to other rows ids
+    async def resolve(self, display_values: list, add_link_if_not_exists: bool = False):
+        display_values = display_values if isinstance(display_values, list) else [display_values]
+
+        missing = [v for v in dict.fromkeys(display_values) if v not in self.row_id_map]
+        # [NOTE] cache된 map에 없으면 다른 곳에서 추가되었을 수 있으므로 한 번 다시 읽음
+        if missing:
+            self.row_id_map = await self.client.get_row_id_map(
+                table_name=self.other_table.name,
+                key_column=self.display_column.name,
+                raise_key_not_unique_error=self.raise_key_not_unique_error,
+            )
+            missing = [v for v in missing if v not in self.row_id_map]
+        if missing:
+            if not add_link_if_not_exists:
+                _msg = f"display value '{missing[0]}' not exists. please add this value into table '{self.other_table.name}' first."
+                raise LinkValueNotExists(_msg)
+            # add links at once
+            results = await self.client.append_rows(
+                table_name=self.other_table.name,
+                rows=[{self.display_column.name: v} for v in missing],
+                refresh=False,
+            )
+            if len(results["row_ids"]) != len(missing):
+                _msg = f"add display values into table '{self.other_table.name}' failed!"
+                raise LinkValueNotExists(_msg)
+            self.row_id_map.update(zip(missing, results["row_ids"]))
+            if self.client.cache:
+                await self.client.cache.set_row_ids(
+                    dtable_uuid=self.client.dtable_uuid,
+                    table_name=self.other_table.name,
+                    key_column=self.display_column.name,
+                    row_ids=self.row_id_map,
+                )
+
+        return [self.row_id_map[v] for v in display_values]
+
+
 ################################################################
 # BaseClient
 ################################################################
@@ -158,86 +239,167 @@ class BaseClient(BuiltInBaseClient):
     # (OVERRIDE) Append Rows
     # [NOTE] Rate Limit 조정하는 로직 필요, 지금은 금방 Rate Limit 걸릴 것 같음.
     async def append_rows(
-        self, table_name: str, rows: List[dict], add_link_if_not_exists: bool = False, refresh: bool = True
+        self, table_name: str, rows: List[dict], add_link_if_not_exists: bool = False, refresh: bool = False
     ):
+        if not refresh:
+            _ = await self.get_table_for_write(table_name=table_name, rows=rows)
         link_columns = await self.list_link_columns(table_name=table_name, refresh=refresh)
-        link_column_names = [x.name for x in link_columns]
-
-        list_links = list()
-        for row in rows:
-            links = dict()
-            for lc in link_column_names:
-                if lc in row:
-                    value = row.pop(lc)
-                    links.update({lc: value})
-            list_links.append(links)
+        list_links = self._pop_links(rows=rows, link_column_names=[x.name for x in link_columns])
 
         # link 없으면 그냥 append_rows 수행 (성능 개선 및 Rate Limit 절약)
         if not any(list_links):
             return await super().append_rows(table_name=table_name, rows=rows)
 
-        # 순서보장 위해서 gather 사용하지 않음
-        add_rows_results = list()
-        for row in rows:
-            add_row_result = await self.add_row(table_name=table_name, row=row)
-            add_rows_results.append(add_row_result)
-
-        # gather 사용하여도 순서보장
-        # [NOTE] create_row_links_batch로 수정하면 Rate Limit 조금 더 아낄 수 있을 것
-        coros_create_row_links = list()
-        for result, links in zip(add_rows_results, list_links):
-            if not links:
-                continue
-            for column_name, display_values in links.items():
-                kwargs = await self._prep_create_row_links(
-                    table_name=table_name,
-                    column_name=column_name,
-                    display_values=display_values,
-                    add_link_if_not_exists=add_link_if_not_exists,
-                )
-                coros_create_row_links.append(self.create_row_links(row_id=result["_id"], **kwargs))
-        create_links_results = await asyncio.gather(*coros_create_row_links)
-        for result in create_links_results:
-            if isinstance(result, Exception):
-                raise result
+        # batch-append-rows는 입력 순서대로 row_ids 반환하므로 순서보장 위해 add_row 사용할 필요 없음
+        append_rows_results = await super().append_rows(table_name=table_name, rows=rows)
+        row_ids = append_rows_results["row_ids"]
+        if len(row_ids) != len(rows):
+            _msg = f"append_rows returned {len(row_ids)} row ids for {len(rows)} rows - cannot create row links!"
+            raise KeyError(_msg)
+
+        # create row links
+        _ = await self._create_row_links_batch(
+            table_name=table_name,
+            row_ids=row_ids,
+            list_links=list_links,
+            add_link_if_not_exists=add_link_if_not_exists,
+        )
 
-        return {"inserted_rows": len(add_rows_results)}
+        return {"inserted_rows": len(row_ids), "row_ids": row_ids}
 
     # (OVERRIDE) Update Rows
     async def update_rows(
-        self, table_name: str, updates: List[dict], add_link_if_not_exists: bool = False, refresh: bool = True
+        self, table_name: str, updates: List[dict], add_link_if_not_exists: bool = False, refresh: bool = False
     ):
+        if not refresh:
+            _ = await self.get_table_for_write(table_name=table_name, rows=[up["row"] for up in updates])
         link_columns = await self.list_link_columns(table_name=table_name, refresh=refresh)
-        link_column_names = [x.name for x in link_columns]
-
-        # 순서에 따라 동작! asyncio.gather 금지!
-        coros_create_row_links = list()
-        for up in updates:
-            for column_name in link_column_names:
-                if column_name in up["row"]:
-                    display_values = up["row"].pop(column_name)
-                    kwargs = await self._prep_create_row_links(
-                        table_name=table_name,
-                        column_name=column_name,
-                        display_values=display_values,
-                        add_link_if_not_exists=add_link_if_not_exists,
-                    )
-                    coros_create_row_links.append(self.create_row_links(row_id=up["row_id"], **kwargs))
+        list_links = self._pop_links(
+            rows=[up["row"] for up in updates], link_column_names=[x.name for x in link_columns]
+        )
 
         # update rows
         update_rows_results = await super().update_rows(table_name=table_name, updates=updates)
 
         # create row links
-        create_links_results = await asyncio.gather(*coros_create_row_links)
-        for result in create_links_results:
-            if isinstance(result, Exception):
-                raise result
-            if not result["success"]:
-                _msg = "create_row_links failed!"
-                logger.error(_msg)
+        if any(list_links):
+            _ = await self._create_row_links_batch(
+                table_name=table_name,
+                row_ids=[up["row_id"] for up in updates],
+                list_links=list_links,
+                add_link_if_not_exists=add_link_if_not_exists,
+            )
 
         return update_rows_results
 
+    # Pop Links from Rows
+    @staticmethod
+    def _pop_links(rows: List[dict], link_column_names: List[str]):
+        list_links = list()
+        for row in rows:
+            links = dict()
+            for lc in link_column_names:
+                if lc in row:
+                    value = row.pop(lc)
+                    links.update({lc: value})
+            list_links.append(links)
+        return list_links
+
+    # Create Row Links Batch
+    # [NOTE] link column 별로 batch-update-links 호출 - row 당 create_row_links 호출하지 않음
+    async def _create_row_links_batch(
+        self,
+        table_name: str,
+        row_ids: List[str],
+        list_links: List[dict],
+        add_link_if_not_exists: bool = False,
+    ):
+        # [NOTE] batch-update-links도 1000 rows까지만 처리
+        UPDATE_LIMIT = 1000
+
+        # group links by link column - {column_name: {row_id: display_values}}
+        links_by_column = dict()
+        for row_id, links in zip(row_ids, list_links):
+            for column_name, display_values in links.items():
+                if display_values is None:
+                    display_values = []
+                if not isinstance(display_values, list):
+                    display_values = [display_values]
+                if column_name not in links_by_column:
+                    links_by_column[column_name] = dict()
+                links_by_column[column_name].update({row_id: display_values})
+
+        # link context per column - write 전에 읽은 (cached) metadata 사용
+        # [NOTE] 같은 other table / display column을 가리키는 context는 row_id_map을 한 번만 읽고 공유
+        row_id_maps = dict()
+        contexts = await asyncio.gather(
+            *[
+                self.get_link_context(
+                    table_name=table_name, column_name=column_name, refresh=False, row_id_maps=row_id_maps
+                )
+                for column_name in links_by_column
+            ]
+        )
+
+        # 같은 other table에 중복 추가하지 않도록 resolve는 순서대로
+        coros = list()
+        for context, (column_name, links) in zip(contexts, links_by_column.items()):
+            display_values = [v for values in links.values() for v in values]
+            _ = await context.resolve(display_values=display_values, add_link_if_not_exists=add_link_if_not_exists)
+            for chunk in divide_chunks(list(links.items()), UPDATE_LIMIT):
+                coros.append(
+                    self.create_row_links_batch(
+                        table_id=context.table.id,
+                        other_table_id=context.other_table.id,
+                        link_id=context.link_id,
+                        row_id_list=[row_id for row_id, _ in chunk],
+                        other_rows_ids_map={
+                            row_id: [context.row_id_map[v] for v in values] for row_id, values in chunk
+                        },
+                    )
+                )
+        list_results = await asyncio.gather(*coros)
+
+        for results in list_results:
+            if not results.get("success", True):
+                _msg = f"create_row_links_batch failed - table '{table_name}'!"
+                logger.error(_msg)
+
+        return list_results
+
+    # Delete Where
+    # [NOTE] 조건에 맞는 _id를 page 단위로 읽으면서 이전 page는 동시에 삭제 (pipelining)
+    #  - 조건이 없으면 (None, {}, 빈 not_in 등) 전체 삭제가 되므로 allow_all=True일 때만 허용
+    async def delete_where(
+        self,
+        table_name: str,
+        where: Union[str, dict, Criterion],
+        page_size: int = 10000,
+        max_concurrency: int = 4,
+        allow_all: bool = False,
+    ):
+        compiled = await self.compile_where(table_name=table_name, where=where)
+        if compiled is None or isinstance(compiled, EmptyCriterion) or (isinstance(where, str) and not where.strip()):
+            if not allow_all:
+                _msg = f"where for table '{table_name}' has no condition - use allow_all=True to delete all rows."
+                raise ValueError(_msg)
+            where = None
+
+        deleted_rows = 0
+        delete_task = None
+        async for row_ids in self.iter_row_ids(table_name=table_name, where=where, page_size=page_size):
+            if delete_task:
+                results = await delete_task
+                deleted_rows += results["deleted_rows"]
+            delete_task = asyncio.ensure_future(
+                self.delete_rows(table_name=table_name, row_ids=row_ids, max_concurrency=max_concurrency)
+            )
+        if delete_task:
+            results = await delete_task
+            deleted_rows += results["deleted_rows"]
+
+        return {"deleted_rows": deleted_rows}
+
     # Validate Input Columns
     async def _validate_input_columns(self, table_name: str, rows: List[dict], refresh: bool = True):
         columns = await self.list_columns(table_name=table_name, refresh=refresh)
@@ -264,18 +426,26 @@ class BaseClient(BuiltInBaseClient):
         # correct input
         rows = rows if isinstance(rows, list) else [rows]
 
-        # validate
-        await self._validate_input_columns(table_name=table_name, rows=rows, refresh=True)
+        # validate - cache에 없는 column이 있을 때만 metadata 다시 읽음
+        _ = await self.get_table_for_write(table_name=table_name, rows=rows)
+        await self._validate_input_columns(table_name=table_name, rows=rows, refresh=False)
 
         # default key column is first column
         if not key_column:
             first_column = await self.get_first_column(table_name=table_name, refresh=False)
             key_column = first_column.name
 
-        # get row id map
+        # get row id map - cache에 없는 key가 있으면 다른 곳에서 추가되었을 수 있으므로 한 번 다시 읽음
         id_map = await self.get_row_id_map(
-            table_name=table_name, key_column=key_column, raise_key_not_unique_error=raise_key_not_unique_error
+            table_name=table_name,
+            key_column=key_column,
+            raise_key_not_unique_error=raise_key_not_unique_error,
+            refresh=False,
         )
+        if any(row.get(key_column) is not None and row.get(key_column) not in id_map for row in rows):
+            id_map = await self.get_row_id_map(
+                table_name=table_name, key_column=key_column, raise_key_not_unique_error=raise_key_not_unique_error
+            )
 
         # split updates & appends
         updates, appends = list(), list()
@@ -304,15 +474,26 @@ class BaseClient(BuiltInBaseClient):
     # QUERY
     ################################################################
     # Get Row ID Map
+    # [NOTE] refresh=False이면 cache 사용 - shared cache가 있으면 (ttl, realtime/webhook invalidation) cache가 우선
     async def get_row_id_map(
         self, table_name: str, key_column: str = None, raise_key_not_unique_error: bool = True, refresh: bool = True
     ):
-        if not refresh and table_name in self.row_id_map and key_column in self.row_id_map[table_name]:
-            return self.row_id_map[table_name][key_column]
-
         if key_column is None:
-            first_column = await self.get_first_column(table_name=table_name)
+            first_column = await self.get_first_column(table_name=table_name, refresh=refresh)
             key_column = first_column.name
+
+        if not refresh:
+            # shared cache
+            if self.cache:
+                row_ids = await self.cache.get_row_ids(
+                    dtable_uuid=self.dtable_uuid, table_name=table_name, key_column=key_column
+                )
+                if row_ids is not None:
+                    self.row_id_map.setdefault(table_name, dict())[key_column] = row_ids
+                    return row_ids
+            elif table_name in self.row_id_map and key_column in self.row_id_map[table_name]:
+                return self.row_id_map[table_name][key_column]
+
         rows = await self.read_table(table_name=table_name, select=["_id", key_column])
 
         # check key column is unique
@@ -333,37 +514,148 @@ class BaseClient(BuiltInBaseClient):
         if table_name not in self.row_id_map:
             self.row_id_map[table_name] = dict()
         self.row_id_map[table_name].update({key_column: {r[key_column]: r["_id"] for r in rows}})
+        if self.cache:
+            await self.cache.set_row_ids(
+                dtable_uuid=self.dtable_uuid,
+                table_name=table_name,
+                key_column=key_column,
+                row_ids=self.row_id_map[table_name][key_column],
+            )
 
         return self.row_id_map[table_name][key_column]
 
-    # Query Table
-    async def query_table(self, sql: str, Deserializer: Deserializer = ToPython):
-        # read rows with sql
-        rows = await self.list_rows_with_sql(sql=sql)
+    # Compile Where - str, dict (WhereCompiler 참고), pypika Criterion
+    async def compile_where(self, table_name: str, where: Union[str, dict, Criterion]) -> Criterion:
+        if where is None or isinstance(where, Criterion):
+            return where
+        if isinstance(where, str):
+            return LiteralValue(f"({where})")
+        table = await self.get_table(table_name=table_name, refresh=False)
+        return WhereCompiler(table=table)(where)
+
+    # Iterate Row IDs
+    # [NOTE] _id 기준 keyset pagination - 읽는 도중 row가 삭제되어도 offset이 밀리지 않음
+    async def iter_row_ids(self, table_name: str, where: Union[str, dict, Criterion] = None, page_size: int = 10000):
+        MAX_LIMIT = 10000
+
+        table = PikaTable(table_name)
+        limit = min(page_size, MAX_LIMIT)
+        where = await self.compile_where(table_name=table_name, where=where)
 
-        # extract table_name
-        table_name = extract_table_name(sql=sql)
-        select = extract_columns_from_select(sql=sql)
+        last_row_id = None
+        while True:
+            q = PikaQuery.from_(table).select("_id")
+            if last_row_id:
+                q = q.where(table["_id"] > last_row_id)
+            if where is not None:
+                q = q.where(where)
+            q = q.orderby("_id", order=Order.asc).limit(limit)
+
+            rows = await self.list_rows_with_sql(sql=q)
+            if not rows:
+                break
+            yield [r["_id"] for r in rows]
+            if len(rows) < limit:
+                break
+            last_row_id = rows[-1]["_id"]
+
+    # Iterate Query
+    # [NOTE] list_rows_with_sql은 LIMIT이 없으면 100 row, 최대 10000 row - LIMIT이 없거나 10000보다 크면 나누어 실행
+    #  - ORDER BY, GROUP BY 등이 없고 _id를 select하면 _id keyset pagination (순차)
+    #  - 그 외에는 LIMIT/OFFSET page를 concurrency 개씩 동시에 요청하고 순서대로 yield (ORDER BY가 없으면 순서 보장 안 됨)
+    async def iter_query(
+        self, sql: str, page_size: int = 10000, concurrency: int = 4, deserializer: Deserializer = None
+    ):
+        MAX_LIMIT = 10000
+
+        query = parse_query(sql.get_sql() if isinstance(sql, QueryBuilder) else sql)
+        page_size = min(page_size, MAX_LIMIT)
+        select = None if query.wildcard else query.columns
+
+        def _deserialize(rows):
+            if not deserializer:
+                return rows
+            try:
+                return deserializer(*rows, select=select)
+            except Exception as ex:
+                _msg = f"deserializer failed - group '{self.group_name}', base '{self.base_name}', table '{query.table_name}'"
+                logger.error(_msg)
+                raise ex
+
+        # 한 번에 가능
+        if query.limit is not None and query.limit <= MAX_LIMIT:
+            rows = await self.list_rows_with_sql(sql=sql)
+            if rows:
+                yield _deserialize(rows)
+            return
+
+        remaining = query.limit
+
+        # keyset pagination
+        keyset = not any([query.tail, query.distinct, query.offset])
+        if keyset and (query.wildcard or "_id" in query.columns):
+            last_row_id = None
+            while remaining is None or remaining > 0:
+                limit = page_size if remaining is None else min(page_size, remaining)
+                rows = await self.list_rows_with_sql(sql=query.render_keyset(limit=limit, last_row_id=last_row_id))
+                if not rows:
+                    break
+                yield _deserialize(rows)
+                if remaining is not None:
+                    remaining -= len(rows)
+                if len(rows) < limit:
+                    break
+                last_row_id = rows[-1]["_id"]
+            return
+
+        # offset pagination
+        # [NOTE] 결과가 작은 query가 많으므로 첫 page는 혼자 요청
+        offset, num_pages = query.offset or 0, 1
+        while remaining is None or remaining > 0:
+            pages = list()
+            for _ in range(num_pages):
+                limit = page_size if remaining is None else min(page_size, remaining)
+                if limit <= 0:
+                    break
+                pages.append((offset, limit))
+                offset += limit
+                if remaining is not None:
+                    remaining -= limit
+            results = await asyncio.gather(
+                *[self.list_rows_with_sql(sql=query.render(limit=limit, offset=offset)) for offset, limit in pages]
+            )
+            for rows, (_, limit) in zip(results, pages):
+                if rows:
+                    yield _deserialize(rows)
+                if len(rows) < limit:
+                    return
+            num_pages = concurrency
+
+    # Query Table
+    async def query_table(
+        self, sql: str, Deserializer: Deserializer = ToPython, page_size: int = 10000, concurrency: int = 4
+    ):
+        query = parse_query(sql.get_sql() if isinstance(sql, QueryBuilder) else sql)
 
         # deserializer
+        deserializer = None
         if Deserializer:
             metadata = await self.get_metadata()
             collaborators = await self.list_collaborators()
             deserializer = Deserializer(
                 metadata=metadata,
-                table_name=table_name,
+                table_name=query.table_name,
                 base_name=self.base_name,
                 group_name=self.group_name,
                 collaborators=collaborators,
             )
-            try:
-                rows = deserializer(*rows, select=select)
-            except Exception as ex:
-                _msg = (
-                    f"deserializer failed - group '{self.group_name}', base '{self.base_name}', table '{table_name}'"
-                )
-                logger.error(_msg)
-                raise ex
+
+        # read rows with sql
+        rows = list()
+        async for _rows in self.iter_query(
+            sql=sql, page_size=page_size, concurrency=concurrency, deserializer=deserializer
+        ):
+            rows += _rows
 
         return rows
 
@@ -371,6 +663,7 @@ class BaseClient(BuiltInBaseClient):
         self,
         table_name: str,
         select: List[str] = None,
+        where: Union[str, dict, Criterion] = None,
         modified_before: str = None,
         modified_after: str = None,
         order_by: str = None,
@@ -393,9 +686,12 @@ class BaseClient(BuiltInBaseClient):
         # generate query
         q = PikaQuery.from_(table).select(*select)
 
+        if where is not None:
+            q = q.where(await self.compile_where(table_name=table_name, where=where))
+
         if modified_before or modified_after:
             last_modified = "_mtime"
-            tbl = await self.get_table(table_name=table_name)
+            tbl = await self.get_table(table_name=table_name, refresh=False)
             for c in tbl.columns:
                 if c.key == "_mtime":
                     last_modified = c.name
@@ -433,6 +729,7 @@ class BaseClient(BuiltInBaseClient):
         self,
         table_name: str,
         select: List[str] = None,
+        where: Union[str, dict, Criterion] = None,
         modified_before: str = None,
         modified_after: str = None,
         order_by: str = None,
@@ -445,6 +742,7 @@ class BaseClient(BuiltInBaseClient):
         rows = await self._read_table(
             table_name=table_name,
             select=select,
+            where=where,
             modified_before=modified_before,
             modified_after=modified_after,
             order_by=order_by,
@@ -485,6 +783,7 @@ class BaseClient(BuiltInBaseClient):
         self,
         table_name: str,
         select: List[str] = None,
+        where: Union[str, dict, Criterion] = None,
         modified_before: str = None,
         modified_after: str = None,
         order_by: str = None,
@@ -497,6 +796,7 @@ class BaseClient(BuiltInBaseClient):
         rows = await self._read_table(
             table_name=table_name,
             select=select,
+            where=where,
             modified_before=modified_before,
             modified_after=modified_after,
             order_by=order_by,
@@ -532,6 +832,7 @@ class BaseClient(BuiltInBaseClient):
         self,
         table_name: str,
         select: List[str] = None,
+        where: Union[str, dict, Criterion] = None,
         modified_before: str = None,
         modified_after: str = None,
         offset: int = 0,
@@ -540,6 +841,7 @@ class BaseClient(BuiltInBaseClient):
         rows = await self.read_table(
             table_name=table_name,
             select=select,
+            where=where,
             modified_before=modified_before,
             modified_after=modified_after,
             offset=offset,
@@ -552,6 +854,121 @@ class BaseClient(BuiltInBaseClient):
         tbl = pa.Table.from_pylist(rows).to_pandas()
         return tbl.set_index("_id", drop=True).rename_axis("row_id")
 
+    # read table from local replica
+    # [NOTE] replica의 last _mtime, row 수가 source와 같으면 network로 row를 읽지 않음 - 다르면 변경분만 읽어서 merge
+    async def read_table_cached(
+        self,
+        table_name: str,
+        as_df: bool = False,
+        format: str = "arrow",
+        root: str = REPLICA_DIR,
+        max_staleness: float = 0,
+        force: bool = False,
+    ):
+        replica = TableReplica(client=self, table_name=table_name, root=root, format=format)
+        tbl = await replica.load(max_staleness=max_staleness, force=force)
+
+        if not as_df:
+            return tbl
+        return tbl.to_pandas().set_index("_id", drop=True).rename_axis("row_id")
+
+    # run sql on local replicas (DuckDB)
+    # [NOTE] join, window function, aggregate 모두 가능하고 10000 row 제한 없음 - DuckDB SQL 문법 (identifier는 "..." 사용)
+    async def sql_local(
+        self,
+        sql: str,
+        as_df: bool = False,
+        format: str = "arrow",
+        root: str = REPLICA_DIR,
+        max_staleness: float = 0,
+    ):
+        import duckdb
+
+        # sql에서 참조하는 table만 replica를 읽음 (CTE 이름 등 base에 없는 이름은 제외, DuckDB identifier는 대소문자 구분 없음)
+        referenced = [name.lower() for name in duckdb.get_table_names(sql)]
+        tables = await self.list_tables(refresh=False)
+        table_names = [table.name for table in tables if table.name.lower() in referenced]
+        replicas = await asyncio.gather(
+            *[
+                self.read_table_cached(table_name=table_name, format=format, root=root, max_staleness=max_staleness)
+                for table_name in table_names
+            ]
+        )
+
+        def _execute():
+            with duckdb.connect() as conn:
+                for table_name, tbl in zip(table_names, replicas):
+                    conn.register(table_name, tbl)
+                result = conn.execute(sql)
+                return result.df() if as_df else result.arrow()
+
+        # [NOTE] python 3.8 호환 - asyncio.to_thread는 3.9부터
+        return await asyncio.get_running_loop().run_in_executor(None, _execute)
+
+    # iterate table
+    # [NOTE] _id 기준 keyset pagination으로 page 단위 deserialize하여 yield - 읽는 도중 row가 바뀌어도 누락, 중복 없음
+    async def iter_table(
+        self,
+        table_name: str,
+        select: List[str] = None,
+        where: Union[str, dict, Criterion] = None,
+        modified_after: Union[datetime, str] = None,
+        page_size: int = 10000,
+        deserializer: Deserializer = None,
+    ):
+        MAX_LIMIT = 10000
+
+        table = PikaTable(table_name)
+        limit = min(page_size, MAX_LIMIT)
+        if not select:
+            select = ["*"]
+        if not isinstance(select, list):
+            select = [x.strip() for x in select.split(",")]
+        if select != ["*"] and "_id" not in select:
+            select = ["_id", *select]
+        if deserializer is None:
+            deserializer = await self.get_deserializer(table_name=table_name)
+
+        where = await self.compile_where(table_name=table_name, where=where)
+        modified = None
+        if modified_after:
+            last_modified = "_mtime"
+            tbl = await self.get_table(table_name=table_name, refresh=False)
+            for c in tbl.columns:
+                if c.key == "_mtime":
+                    last_modified = c.name
+                    break
+            if isinstance(modified_after, datetime):
+                modified_after = modified_after.isoformat(timespec="milliseconds")
+            modified = table[last_modified] > modified_after
+
+        last_row_id = None
+        while True:
+            q = PikaQuery.from_(table).select(*select)
+            if last_row_id:
+                q = q.where(table["_id"] > last_row_id)
+            if where is not None:
+                q = q.where(where)
+            if modified is not None:
+                q = q.where(modified)
+            q = q.orderby("_id", order=Order.asc).limit(limit)
+
+            rows = await self.list_rows_with_sql(sql=q)
+            if not rows:
+                break
+            last_row_id = rows[-1]["_id"]
+            try:
+                _rows = deserializer(*rows, select=None if select == ["*"] else select)
+            except Exception as ex:
+                _msg = (
+                    f"deserializer failed - group '{self.group_name}', base '{self.base_name}', table '{table_name}'"
+                )
+                logger.error(_msg)
+                raise ex
+            yield _rows
+            if len(rows) < limit:
+                break
+
     # read view
     async def read_view(
         self,
@@ -564,6 +981,7 @@ class BaseClient(BuiltInBaseClient):
         limit: int = None,
         Deserializer: Deserializer = ToPython,
         return_schema: bool = False,
+        concurrency: int = 4,
     ):
         rows = await self.list_rows(
             table_name=table_name,
@@ -573,6 +991,7 @@ class BaseClient(BuiltInBaseClient):
             direction=direction,
             start=start,
             limit=limit,
+            concurrency=concurrency,
         )
 
         # to python data type
@@ -597,6 +1016,37 @@ class BaseClient(BuiltInBaseClient):
 
         return rows
 
+    # iterate view
+    # [NOTE] page 단위로 deserialize하여 yield - 큰 view를 streaming으로 처리할 때 사용
+    async def iter_view(
+        self,
+        table_name: str,
+        view_name: str,
+        convert_link_id: bool = False,
+        order_by: str = None,
+        direction: str = "asc",
+        deserializer: Deserializer = None,
+        concurrency: int = 4,
+    ):
+        if deserializer is None:
+            deserializer = await self.get_deserializer(table_name=table_name)
+
+        async for rows in self.iter_rows(
+            table_name=table_name,
+            view_name=view_name,
+            convert_link_id=convert_link_id,
+            order_by=order_by,
+            direction=direction,
+            concurrency=concurrency,
+        ):
+            try:
+                rows = deserializer(*rows)
+            except Exception as ex:
+                _msg = f"deserializer failed - group '{self.group_name}', base '{self.base_name}', table '{table_name}', view '{view_name}'"
+                logger.error(_msg)
+                raise ex
+            yield rows
+
     # read view as DataFrame
     async def read_view_as_df(
         self,
@@ -625,6 +1075,18 @@ class BaseClient(BuiltInBaseClient):
         tbl = pa.Table.from_pylist(rows).to_pandas()
         return tbl.set_index("_id", drop=True).rename_axis("row_id")
 
+    # Get Deserializer
+    async def get_deserializer(self, table_name: str, Deserializer: Deserializer = ToPython, refresh: bool = True):
+        metadata = await self.get_metadata(refresh=refresh)
+        collaborators = await self.list_collaborators(refresh=refresh)
+        return Deserializer(
+            metadata=metadata,
+            table_name=table_name,
+            base_name=self.base_name,
+            group_name=self.group_name,
+            collaborators=collaborators,
+        )
+
     # Generate Deserializer
     async def generate_deserializer(self, table_name: str):
         table = await self.get_table(table_name)
@@ -632,17 +1094,101 @@ class BaseClient(BuiltInBaseClient):
         return ToPython(table=table, users=users)
 
     # get last modified at
+    # [NOTE] mtime column이 없는 table은 system column '_mtime' 사용
     async def get_last_mtime(self, table_name: str):
-        table = await self.get_table(table_name=table_name)
+        table = await self.get_table(table_name=table_name, refresh=False)
         for column in table.columns:
             if column.type == "mtime":
                 c = column.name
-                q = f"SELECT {c} FROM {table_name} ORDER BY {c} DESC LIMIT 1;"
-                r = await self.list_rows_with_sql(q)
-                last_mtime = parse_str_datetime(r[0][c])
-                return last_mtime
+                break
         else:
-            raise KeyError
+            c = "_mtime"
+        q = f"SELECT `{c}` FROM `{table_name}` ORDER BY `{c}` DESC LIMIT 1;"
+        r = await self.list_rows_with_sql(q)
+        if not r:
+            return None
+        last_mtime = parse_str_datetime(r[0][c])
+        return last_mtime
+
+    # count rows
+    async def count_rows(self, table_name: str):
+        q = f"SELECT COUNT(*) FROM `{table_name}`;"
+        r = await self.list_rows_with_sql(q)
+        return list(r[0].values())[0] if r else 0
+
+    # aggregate
+    # [NOTE] GROUP BY를 dtable-db에서 실행 - group 결과만 받음. group이 10000개 넘으면 ORDER BY group column으로 paging
+    async def aggregate(
+        self,
+        table_name: str,
+        group_by: List[str] = None,
+        metrics: Dict[str, Tuple[str, str]] = None,
+        where: Union[str, dict, Criterion] = None,
+        page_size: int = 10000,
+        Deserializer: Deserializer = ToPython,
+    ) -> List[dict]:
+        """
+        metrics: {결과 이름: (function, column)} - function은 count, sum, avg, min, max. count는 column에 "*" 가능
+         - e.g. {"n": ("count", "*"), "total": ("sum", "Amount"), "last": ("max", "Date")}
+        """
+        MAX_LIMIT = 10000
+
+        table = PikaTable(table_name)
+        group_by = group_by or list()
+        group_by = group_by if isinstance(group_by, list) else [group_by]
+        metrics = metrics or {"count": ("count", "*")}
+        limit = min(page_size, MAX_LIMIT)
+        where = await self.compile_where(table_name=table_name, where=where)
+
+        # validate
+        for func, _ in metrics.values():
+            if func.lower() not in AGGREGATE_FUNCTIONS:
+                _msg = f"unknown aggregate function '{func}' - available functions are {list(AGGREGATE_FUNCTIONS)}."
+                raise KeyError(_msg)
+        columns = [c.name for c in await self.list_columns(table_name=table_name, refresh=False)]
+        for c in [*group_by, *[column for _, column in metrics.values() if column != "*"]]:
+            if c not in columns and not c.startswith("_"):
+                _msg = f"no column '{c}' in table '{table_name}'."
+                raise ColumnNotExists(_msg)
+
+        # generate query
+        terms = list()
+        for name, (func, column) in metrics.items():
+            term = Star() if column == "*" else table[column]
+            terms.append(AGGREGATE_FUNCTIONS[func.lower()](term).as_(name))
+        q = PikaQuery.from_(table).select(*[table[c] for c in group_by], *terms)
+        if where is not None:
+            q = q.where(where)
+        if group_by:
+            q = q.groupby(*[table[c] for c in group_by]).orderby(*[table[c] for c in group_by], order=Order.asc)
+        q = q.limit(limit)
+
+        # get all groups
+        rows, offset = list(), 0
+        while True:
+            _rows = await self.list_rows_with_sql(sql=q.offset(offset).get_sql(as_keyword=True))
+            rows += _rows
+            if not group_by or len(_rows) < limit:
+                break
+            offset += limit
+
+        # deserialize - group column은 column type으로, min/max는 대상 column type으로
+        if Deserializer:
+            deserializer = await self.get_deserializer(table_name=table_name, Deserializer=Deserializer, refresh=False)
+            results = list()
+            for row in rows:
+                result = {c: None for c in group_by}
+                if group_by:
+                    result.update(deserializer(row, select=group_by)[0])
+                for name, (func, column) in metrics.items():
+                    value = row.get(name)
+                    if func.lower() in ["min", "max"] and column in deserializer.columns:
+                        value = deserializer.columns[column](value)
+                    result[name] = value
+                results.append(result)
+            rows = results
+
+        return rows
 
     ################################################################
     # LINKS
@@ -678,19 +1224,17 @@ class BaseClient(BuiltInBaseClient):
         prep.update({"other_table_row_id": other_rows_ids[0]})
         return prep
 
-    # Prep - Create Row Links
-    async def _prep_create_row_links(
+    # Get Link Context
+    # [NOTE] row_id_maps ({(table_name, key_column): task})를 넘기면 호출 사이에 row_id_map 조회를 공유
+    async def get_link_context(
         self,
         table_name: str,
         column_name: str,
-        display_values: list,
-        add_link_if_not_exists: bool = False,
         raise_key_not_unique_error: bool = True,
+        refresh: bool = True,
+        row_id_maps: dict = None,
     ):
-        # correct display values
-        display_values = display_values if isinstance(display_values, list) else [display_values]
-
-        table = await self.get_table(table_name=table_name, refresh=True)
+        table = await self.get_table(table_name=table_name, refresh=refresh)
         column = await self.get_column(table_name=table_name, column_name=column_name, refresh=False)
         if column.type != "link":
             _msg = f"type of column '{column_name}' is not link type."
@@ -709,36 +1253,59 @@ class BaseClient(BuiltInBaseClient):
         display_column = await self.get_column_by_id(
             table_id=_other_table.id, column_id=display_column_key, refresh=False
         )
-        row_id_map = await self.get_row_id_map(
-            table_name=_other_table.name,
-            key_column=display_column.name,
-            raise_key_not_unique_error=raise_key_not_unique_error,
-        )
-
-        other_rows_ids = list()
-        for display_value in display_values:
-            if display_value not in row_id_map:
-                if not add_link_if_not_exists:
-                    _msg = f"display value '{display_value}' not exists. please add this value into table '{_other_table.name}' first."
-                    raise LinkValueNotExists(_msg)
-                # add link
-                await self.add_row(table_name=_other_table.name, row={display_column.name: display_value})
-                row_id_map = await self.get_row_id_map(
+        if row_id_maps is None:
+            row_id_maps = dict()
+        key = (_other_table.name, display_column.name)
+        if key not in row_id_maps:
+            row_id_maps[key] = asyncio.ensure_future(
+                self.get_row_id_map(
                     table_name=_other_table.name,
                     key_column=display_column.name,
                     raise_key_not_unique_error=raise_key_not_unique_error,
+                    refresh=False,
                 )
-            other_rows_ids.append(row_id_map[display_value])
+            )
+        row_id_map = await row_id_maps[key]
+
+        return LinkContext(
+            client=self,
+            table=_table,
+            other_table=_other_table,
+            column=column,
+            display_column=display_column,
+            row_id_map=row_id_map,
+            raise_key_not_unique_error=raise_key_not_unique_error,
+        )
+
+    # Prep - Create Row Links
+    async def _prep_create_row_links(
+        self,
+        table_name: str,
+        column_name: str,
+        display_values: list,
+        add_link_if_not_exists: bool = False,
+        raise_key_not_unique_error: bool = True,
+    ):
+        context = await self.get_link_context(
+            table_name=table_name,
+            column_name=column_name,
+            raise_key_not_unique_error=raise_key_not_unique_error,
+        )
+        other_rows_ids = await context.resolve(
+            display_values=display_values, add_link_if_not_exists=add_link_if_not_exists
+        )
 
         return {
-            "table_name": _table.name,
-            "other_table_name": _other_table.name,
-            "link_id": column.data["link_id"],
+            "table_name": context.table.name,
+            "other_table_name": context.other_table.name,
+            "link_id": context.link_id,
             "other_rows_ids": other_rows_ids,
         }
 
     # Get Ohter Rows Ids
-    async def get_other_rows_ids(self, table_name, column_name, raise_key_not_unique_error: bool = True):
+    async def get_other_rows_ids(
+        self, table_name, column_name, raise_key_not_unique_error: bool = True, refresh: bool = False
+    ):
         link = await self.get_link(table_name=table_name, column_name=column_name)
         other_table = await self.get_table_by_id(table_id=link["other_table_id"])
         for column in other_table.columns:
@@ -747,7 +1314,10 @@ class BaseClient(BuiltInBaseClient):
         else:
             raise KeyError
         return await self.get_row_id_map(
-            table_name=other_table.name, key_column=column.name, raise_key_not_unique_error=raise_key_not_unique_error
+            table_name=other_table.name,
+            key_column=column.name,
+            raise_key_not_unique_error=raise_key_not_unique_error,
+            refresh=refresh,
         )
 
     ################################################################
@@ -817,33 +1387,77 @@ class BaseClient(BuiltInBaseClient):
     # COLUMNS
     ################################################################
 
-    # add select options if not exists
-    async def add_select_options_if_not_exists(self, table_name: str, rows: List[dict]):
-        table = await self.get_table(table_name=table_name)
-        columns_and_options = {
-            c.name: [o["name"] for o in c.data["options"]] if c.data else []
+    # Get Select Options
+    # [NOTE] metadata version이 같으면 cache 사용 - add_select_options 결과도 cache에 반영
+    async def get_select_options(self, table_name: str, table: Table = None, refresh: bool = False):
+        if table is None:
+            table = await self.get_table(table_name=table_name, refresh=refresh)
+        version = self.metadata.version if self.metadata else None
+
+        if table_name in self.select_options:
+            cached_version, options = self.select_options[table_name]
+            if cached_version == version:
+                return options
+
+        options = {
+            c.name: {o["name"] for o in c.data.get("options") or []} if c.data else set()
             for c in table.columns
             if c.type in ["single-select", "multiple-select"]
         }
+        self.select_options[table_name] = (version, options)
+
+        return options
 
-        if not columns_and_options:
+    # add select options if not exists
+    async def add_select_options_if_not_exists(self, table_name: str, rows: List[dict], table: Table = None):
+        def _get_options_to_add(options):
+            options_to_add = dict()
+            for column_name, column_options in options.items():
+                values = set()
+                for r in rows:
+                    v = r.get(column_name)
+                    if not v:
+                        continue
+                    if isinstance(v, list):
+                        values.update(x for x in v if x)
+                    else:
+                        values.add(v)
+                values -= column_options
+                if values:
+                    options_to_add[column_name] = values
+            return options_to_add
+
+        # table이 주어지지 않으면 cached metadata 사용
+        options = await self.get_select_options(table_name=table_name, table=table, refresh=False)
+        if not options:
+            return
+
+        options_to_add = _get_options_to_add(options)
+        if not options_to_add:
             return
 
-        options = {c: set([r.get(c) for r in rows if r.get(c)]) for c in columns_and_options}
-        options_to_add = dict()
-        for column_name, column_options in options.items():
-            for column_opt in column_options:
-                if column_opt not in columns_and_options[column_name]:
-                    if column_name not in options_to_add:
-                        options_to_add[column_name] = list()
-                    options_to_add[column_name].append(SelectOption(name=column_opt))
+        # cache miss - cached metadata 사용했으면 최신 metadata로 한 번 더 확인
+        if table is None:
+            options = await self.get_select_options(table_name=table_name, refresh=True)
+            options_to_add = _get_options_to_add(options)
+            if not options_to_add:
+                return
 
         coros = [
-            self.add_select_options(table_name=table_name, column_name=column_name, options=options)
-            for column_name, options in options_to_add.items()
+            self.add_select_options(
+                table_name=table_name,
+                column_name=column_name,
+                options=[SelectOption(name=name) for name in sorted(names, key=str)],
+            )
+            for column_name, names in options_to_add.items()
         ]
+        results = await asyncio.gather(*coros)
+
+        # update cache
+        for column_name, names in options_to_add.items():
+            options[column_name].update(names)
 
-        return await asyncio.gather(*coros)
+        return results
 
     ################################################################
     # BIG DATA
@@ -863,8 +1477,11 @@ class BaseClient(BuiltInBaseClient):
     # List Delete Operation Logs After
     async def list_delete_operation_logs_since(self, op_type: str, op_time: Union[datetime, str], per_page: int = 100):
         # correct op_time
-        op_time = datetime.fromisoformat(op_time) if isinstance(op_time, str) else op_time
+        op_time = parse_str_datetime(op_time) if isinstance(op_time, str) else op_time
+        if op_time.tzinfo is None:
+            op_time = TZ.localize(op_time)
 
+        # [NOTE] 최신 log부터 반환되므로 op_time 이전 log를 만나면 중단
         delete_logs = list()
         page = 1
         while True:
@@ -872,14 +1489,75 @@ class BaseClient(BuiltInBaseClient):
             if not logs:
                 break
             for log in logs:
-                if datetime.fromisoformat(log["op_time"]) < op_time:
-                    break
+                if parse_str_datetime(log["op_time"]) < op_time:
+                    return delete_logs
                 delete_logs.append(log)
             page += 1
 
         return delete_logs
 
+    # List Table Delete Logs After
+    async def list_table_delete_logs_since(self, table_name: str, op_time: Union[datetime, str]) -> List[dict]:
+        table = await self.get_table(table_name=table_name, refresh=False)
+        list_logs = await asyncio.gather(
+            *[self.list_delete_operation_logs_since(op_type=op_type, op_time=op_time) for op_type in DELETE_OP_TYPES]
+        )
+        return [log for logs in list_logs for log in logs if log.get("table_id") in (None, table.id)]
+
+    # List Deleted Row IDs After
+    async def list_deleted_row_ids_since(self, table_name: str, op_time: Union[datetime, str]) -> List[str]:
+        logs = await self.list_table_delete_logs_since(table_name=table_name, op_time=op_time)
+        row_ids = [row_id for log in logs for row_id in extract_deleted_row_ids(log)]
+        return row_ids
+
     ################################################################
     # SNAPSHOTS
     ################################################################
-    # TBD
+    # Snapshot Base
+    # [NOTE] metadata, collaborators는 한 번만 가져오고 table들은 max_concurrency 만큼 동시에 읽음
+    #  - consumer(table_name, deserializer, pages)는 table 별로 호출됨, pages는 deserialize된 rows의 async iterator
+    #  - consumer가 없으면 rows를 모두 모아서 반환
+    async def snapshot_base(
+        self,
+        table_names: List[str] = None,
+        consumer: Callable[[str, Deserializer, Any], Any] = None,
+        max_concurrency: int = 4,
+        Deserializer: Deserializer = ToPython,
+    ):
+        started_at = datetime.now(TZ)
+
+        metadata, collaborators = await asyncio.gather(self.get_metadata(), self.list_collaborators())
+        if table_names is None:
+            table_names = [table.name for table in metadata.tables]
+
+        async def collect(table_name: str, deserializer: Deserializer, pages):
+            rows = list()
+            async for page in pages:
+                rows += page
+            return rows
+
+        consumer = consumer or collect
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def snapshot_table(table_name: str):
+            async with semaphore:
+                deserializer = Deserializer(
+                    metadata=metadata,
+                    table_name=table_name,
+                    base_name=self.base_name,
+                    group_name=self.group_name,
+                    collaborators=collaborators,
+                )
+                # [NOTE] view filter 없이 전체 rows를 _id keyset으로 읽음
+                pages = self.iter_table(table_name=table_name, deserializer=deserializer)
+                return await consumer(table_name, deserializer, pages)
+
+        results = await asyncio.gather(*[snapshot_table(table_name) for table_name in table_names])
+
+        return {
+            "metadata": metadata,
+            "collaborators": collaborators,
+            "tables": dict(zip(table_names, results)),
+            "started_at": started_at,
+            "finished_at": datetime.now(TZ),
+        }
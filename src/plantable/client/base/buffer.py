@@ -0,0 +1,230 @@
+import asyncio
+import logging
+from typing import Dict, List
+
+from ...serde import FromPython
+from .base import BaseClient
+
+logger = logging.getLogger()
+
+# [NOTE] batch-append-rows, batch-update-rows, batch-delete-rows 모두 1000 rows까지만 됨
+MAX_BATCH_SIZE = 1000
+
+
+################################################################
+# RowWriteBuffer
+################################################################
+class RowWriteBuffer:
+    """
+    table 하나에 대한 single-row write를 모아서 batch endpoint로 flush.
+     - flush 조건: pending row 수 >= max_size, 첫 write 후 flush_interval 초 경과, 또는 flush() 호출
+     - 같은 row_id에 대한 update는 하나로 merge
+     - 각 write는 asyncio.Future를 반환, flush 후 결과(또는 exception)가 설정됨
+     - 결과는 BaseClient의 add_row, update_row, delete_row 반환값과 같은 형태
+    """
+
+    def __init__(
+        self, client: BaseClient, table_name: str, max_size: int = MAX_BATCH_SIZE, flush_interval: float = 1.0
+    ):
+        self.client = client
+        self.table_name = table_name
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+
+        # pending writes
+        self.appends = list()  # [(row, future), ...]
+        self.updates = dict()  # {row_id: (row, [future, ...])}
+        self.deletes = dict()  # {row_id: [future, ...]}
+
+        self._lock = asyncio.Lock()
+        self._timer = None
+        self._tasks = set()
+
+    def __len__(self):
+        return len(self.appends) + len(self.updates) + len(self.deletes)
+
+    # Add Row
+    def add_row(self, row: dict) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.appends.append((row, future))
+        self._schedule()
+        return future
+
+    # Update Row
+    def update_row(self, row_id: str, row: dict) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        if row_id in self.updates:
+            merged, futures = self.updates[row_id]
+            merged.update(row)
+            futures.append(future)
+        else:
+            self.updates[row_id] = (dict(row), [future])
+        self._schedule()
+        return future
+
+    # Delete Row
+    def delete_row(self, row_id: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        if row_id not in self.deletes:
+            self.deletes[row_id] = list()
+        self.deletes[row_id].append(future)
+        self._schedule()
+        return future
+
+    # Flush
+    async def flush(self):
+        self._cancel_timer()
+
+        # swap pending writes - flush 중에 들어오는 write는 다음 flush로
+        appends, self.appends = self.appends, list()
+        updates, self.updates = self.updates, dict()
+        deletes, self.deletes = self.deletes, dict()
+
+        # flush 순서 보장 (append -> update -> delete)
+        async with self._lock:
+            if appends:
+                await self._flush_appends(appends)
+            if updates:
+                await self._flush_updates(updates)
+            if deletes:
+                await self._flush_deletes(deletes)
+
+    # Close
+    async def close(self):
+        await self.flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _flush_appends(self, appends: List[tuple]):
+        rows, futures = [row for row, _ in appends], [future for _, future in appends]
+        try:
+            results = await self.client.append_rows(table_name=self.table_name, rows=rows)
+            row_ids = results["row_ids"]
+            if len(row_ids) != len(futures):
+                _msg = f"append_rows returned {len(row_ids)} row ids for {len(futures)} rows!"
+                raise KeyError(_msg)
+            # [NOTE] add_row는 server가 돌려준 row (serialize된 row + _id)를 반환 - 같은 형태로 맞춤
+            serializer = FromPython(await self.client.get_table(table_name=self.table_name, refresh=False))
+            results = [{**serializer(row), "_id": row_id} for row, row_id in zip(rows, row_ids)]
+        except Exception as ex:
+            self._set_exception(futures, ex)
+            return
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _flush_updates(self, updates: Dict[str, tuple]):
+        futures = [future for _, (_, _futures) in updates.items() for future in _futures]
+        try:
+            _ = await self.client.update_rows(
+                table_name=self.table_name,
+                updates=[{"row_id": row_id, "row": row} for row_id, (row, _) in updates.items()],
+            )
+        except Exception as ex:
+            self._set_exception(futures, ex)
+            return
+        for future in futures:
+            if not future.done():
+                future.set_result(True)
+
+    async def _flush_deletes(self, deletes: Dict[str, list]):
+        futures = [future for _futures in deletes.values() for future in _futures]
+        try:
+            _ = await self.client.delete_rows(table_name=self.table_name, row_ids=list(deletes))
+        except Exception as ex:
+            self._set_exception(futures, ex)
+            return
+        for future in futures:
+            if not future.done():
+                future.set_result({"deleted_rows": 1})
+
+    def _schedule(self):
+        # flush by size
+        if len(self) >= self.max_size:
+            self._cancel_timer()
+            self._spawn_flush()
+            return
+        # flush by time
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_interval, self._spawn_flush)
+
+    def _spawn_flush(self):
+        self._timer = None
+        task = asyncio.ensure_future(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._on_flush_done)
+
+    def _on_flush_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            _msg = f"flush failed - table '{self.table_name}': {task.exception()}"
+            logger.error(_msg)
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    @staticmethod
+    def _set_exception(futures: List[asyncio.Future], ex: Exception):
+        for future in futures:
+            if not future.done():
+                future.set_exception(ex)
+
+
+################################################################
+# BufferedBaseClient
+################################################################
+class BufferedBaseClient(BaseClient):
+    """
+    add_row, update_row, delete_row를 table 별 RowWriteBuffer로 coalesce하는 BaseClient.
+    각 호출은 flush 후 해당 row의 결과를 반환 - 동시에 실행되는 호출들이 하나의 batch 요청으로 합쳐짐.
+    """
+
+    def __init__(self, *args, max_size: int = MAX_BATCH_SIZE, flush_interval: float = 1.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.buffers = dict()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    # Get Buffer
+    def get_buffer(self, table_name: str) -> RowWriteBuffer:
+        if table_name not in self.buffers:
+            self.buffers[table_name] = RowWriteBuffer(
+                client=self, table_name=table_name, max_size=self.max_size, flush_interval=self.flush_interval
+            )
+        return self.buffers[table_name]
+
+    # (OVERRIDE) Add Row
+    async def add_row(
+        self, table_name: str, row: dict = {}, anchor_row_id: str = None, row_insert_position: str = "insert_below"
+    ):
+        # anchor가 있으면 batch로 처리할 수 없음
+        if anchor_row_id:
+            return await super().add_row(
+                table_name=table_name, row=row, anchor_row_id=anchor_row_id, row_insert_position=row_insert_position
+            )
+        return await self.get_buffer(table_name).add_row(row=row)
+
+    # (OVERRIDE) Update Row
+    async def update_row(self, table_name: str, row_id: str, row: dict):
+        return await self.get_buffer(table_name).update_row(row_id=row_id, row=row)
+
+    # (OVERRIDE) Delete Row
+    async def delete_row(self, table_name: str, row_id: str):
+        return await self.get_buffer(table_name).delete_row(row_id=row_id)
+
+    # Flush
+    async def flush(self, table_name: str = None):
+        buffers = [self.buffers[table_name]] if table_name else list(self.buffers.values())
+        return await asyncio.gather(*[buffer.flush() for buffer in buffers])
+
+    # Close
+    async def close(self):
+        return await asyncio.gather(*[buffer.close() for buffer in self.buffers.values()])
@@ -1,7 +1,8 @@
 import asyncio
 import logging
+from collections import deque
 from datetime import datetime
-from typing import Any, Callable, List, Tuple, Union
+from typing import Any, Callable, Dict, List, Tuple, Union
 import aiohttp
 
 import pyarrow as pa
@@ -14,6 +15,7 @@ from pypika import Table as PikaTable
 from pypika.dialects import QueryBuilder
 from tabulate import tabulate
 
+from ...cache import TieredCache
 from ...const import DT_FMT, TZ
 from ...model import BaseActivity, BaseToken, Column, Metadata, SelectOption, Table, UserInfo, View
 from ...model.column import COLUMN_DATA
@@ -27,6 +29,29 @@ logger = logging.getLogger()
 FIRST_COLUMN_TYPES = ["text", "number", "date", "single-select", "formular", "autonumber"]
 
 
+################################################################
+# BaseTokenSession
+################################################################
+class BaseTokenSession:
+    """
+    BuiltInBaseClient.session_maker()의 context - 들어갈 때 만료된 base token을 async로 다시 발급하고 session 생성.
+    """
+
+    def __init__(self, client: "BuiltInBaseClient"):
+        self.client = client
+        self.session = None
+
+    async def __aenter__(self):
+        await self.client.ensure_base_token()
+        headers = self.client.headers.copy()
+        headers.update({"authorization": "Bearer {}".format(self.client.base_token.access_token)})
+        self.session = self.client._make_session(headers=headers)
+        return await self.session.__aenter__()
+
+    async def __aexit__(self, *args):
+        return await self.session.__aexit__(*args)
+
+
 ################################################################
 # BuiltInBaseClient
 ################################################################
@@ -37,6 +62,7 @@ class BuiltInBaseClient(HttpClient):
         api_token: str = None,
         base_token: BaseToken = None,
         access_token_refresh_sec: int = 86400,
+        cache: TieredCache = None,
     ):
         if not seatable_url:
             raise KeyError("seatable_url is required!")
@@ -46,6 +72,7 @@ class BuiltInBaseClient(HttpClient):
         self.api_token = api_token
         self.base_token = base_token
         self.access_token_refresh_sec = access_token_refresh_sec
+        self.cache = cache
 
         if api_token:
             self.update_base_token()
@@ -62,6 +89,8 @@ class BuiltInBaseClient(HttpClient):
         self.collaborators = None
         self.views = dict()
         self.row_id_map = dict()
+        self.select_options = dict()  # {table_name: (metadata version, {column_name: set of option names})}
+        self._token_lock = None
 
     # update base_token
     def update_base_token(self):
@@ -77,16 +106,80 @@ class BuiltInBaseClient(HttpClient):
         results = response.json()
         self.base_token = BaseToken(**results)
 
-    # override
-    def session_maker(self):
-        token_uptime = (datetime.now() - self.base_token.generated_at).seconds
-        if token_uptime > self.access_token_refresh_sec:
-            self.update_base_token()
+    # fetch base_token with api token (async)
+    # [NOTE] cache가 있으면 다른 worker가 발급받은 (만료되지 않은) token 재사용
+    @staticmethod
+    async def fetch_base_token(
+        seatable_url: str, api_token: str, cache: TieredCache = None, access_token_refresh_sec: int = 86400
+    ):
+        if cache:
+            base_token = await cache.get_base_token(api_token=api_token)
+            if base_token:
+                return base_token
+
+        auth_url = seatable_url.rstrip("/") + "/api/v2.1/dtable/app-access-token/"
+        async with aiohttp.ClientSession() as session:
+            async with session.get(auth_url, headers={"Authorization": f"Token {api_token}"}) as response:
+                if response.status == 403:
+                    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Wrong base token!")
+                response.raise_for_status()
+                results = await response.json()
+        base_token = BaseToken(**results)
+
+        if cache:
+            await cache.set_base_token(
+                api_token=api_token, base_token=base_token, refresh_sec=access_token_refresh_sec
+            )
+
+        return base_token
+
+    # update base_token (async)
+    async def refresh_base_token(self):
+        self.base_token = await self.fetch_base_token(
+            seatable_url=self.seatable_url,
+            api_token=self.api_token,
+            cache=self.cache,
+            access_token_refresh_sec=self.access_token_refresh_sec,
+        )
+
+    # is base_token expired
+    def is_base_token_expired(self):
+        token_uptime = (datetime.now() - self.base_token.generated_at).total_seconds()
+        return token_uptime > self.access_token_refresh_sec
+
+    # create client with api token without blocking event loop
+    @classmethod
+    async def from_api_token(
+        cls, api_token: str, seatable_url: str = SEATABLE_URL, cache: TieredCache = None, **kwargs
+    ):
+        base_token = await cls.fetch_base_token(
+            seatable_url=seatable_url,
+            api_token=api_token,
+            cache=cache,
+            access_token_refresh_sec=kwargs.get("access_token_refresh_sec", 86400),
+        )
+        client = cls(seatable_url=seatable_url, base_token=base_token, cache=cache, **kwargs)
+        client.api_token = api_token
+        return client
+
+    # ensure base_token - 만료되었으면 event loop를 막지 않고 다시 발급 (동시에 만료를 본 요청들은 한 번만 발급)
+    async def ensure_base_token(self):
+        if not (self.api_token and self.is_base_token_expired()):
+            return
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+        async with self._token_lock:
+            if not self.is_base_token_expired():
+                return
+            token_uptime = (datetime.now() - self.base_token.generated_at).seconds
+            await self.refresh_base_token()
             _msg = f"access token for workspace '{self.workspace_id}' is updated after {token_uptime} seconds uptime."
             logger.warning(_msg)
-        headers = self.headers.copy()
-        headers.update({"authorization": "Bearer {}".format(self.base_token.access_token)})
-        return aiohttp.ClientSession(base_url=self.seatable_url, headers=headers)
+
+    # override
+    # [NOTE] session은 async with에 들어갈 때 (token 확인 후) 생성
+    def session_maker(self):
+        return BaseTokenSession(client=self)
 
     ################################################################
     # BASE INFO
@@ -108,12 +201,19 @@ class BuiltInBaseClient(HttpClient):
 
         if not refresh and self.metadata is not None:
             return self.metadata
+        if not refresh and self.cache and model is Metadata:
+            metadata = await self.cache.get_metadata(dtable_uuid=self.dtable_uuid)
+            if metadata is not None:
+                self.metadata = metadata
+                return self.metadata
 
         async with self.session_maker() as session:
             response = await self.request(session=session, method=METHOD, url=URL)
             results = response[ITEM]
         if model:
             results = model(**results)
+        if self.cache and model is Metadata:
+            await self.cache.set_metadata(dtable_uuid=self.dtable_uuid, metadata=results)
 
         self.metadata = results
         return self.metadata
@@ -135,12 +235,19 @@ class BuiltInBaseClient(HttpClient):
 
         if not refresh and self.collaborators is not None:
             return self.collaborators
+        if not refresh and self.cache and model is UserInfo:
+            collaborators = await self.cache.get_collaborators(dtable_uuid=self.dtable_uuid)
+            if collaborators is not None:
+                self.collaborators = collaborators
+                return self.collaborators
 
         async with self.session_maker() as session:
             response = await self.request(session=session, method=METHOD, url=URL)
             results = response[ITEM]
         if model:
             results = [model(**x) for x in results]
+        if self.cache and model is UserInfo:
+            await self.cache.set_collaborators(dtable_uuid=self.dtable_uuid, collaborators=results)
 
         self.collaborators = results
         return self.collaborators
@@ -179,17 +286,26 @@ class BuiltInBaseClient(HttpClient):
         direction: str = "asc",
         start: int = 0,
         limit: int = None,
+        concurrency: int = 4,
     ):
-        MAX_LIMIT = 1000
-
         METHOD = "GET"
         URL = f"/dtable-server/api/v1/dtables/{self.base_token.dtable_uuid}/rows/"
         ITEM = "rows"
 
-        get_all_rows = False
+        # get all rows
         if not limit:
-            get_all_rows = True
-            limit = limit or MAX_LIMIT
+            results = list()
+            async for rows in self.iter_rows(
+                table_name=table_name,
+                view_name=view_name,
+                convert_link_id=convert_link_id,
+                order_by=order_by,
+                direction=direction,
+                start=start,
+                concurrency=concurrency,
+            ):
+                results += rows
+            return results
 
         params = {
             "table_name": table_name,
@@ -203,18 +319,83 @@ class BuiltInBaseClient(HttpClient):
 
         async with self.session_maker() as session:
             response = await self.request(session=session, method=METHOD, url=URL, **params)
-            response = response[ITEM]
-            results = response
 
-            # pagination
-            if get_all_rows:
-                while len(response) == limit:
-                    params.update({"start": params["start"] + limit})
-                    response = await self.request(session=session, method=METHOD, url=URL, **params)
-                    response = response[ITEM]
-                    results += response
+        return response[ITEM]
 
-        return results
+    # Iterate Rows (View)
+    # [NOTE] page 단위로 yield - 전체 rows를 메모리에 올리지 않음
+    #  - 첫 page가 가득 차 있으면 다음 page들을 concurrency 개까지 미리 요청 (speculative prefetch)
+    #  - page는 요청한 순서대로 yield, 덜 찬 page가 오면 남은 요청은 취소
+    async def iter_rows(
+        self,
+        table_name: str,
+        view_name: str,
+        convert_link_id: bool = False,
+        order_by: str = None,
+        direction: str = "asc",
+        start: int = 0,
+        page_size: int = 1000,
+        concurrency: int = 4,
+    ):
+        MAX_LIMIT = 1000
+
+        METHOD = "GET"
+        URL = f"/dtable-server/api/v1/dtables/{self.base_token.dtable_uuid}/rows/"
+        ITEM = "rows"
+
+        limit = min(page_size, MAX_LIMIT)
+        params = {
+            "table_name": table_name,
+            "view_name": view_name,
+            "convert_link_id": str(convert_link_id).lower(),
+            "order_by": order_by,
+            "direction": direction,
+            "limit": limit,
+        }
+
+        async with self.session_maker() as session:
+
+            async def _fetch(start: int):
+                response = await self.request(session=session, method=METHOD, url=URL, **params, start=start)
+                return response[ITEM]
+
+            # probe
+            rows = await _fetch(start)
+            if rows:
+                yield rows
+            if len(rows) < limit:
+                return
+
+            # prefetch
+            next_start = start + limit
+            pending = deque()
+            try:
+                while True:
+                    while len(pending) < max(concurrency, 1):
+                        pending.append(asyncio.ensure_future(_fetch(next_start)))
+                        next_start += limit
+                    rows = await pending.popleft()
+                    if rows:
+                        yield rows
+                    if len(rows) < limit:
+                        break
+            finally:
+                for task in pending:
+                    task.cancel()
+                _ = await asyncio.gather(*pending, return_exceptions=True)
+
+    # Get Table for Write
+    # [NOTE] cached metadata 사용 - table이나 입력 column이 cache에 없을 때만 최신 metadata로 다시 읽음
+    #  - select option은 add_select_options_if_not_exists가 없는 option이 있을 때만 다시 확인
+    async def get_table_for_write(self, table_name: str, rows: List[dict]) -> Table:
+        try:
+            table = await self.get_table(table_name=table_name, refresh=False)
+        except KeyError:
+            return await self.get_table(table_name=table_name, refresh=True)
+        column_names = {c.name for c in table.columns}
+        if any(k not in column_names for r in rows for k in r):
+            table = await self.get_table(table_name=table_name, refresh=True)
+        return table
 
     # Add Row
     async def add_row(
@@ -224,7 +405,7 @@ class BuiltInBaseClient(HttpClient):
         METHOD = "POST"
         URL = f"/dtable-server/api/v1/dtables/{self.base_token.dtable_uuid}/rows/"
 
-        table = await self.get_table(table_name=table_name)
+        table = await self.get_table_for_write(table_name=table_name, rows=[row])
         serializer = FromPython(table)
 
         json = {"table_name": table_name, "row": serializer(row)}
@@ -251,7 +432,7 @@ class BuiltInBaseClient(HttpClient):
         URL = f"/dtable-server/api/v1/dtables/{self.base_token.dtable_uuid}/rows/"
         ITEM = "success"
 
-        table = await self.get_table(table_name=table_name)
+        table = await self.get_table_for_write(table_name=table_name, rows=[row])
         serializer = FromPython(table=table)
         json = {"table_name": table_name, "row_id": row_id, "row": serializer(row)}
 
@@ -296,7 +477,7 @@ class BuiltInBaseClient(HttpClient):
         URL = f"/dtable-server/api/v1/dtables/{self.base_token.dtable_uuid}/batch-append-rows/"
 
         # get pk and serializer
-        table = await self.get_table(table_name=table_name)
+        table = await self.get_table_for_write(table_name=table_name, rows=rows)
         serializer = FromPython(table=table)
 
         # add select options if not exists
@@ -311,9 +492,11 @@ class BuiltInBaseClient(HttpClient):
             coros = [self.request(session=session, method=METHOD, url=URL, json=json) for json in list_json]
             list_results = await asyncio.gather(*coros)
 
-        results = {"inserted_row_count": 0}
+        # [NOTE] batch-append-rows는 입력 순서대로 row_ids 반환 - link 생성에 사용
+        results = {"inserted_row_count": 0, "row_ids": list()}
         for r in list_results:
             results["inserted_row_count"] += r["inserted_row_count"]
+            results["row_ids"] += [x["_id"] for x in r.get("row_ids", [])]
 
         return results
 
@@ -324,7 +507,7 @@ class BuiltInBaseClient(HttpClient):
         URL = f"/dtable-server/api/v1/dtables/{self.base_token.dtable_uuid}/batch-update-rows/"
 
         # get serializer
-        table = await self.get_table(table_name=table_name)
+        table = await self.get_table_for_write(table_name=table_name, rows=[update["row"] for update in updates])
         serializer = FromPython(table=table)
 
         # add select options if not exists
@@ -354,14 +537,28 @@ class BuiltInBaseClient(HttpClient):
         return {"updated_row_count": len(updates)}
 
     # Delete Rows
-    async def delete_rows(self, table_name: str, row_ids: List[str]):
+    async def delete_rows(self, table_name: str, row_ids: List[str], max_concurrency: int = 4):
         METHOD = "DELETE"
         URL = f"/dtable-server/api/v1/dtables/{self.base_token.dtable_uuid}/batch-delete-rows/"
 
-        json = {"table_name": table_name, "row_ids": row_ids}
+        # divide chunk - [NOTE] 1000 rows까지만 됨
+        DELETE_LIMIT = 1000
+        chunks = divide_chunks(row_ids, DELETE_LIMIT)
+        list_json = [{"table_name": table_name, "row_ids": chunk} for chunk in chunks]
+
+        # 동시 요청 수 제한
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _delete(session, json):
+            async with semaphore:
+                return await self.request(session=session, method=METHOD, url=URL, json=json)
 
         async with self.session_maker() as session:
-            results = await self.request(session=session, method=METHOD, url=URL, json=json)
+            list_results = await asyncio.gather(*[_delete(session=session, json=json) for json in list_json])
+
+        results = {"deleted_rows": 0}
+        for r in list_results:
+            results["deleted_rows"] += r.get("deleted_rows", 0)
 
         return results
 
@@ -441,7 +638,7 @@ class BuiltInBaseClient(HttpClient):
         other_table_id: str,
         link_id: str,
         row_id_list: List[str],
-        other_rows_ids_map: List[str],
+        other_rows_ids_map: Dict[str, List[str]],
     ):
         METHOD = "PUT"
         URL = f"/dtable-server/api/v1/dtables/{self.base_token.dtable_uuid}/batch-update-links/"
@@ -871,7 +1068,7 @@ class BuiltInBaseClient(HttpClient):
 
         # for button
         if column_type in ["button"]:
-            table = await self.get_table(table_name=table_name)
+            table = await self.get_table(table_name=table_name, refresh=False)
             table_id = table.id
 
             for button_action in column_data["button_action_list"]:
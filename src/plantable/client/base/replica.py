@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Dict
+
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from ...const import TZ
+from ...serde.arrow import generate_arrow_schema
+from ...utils import parse_str_datetime
+from ..conf import REPLICA_DIR
+
+logger = logging.getLogger()
+
+REPLICA_FORMATS = ["arrow", "parquet"]
+
+# 같은 replica를 동시에 refresh하지 않도록 함 - {path: lock}
+REPLICA_LOCKS: Dict[str, asyncio.Lock] = dict()
+
+
+class UnknownReplicaFormat(Exception):
+    pass
+
+
+################################################################
+# TableReplica
+################################################################
+class TableReplica:
+    """
+    table 하나의 local replica - <root>/<base uuid>/<table id>.<format> + manifest (.json).
+     - 읽을 때는 memory map (arrow는 zero copy)
+     - source의 last _mtime, row 수가 manifest와 같으면 그대로 읽음
+     - 다르면 watermark 이후 변경된 row와 삭제 log만 읽어서 _id 기준으로 merge
+     - schema가 바뀌었거나 merge 결과의 row 수가 source와 다르면 전체를 다시 읽음
+    """
+
+    def __init__(self, client, table_name: str, root: str = REPLICA_DIR, format: str = "arrow"):
+        if format not in REPLICA_FORMATS:
+            _msg = f"unknown replica format '{format}' - available formats are {REPLICA_FORMATS}."
+            raise UnknownReplicaFormat(_msg)
+
+        self.client = client
+        self.table_name = table_name
+        self.root = root
+        self.format = format
+
+        self.path = None
+        self.manifest_path = None
+
+    # Resolve Paths - table 이름은 바뀔 수 있으므로 table id 사용
+    async def resolve(self):
+        if self.path is None:
+            table = await self.client.get_table(table_name=self.table_name, refresh=False)
+            prefix = os.path.join(self.root, self.client.dtable_uuid, table.id)
+            self.path = f"{prefix}.{self.format}"
+            self.manifest_path = f"{prefix}.json"
+        return self.path
+
+    # Read Manifest
+    def read_manifest(self) -> dict:
+        if not os.path.exists(self.manifest_path) or not os.path.exists(self.path):
+            return dict()
+        with open(self.manifest_path, "rb") as f:
+            return orjson.loads(f.read())
+
+    # Write Manifest
+    def write_manifest(self, manifest: dict):
+        tmp = f"{self.manifest_path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(manifest))
+        os.replace(tmp, self.manifest_path)
+
+    # Read Replica (memory mapped)
+    def read(self) -> pa.Table:
+        if self.format == "arrow":
+            with pa.memory_map(self.path, "r") as source:
+                return pa.ipc.open_file(source).read_all()
+        return pq.read_table(self.path, memory_map=True)
+
+    # Write Replica
+    def write(self, tbl: pa.Table):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        if self.format == "arrow":
+            # [NOTE] 압축하지 않아야 memory map으로 zero copy 읽기 가능
+            with pa.OSFile(tmp, "wb") as sink:
+                with pa.ipc.new_file(sink, schema=tbl.schema) as writer:
+                    writer.write_table(tbl)
+        else:
+            pq.write_table(tbl, tmp, compression="zstd")
+        os.replace(tmp, self.path)
+
+    # Load - freshness check 후 필요하면 refresh
+    async def load(self, max_staleness: float = 0, force: bool = False) -> pa.Table:
+        await self.resolve()
+        if self.path not in REPLICA_LOCKS:
+            REPLICA_LOCKS[self.path] = asyncio.Lock()
+
+        async with REPLICA_LOCKS[self.path]:
+            now = datetime.now(TZ)
+            manifest = dict() if force else self.read_manifest()
+
+            # skip check - max_staleness 초 안에 확인했으면 그대로 사용
+            if manifest and max_staleness:
+                checked_at = datetime.fromisoformat(manifest["checked_at"])
+                if (now - checked_at).total_seconds() < max_staleness:
+                    return self.read()
+
+            # cheap freshness check
+            last_mtime, num_rows = await asyncio.gather(
+                self.client.get_last_mtime(table_name=self.table_name),
+                self.client.count_rows(table_name=self.table_name),
+            )
+            last_mtime = last_mtime.isoformat() if last_mtime else None
+            if manifest and manifest["last_mtime"] == last_mtime and manifest["rows"] == num_rows:
+                manifest["checked_at"] = now.isoformat()
+                self.write_manifest(manifest)
+                return self.read()
+
+            tbl = await self.refresh(manifest=manifest, num_rows=num_rows)
+            self.write(tbl)
+            watermark = pc.max(tbl["_mtime"]).as_py() if tbl.num_rows else None
+            self.write_manifest(
+                {
+                    "table_name": self.table_name,
+                    "format": self.format,
+                    "last_mtime": last_mtime,
+                    "rows": num_rows,
+                    "watermark": watermark.isoformat() if watermark else None,
+                    "deleted_since": now.isoformat(),
+                    "checked_at": now.isoformat(),
+                }
+            )
+
+        return self.read()
+
+    # Refresh
+    async def refresh(self, manifest: dict = None, num_rows: int = None) -> pa.Table:
+        deserializer = await self.client.get_deserializer(table_name=self.table_name)
+        schema = generate_arrow_schema(deserializer)
+
+        # incremental
+        if manifest:
+            current = self.read()
+            if current.schema.equals(schema):
+                watermark = parse_str_datetime(manifest["watermark"]) if manifest["watermark"] else None
+                tables = [
+                    pa.Table.from_pylist(rows, schema=schema)
+                    async for rows in self.client.iter_table(
+                        table_name=self.table_name, modified_after=watermark, deserializer=deserializer
+                    )
+                ]
+                deleted_row_ids = await self.client.list_deleted_row_ids_since(
+                    table_name=self.table_name, op_time=manifest["deleted_since"]
+                )
+                row_ids = [row_id for tbl in tables for row_id in tbl["_id"].to_pylist()] + deleted_row_ids
+                mask = pc.invert(pc.is_in(current["_id"], value_set=pa.array(row_ids, pa.string())))
+                tbl = pa.concat_tables([current.filter(mask), *tables])
+                if num_rows is None or tbl.num_rows == num_rows:
+                    num_changed, num_deleted = len(row_ids) - len(deleted_row_ids), len(deleted_row_ids)
+                    _msg = f"replica '{self.path}' refreshed - {num_changed} changed, {num_deleted} deleted."
+                    logger.info(_msg)
+                    return tbl
+                _msg = (
+                    f"replica '{self.path}' has {tbl.num_rows} rows after merge, source has {num_rows} - reload all."
+                )
+                logger.warning(_msg)
+            else:
+                _msg = f"schema of table '{self.table_name}' changed - reload all."
+                logger.info(_msg)
+
+        # full
+        tables = [
+            pa.Table.from_pylist(rows, schema=schema)
+            async for rows in self.client.iter_table(table_name=self.table_name, deserializer=deserializer)
+        ]
+        tbl = pa.concat_tables(tables) if tables else schema.empty_table()
+        _msg = f"replica '{self.path}' reloaded - {tbl.num_rows} rows."
+        logger.info(_msg)
+
+        return tbl
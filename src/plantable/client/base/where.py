@@ -0,0 +1,208 @@
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, List, Union
+
+from pypika import Table as PikaTable
+from pypika.terms import Criterion, LiteralValue, Term, ValueWrapper
+
+from ...const import TZ
+from ...model import Column, Table
+from ...utils import parse_str_datetime
+
+logger = logging.getLogger()
+
+# [NOTE] system column은 metadata에 없을 수 있음
+SYSTEM_COLUMN_TYPES = {
+    "_id": "text",
+    "_ctime": "ctime",
+    "_mtime": "mtime",
+    "_creator": "creator",
+    "_last_modifier": "last-modifier",
+    "_locked": "checkbox",
+    "_archived": "checkbox",
+}
+
+NUMBER_TYPES = ["number", "rate", "duration"]
+DATETIME_TYPES = ["date", "ctime", "mtime"]
+TEXT_TYPES = ["text", "long-text", "email", "url", "auto-number", "autonumber", "formula"]
+
+OPERATORS = ["eq", "ne", "in", "not_in", "gt", "gte", "lt", "lte", "between", "contains", "is_null"]
+RANGE_OPERATORS = ["gt", "gte", "lt", "lte", "between"]
+
+
+class InvalidWhere(Exception):
+    pass
+
+
+# Escape LIKE Pattern - %, _는 wildcard, \는 escape 문자
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+################################################################
+# Criterions
+################################################################
+class HasAnyOf(Criterion):
+    """
+    multiple-select 조건 - `Tags` HAS ANY OF ('a','b')
+    """
+
+    def __init__(self, term: Term, values: List[Any], alias: str = None):
+        super().__init__(alias=alias)
+        self.term = term
+        self.values = [ValueWrapper(v) for v in values]
+
+    def get_sql(self, **kwargs):
+        values = ",".join(v.get_sql(**kwargs) for v in self.values)
+        return f"{self.term.get_sql(**kwargs)} HAS ANY OF ({values})"
+
+
+################################################################
+# WhereCompiler
+################################################################
+class WhereCompiler:
+    """
+    read_table 등의 where 인자를 pypika 조건으로 변환.
+     - dict: {column: value} - value가 list면 in, None이면 is_null, dict면 {operator: value}
+       e.g. {"Status": ["Open", "Hold"], "Amount": {"gte": 100, "lt": 1000}, "Tags": {"contains": "urgent"}}
+     - operator: eq, ne, in, not_in, gt, gte, lt, lte, between, contains, is_null
+       (빈 in은 항상 false, 빈 not_in은 조건 없음, contains의 %, _, \\는 escape)
+     - column 이름, operator, select option은 metadata로 검증 - literal은 column type에 맞게 encoding
+     - str, Criterion은 그대로 사용
+    """
+
+    def __init__(self, table: Table):
+        self.table = table
+        self.pika_table = PikaTable(table.name)
+        self.columns: Dict[str, Column] = {c.name: c for c in table.columns}
+
+    def __call__(self, where: Union[str, dict, Criterion]) -> Criterion:
+        if where is None or isinstance(where, Criterion):
+            return where
+        if isinstance(where, str):
+            return LiteralValue(f"({where})")
+        if not isinstance(where, dict):
+            _msg = f"where should be str, dict or pypika Criterion, not '{type(where).__name__}'."
+            raise InvalidWhere(_msg)
+
+        criterions = list()
+        for name, cond in where.items():
+            if not isinstance(cond, dict):
+                if cond is None:
+                    cond = {"is_null": True}
+                elif isinstance(cond, (list, tuple, set)):
+                    cond = {"in": list(cond)}
+                else:
+                    cond = {"eq": cond}
+            for op, value in cond.items():
+                criterion = self.compile(name=name, op=op, value=value)
+                if criterion is not None:
+                    criterions.append(criterion)
+
+        return Criterion.all(criterions)
+
+    # Get Column Type
+    def get_column_type(self, name: str) -> str:
+        if name in self.columns:
+            return self.columns[name].type
+        if name in SYSTEM_COLUMN_TYPES:
+            return SYSTEM_COLUMN_TYPES[name]
+        _msg = f"no column '{name}' in table '{self.table.name}'."
+        raise InvalidWhere(_msg)
+
+    # Compile One Condition - 조건이 없으면 None
+    def compile(self, name: str, op: str, value: Any) -> Criterion:
+        if op not in OPERATORS:
+            _msg = f"unknown operator '{op}' - available operators are {OPERATORS}."
+            raise InvalidWhere(_msg)
+
+        column_type = self.get_column_type(name)
+        field = self.pika_table[name]
+
+        if op == "is_null":
+            return field.isnull() if value else field.notnull()
+
+        if op in RANGE_OPERATORS and column_type not in [*NUMBER_TYPES, *DATETIME_TYPES]:
+            _msg = f"operator '{op}' is not supported for column '{name}' ({column_type})."
+            raise InvalidWhere(_msg)
+
+        if op == "contains":
+            if column_type == "multiple-select":
+                values = value if isinstance(value, (list, tuple, set)) else [value]
+                if not values:
+                    return field.isnull() & field.notnull()
+                return HasAnyOf(field, [self.encode(name, v) for v in values])
+            if column_type not in TEXT_TYPES:
+                _msg = f"operator 'contains' is not supported for column '{name}' ({column_type})."
+                raise InvalidWhere(_msg)
+            return field.like(f"%{escape_like(self.encode(name, value))}%")
+
+        if op in ["in", "not_in"]:
+            values = [self.encode(name, v) for v in value]
+            # [NOTE] 'IN ()'는 SQL 오류 - 빈 in은 어떤 row도 만족하지 않는 조건, 빈 not_in은 조건 없음
+            if not values:
+                return (field.isnull() & field.notnull()) if op == "in" else None
+            return field.isin(values) if op == "in" else field.notin(values)
+
+        if op == "between":
+            lower, upper = value
+            return field[self.encode(name, lower) : self.encode(name, upper)]
+
+        value = self.encode(name, value)
+        if op == "eq":
+            return field == value
+        if op == "ne":
+            return field != value
+        if op == "gt":
+            return field > value
+        if op == "gte":
+            return field >= value
+        if op == "lt":
+            return field < value
+        return field <= value
+
+    # Encode Literal
+    def encode(self, name: str, value: Any) -> Any:
+        column_type = self.get_column_type(name)
+
+        if column_type in NUMBER_TYPES:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                _msg = f"column '{name}' ({column_type}) needs number, not '{value}'."
+                raise InvalidWhere(_msg)
+            return value
+
+        if column_type == "checkbox":
+            if not isinstance(value, bool):
+                _msg = f"column '{name}' (checkbox) needs bool, not '{value}'."
+                raise InvalidWhere(_msg)
+            return value
+
+        if column_type in DATETIME_TYPES:
+            if isinstance(value, str):
+                value = parse_str_datetime(value)
+            if isinstance(value, datetime):
+                value = value.astimezone(TZ) if value.tzinfo else TZ.localize(value)
+            elif not isinstance(value, date):
+                _msg = f"column '{name}' ({column_type}) needs datetime, date or iso string, not '{value}'."
+                raise InvalidWhere(_msg)
+            # [NOTE] date column은 format에 시간이 있으면 'YYYY-MM-DD HH:mm', 없으면 'YYYY-MM-DD'로 비교
+            if column_type == "date":
+                column = self.columns.get(name)
+                date_format = ((column.data if column else None) or {}).get("format", "YYYY-MM-DD")
+                if not isinstance(value, datetime):
+                    return value.isoformat()
+                return value.strftime("%Y-%m-%d %H:%M" if "HH:mm" in date_format else "%Y-%m-%d")
+            if not isinstance(value, datetime):
+                value = TZ.localize(datetime(value.year, value.month, value.day))
+            return value.isoformat(timespec="milliseconds")
+
+        if column_type in ["single-select", "multiple-select"]:
+            options = [opt["name"] for opt in ((self.columns[name].data or {}).get("options") or [])]
+            if value not in options:
+                _msg = f"'{value}' is not an option of column '{name}' - available options are {options}."
+                raise InvalidWhere(_msg)
+            return value
+
+        if not isinstance(value, str):
+            return str(value)
+        return value
@@ -10,3 +10,6 @@ SEATABLE_USERNAME = os.getenv("SEATABLE_USERNAME")
 SEATABLE_PASSWORD = os.getenv("SEATABLE_PASSWORD")
 SEATABLE_ACCOUNT_TOKEN = os.getenv("SEATABLE_ACCOUNT_TOKEN")
 SEATABLE_API_TOKEN = os.getenv("SEATABLE_API_TOKEN")
+
+# Local Replica (read_table_cached)
+REPLICA_DIR = os.getenv("REPLICA_DIR", os.path.join(os.path.expanduser("~"), ".cache", "plantable", "replica"))
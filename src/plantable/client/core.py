@@ -20,6 +20,28 @@ def parse_name(*name, delim: str = "/"):
     return [x for e in name for x in (e.split(delim) if e else [None])][: len(name)]
 
 
+################################################################
+# PooledSession
+################################################################
+class PooledSession:
+    """
+    HttpClient.open_session()으로 연 session을 재사용 - context를 벗어나도 session을 닫지 않음.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, headers: dict):
+        self.session = session
+        self.headers = headers
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def request(self, **kwargs):
+        return self.session.request(headers=self.headers, **kwargs)
+
+
 ################################################################
 # HttpClient
 ################################################################
@@ -30,6 +52,23 @@ class HttpClient:
         self.headers = {"accept": "application/json"}
         self.debug = False
         self._request = None
+        self._session = None
+
+    # open pooled session - 이후 요청들은 connection pool 공유
+    async def open_session(self, limit: int = 100):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=limit)
+            self._session = aiohttp.ClientSession(base_url=self.seatable_url, connector=connector)
+        return self._session
+
+    # close pooled session - delay 동안 진행 중인 요청은 기존 session 사용
+    async def close_session(self, delay: float = 0):
+        session, self._session = self._session, None
+        if session is None:
+            return
+        if delay:
+            await asyncio.sleep(delay)
+        await session.close()
 
     async def info(self):
         async with self.session_maker() as session:
@@ -43,6 +82,11 @@ class HttpClient:
         headers = self.headers.copy()
         if token:
             headers.update({"authorization": "Bearer {}".format(token)})
+        return self._make_session(headers=headers)
+
+    def _make_session(self, headers: dict):
+        if self._session is not None and not self._session.closed:
+            return PooledSession(session=self._session, headers=headers)
         return aiohttp.ClientSession(base_url=self.seatable_url, headers=headers)
 
     async def request(
@@ -20,3 +20,6 @@ SYSTEM_FIELDS = {
     "_mtime": {"type": "mtime"},
     "_last_modifier": {"type": "last-modifier"},
 }
+
+# Delete Operations (Operation Logs)
+DELETE_OP_TYPES = ["delete_row", "delete_rows"]
@@ -79,7 +79,7 @@ class BaseToken(_Model):
     group_name: str = None  # (manually added)
     base_name: str = Field(None, alias="dtable_name")  # 'employee
     use_api_gateway: str = None
-    generated_at: datetime = datetime.now()  # (manually added)
+    generated_at: datetime = Field(default_factory=datetime.now)  # (manually added)
 
 
 class Webhook(_Model):
@@ -0,0 +1,260 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Set, Union
+
+import orjson
+import socketio
+from pydantic import BaseModel
+
+from .cache import TieredCache
+from .client.base import BaseClient
+from .const import TZ
+
+logger = logging.getLogger()
+
+# dtable-server socket.io events
+JOIN_ROOM = "join-room"
+UPDATE_DTABLE = "update-dtable"
+
+ROW_OPS = [
+    "insert_row",
+    "insert_rows",
+    "append_row",
+    "append_rows",
+    "modify_row",
+    "modify_rows",
+    "delete_row",
+    "delete_rows",
+]
+MODIFY_ROW_OPS = ["modify_row", "modify_rows"]
+
+KIND_ROW = "row"
+KIND_METADATA = "metadata"
+
+QUEUE_SIZE = 1000
+CONNECT_TIMEOUT = 30
+
+
+################################################################
+# Models
+################################################################
+class ChangeEvent(BaseModel):
+    dtable_uuid: str
+    kind: str  # 'row' or 'metadata'
+    op_type: str = None
+    table_id: str = None
+    table_name: str = None
+    row_ids: List[str] = []
+    column_keys: List[str] = None  # modify_row(s)에서 바뀐 column key들, 모르면 None
+    received_at: datetime
+    data: dict = None
+
+
+# Parse Operation - dtable-server는 operation을 json string 또는 dict로 보냄
+def parse_operation(dtable_uuid: str, operation: Union[str, dict]) -> ChangeEvent:
+    if isinstance(operation, (str, bytes)):
+        operation = orjson.loads(operation)
+    op_type = operation.get("op_type")
+
+    row_ids, column_keys = list(), None
+    if op_type in ROW_OPS:
+        if operation.get("row_id"):
+            row_ids = [operation["row_id"]]
+        elif operation.get("row_ids"):
+            row_ids = operation["row_ids"]
+        elif operation.get("rows_data"):
+            row_ids = [r["_id"] for r in operation["rows_data"] if "_id" in r]
+        if op_type == "modify_row" and isinstance(operation.get("updated"), dict):
+            column_keys = list(operation["updated"])
+        if op_type == "modify_rows" and isinstance(operation.get("updated"), dict):
+            column_keys = sorted(set([k for u in operation["updated"].values() for k in (u or {})]))
+
+    return ChangeEvent(
+        dtable_uuid=dtable_uuid,
+        kind=KIND_ROW if op_type in ROW_OPS else KIND_METADATA,
+        op_type=op_type,
+        table_id=operation.get("table_id"),
+        row_ids=row_ids,
+        column_keys=column_keys,
+        received_at=datetime.now(TZ),
+        data=operation,
+    )
+
+
+################################################################
+# RealtimeListener
+################################################################
+class RealtimeListener:
+    """
+    dtable-server의 socket.io room에 join해서 base 변경을 실시간으로 받음.
+     - metadata 변경 (column, table, view 등)이면 client와 cache의 metadata를 버리고 다시 읽어서 cache에 채움
+     - row 변경이면 해당 table의 row id map (바뀐 column이 key column인 것만)을 버림
+     - 받은 event는 subscribe()로 async iterator로 받을 수 있음 - 느린 subscriber는 오래된 event부터 버림
+     - 연결이 끊기면 socket.io client가 다시 연결하고 room에 다시 join
+    """
+
+    def __init__(
+        self,
+        client: BaseClient,
+        cache: TieredCache = None,
+        socketio_path: str = "socket.io",
+        queue_size: int = QUEUE_SIZE,
+        **sio_kwargs,
+    ):
+        self.client = client
+        self.cache = cache or client.cache
+        self.socketio_path = socketio_path
+        self.queue_size = queue_size
+
+        self.sio = socketio.AsyncClient(**sio_kwargs)
+        self.sio.on("connect", self._on_connect)
+        self.sio.on("disconnect", self._on_disconnect)
+        self.sio.on(UPDATE_DTABLE, self._on_update_dtable)
+
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.table_names = dict()  # {table id: table name}
+        self.refresh_task: asyncio.Task = None
+        self.refresh_again = False
+        self.connected = asyncio.Event()
+
+    @property
+    def dtable_uuid(self):
+        return self.client.dtable_uuid
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    # Connect - wait이면 room에 join할 때까지 timeout 초 동안 기다림
+    async def connect(self, wait: bool = True, timeout: float = CONNECT_TIMEOUT):
+        url = self.client.base_token.dtable_socket.rstrip("/")
+        await self.sio.connect(
+            f"{url}?dtable_uuid={self.dtable_uuid}", transports=["websocket"], socketio_path=self.socketio_path
+        )
+        if wait:
+            try:
+                await asyncio.wait_for(self.connected.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                await self.sio.disconnect()
+                _msg = f"realtime listener could not join base '{self.dtable_uuid}' in {timeout} seconds."
+                raise TimeoutError(_msg)
+
+    # Close
+    async def close(self):
+        await self.sio.disconnect()
+        if self.refresh_task:
+            self.refresh_task.cancel()
+        for queue in list(self.subscribers):
+            self._put(queue, None)
+
+    # Subscribe - async iterator of ChangeEvent
+    async def subscribe(self, kinds: List[str] = None):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                if kinds and event.kind not in kinds:
+                    continue
+                yield event
+        finally:
+            self.subscribers.discard(queue)
+
+    # Handle Change Event
+    async def handle(self, event: ChangeEvent):
+        # table name - metadata를 버린 다음에도 찾을 수 있도록 마지막 table 이름을 기억
+        metadata = self.client.metadata or (self.cache and await self.cache.get_metadata(self.dtable_uuid))
+        if metadata:
+            self.table_names = {table.id: table.name for table in metadata.tables}
+        event.table_name = self.table_names.get(event.table_id)
+
+        if event.kind == KIND_METADATA:
+            await self.invalidate_metadata()
+        elif event.table_name:
+            await self.invalidate_row_ids(event=event, metadata=metadata)
+
+        self.publish(event)
+
+    # Invalidate Metadata - 바로 다시 읽어서 cache에 채움 (진행 중이면 끝난 다음 한 번 더)
+    async def invalidate_metadata(self):
+        self.client.metadata = None
+        self.client.views = dict()
+        self.client.select_options = dict()
+        if self.cache:
+            await self.cache.delete_metadata(dtable_uuid=self.dtable_uuid)
+
+        if self.refresh_task and not self.refresh_task.done():
+            self.refresh_again = True
+            return
+        self.refresh_task = asyncio.ensure_future(self._refresh_metadata())
+
+    # Invalidate Row ID Map
+    async def invalidate_row_ids(self, event: ChangeEvent, metadata=None):
+        key_columns = list(self.client.row_id_map.get(event.table_name, dict()))
+        if metadata:
+            for table in metadata.tables:
+                if table.name == event.table_name:
+                    key_columns = sorted(set(key_columns + [c.name for c in table.columns]))
+                    # [NOTE] modify는 key column 값이 바뀐 경우만 영향이 있음
+                    if event.op_type in MODIFY_ROW_OPS and event.column_keys is not None:
+                        changed = [c.name for c in table.columns if c.key in event.column_keys]
+                        key_columns = [c for c in key_columns if c in changed]
+                    break
+
+        for key_column in key_columns:
+            self.client.row_id_map.get(event.table_name, dict()).pop(key_column, None)
+            if self.cache:
+                await self.cache.delete_row_ids(
+                    dtable_uuid=self.dtable_uuid, table_name=event.table_name, key_column=key_column
+                )
+
+    # Publish to Subscribers
+    def publish(self, event: ChangeEvent):
+        for queue in self.subscribers:
+            self._put(queue, event)
+
+    # [NOTE] queue가 가득 차 있으면 오래된 event부터 버림 - close의 None도 반드시 들어가야 함
+    def _put(self, queue: asyncio.Queue, event: ChangeEvent):
+        if queue.full():
+            _ = queue.get_nowait()
+            _msg = f"realtime subscriber is too slow - drop oldest event (base '{self.dtable_uuid}')."
+            logger.warning(_msg)
+        queue.put_nowait(event)
+
+    async def _refresh_metadata(self):
+        while True:
+            self.refresh_again = False
+            try:
+                await self.client.get_metadata(refresh=True)
+            except Exception as ex:
+                _msg = f"refresh metadata failed - base '{self.dtable_uuid}': {ex}"
+                logger.warning(_msg)
+            if not self.refresh_again:
+                break
+
+    async def _on_connect(self):
+        if self.client.api_token and self.client.is_base_token_expired():
+            await self.client.refresh_base_token()
+        await self.sio.emit(JOIN_ROOM, (self.dtable_uuid, self.client.base_token.access_token))
+        self.connected.set()
+        _msg = f"realtime listener joined base '{self.dtable_uuid}'."
+        logger.info(_msg)
+
+    async def _on_disconnect(self):
+        self.connected.clear()
+        _msg = f"realtime listener disconnected from base '{self.dtable_uuid}'."
+        logger.warning(_msg)
+
+    async def _on_update_dtable(self, operation, *args):
+        try:
+            event = parse_operation(dtable_uuid=self.dtable_uuid, operation=operation)
+            await self.handle(event)
+        except Exception as ex:
+            _msg = f"handle realtime event failed - base '{self.dtable_uuid}': {ex}"
+            logger.error(_msg)
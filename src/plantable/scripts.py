@@ -44,3 +44,242 @@ def run(host, port, reload, workers, log_level):
         workers=workers,
         log_level=log_level,
     )
+
+
+@plantable.command()
+@click.option("-u", "--seatable-username", type=str, envvar="SEATABLE_USERNAME", required=True)
+@click.option("-p", "--seatable-password", type=str, envvar="SEATABLE_PASSWORD", required=True)
+@click.option("-w", "--workspace-name", type=str, multiple=True, help="watch only these workspaces")
+@click.option("-d", "--destination", type=str, default=None, help="s3://<bucket>/<prefix>, file:///<path>")
+@click.option("-f", "--format", type=str, default="parquet")
+@click.option("--prod", is_flag=True)
+@click.option("--interval", type=float, default=300, help="seconds between polls per base")
+@click.option("--jitter", type=float, default=0.2)
+@click.option("--max-concurrency", type=int, default=4)
+@click.option("--full-every", type=int, default=12, help="full check every n polls")
+@click.option("--once", is_flag=True, help="sync all watched views once and exit")
+@click.option("--log-level", type=LogLevel(), default=logging.INFO)
+def sync(
+    seatable_username,
+    seatable_password,
+    workspace_name,
+    destination,
+    format,
+    prod,
+    interval,
+    jitter,
+    max_concurrency,
+    full_every,
+    once,
+    log_level,
+):
+    import asyncio
+
+    from .client import UserClient
+    from .server.conf import EXPORT_DESTINATION
+    from .server.destination import get_destination
+    from .server.sync import SyncDaemon
+
+    logging.basicConfig(level=log_level)
+
+    async def _sync():
+        user_client = UserClient(
+            seatable_username=seatable_username, seatable_password=seatable_password, auto_login=False
+        )
+        await user_client.async_login()
+        daemon = SyncDaemon(
+            user_client=user_client,
+            destination=get_destination(destination or EXPORT_DESTINATION),
+            format=format,
+            prod=prod,
+            workspace_names=list(workspace_name) or None,
+            interval=interval,
+            jitter=jitter,
+            max_concurrency=max_concurrency,
+            full_every=full_every,
+        )
+        if once:
+            return await daemon.run_once()
+        await daemon.run()
+
+    results = asyncio.run(_sync())
+    if results:
+        print(results)
+
+
+@plantable.group()
+def dataset():
+    pass
+
+
+@dataset.command()
+@click.option("--api-token", type=str, envvar="SEATABLE_API_TOKEN", required=True)
+@click.option("-w", "--workspace-name", type=str, required=True)
+@click.option("-b", "--base-name", type=str, required=True)
+@click.option("-t", "--table-name", type=str, required=True)
+@click.option("-d", "--destination", type=str, default=None, help="s3://<bucket>/<prefix>, file:///<path>")
+@click.option("--prod", is_flag=True)
+@click.option("--force", is_flag=True)
+@click.option("--log-level", type=LogLevel(), default=logging.INFO)
+def export(api_token, workspace_name, base_name, table_name, destination, prod, force, log_level):
+    import asyncio
+
+    from .client import BaseClient
+    from .server.conf import EXPORT_DESTINATION
+    from .server.dataset import generate_dataset_prefix, table_to_dataset
+    from .server.destination import get_destination
+
+    logging.basicConfig(level=log_level)
+
+    async def _export():
+        client = await BaseClient.from_api_token(api_token=api_token)
+        prefix = generate_dataset_prefix(
+            prod=prod, workspace_name=workspace_name, base_name=base_name, table_name=table_name
+        )
+        return await table_to_dataset(
+            destination=get_destination(destination or EXPORT_DESTINATION),
+            client=client,
+            table_name=table_name,
+            prefix=prefix,
+            force=force,
+        )
+
+    print(asyncio.run(_export()))
+
+
+@dataset.command()
+@click.option("-w", "--workspace-name", type=str, required=True)
+@click.option("-b", "--base-name", type=str, required=True)
+@click.option("-t", "--table-name", type=str, required=True)
+@click.option("-d", "--destination", type=str, default=None, help="s3://<bucket>/<prefix>, file:///<path>")
+@click.option("--prod", is_flag=True)
+@click.option("--min-files", type=int, default=2)
+@click.option("--log-level", type=LogLevel(), default=logging.INFO)
+def compact(workspace_name, base_name, table_name, destination, prod, min_files, log_level):
+    import asyncio
+
+    from .server.conf import EXPORT_DESTINATION
+    from .server.dataset import compact_dataset, generate_dataset_prefix
+    from .server.destination import get_destination
+
+    logging.basicConfig(level=log_level)
+
+    prefix = generate_dataset_prefix(
+        prod=prod, workspace_name=workspace_name, base_name=base_name, table_name=table_name
+    )
+    destination = get_destination(destination or EXPORT_DESTINATION)
+
+    print(asyncio.run(compact_dataset(destination=destination, prefix=prefix, min_files=min_files)))
+
+
+@plantable.group()
+def sink():
+    pass
+
+
+@sink.command()
+@click.option("--api-token", type=str, envvar="SEATABLE_API_TOKEN", required=True)
+@click.option(
+    "--dsn", type=str, envvar="POSTGRES_DSN", required=True, help="postgresql://<user>:<password>@<host>/<db>"
+)
+@click.option("-t", "--table-name", type=str, multiple=True, help="load only these tables")
+@click.option("-s", "--schema", type=str, default="public")
+@click.option("--full", is_flag=True, help="reload all rows (default: rows modified after max(_mtime) only)")
+@click.option("--page-size", type=int, default=10000)
+@click.option("--max-concurrency", type=int, default=4)
+@click.option("--log-level", type=LogLevel(), default=logging.INFO)
+def postgres(api_token, dsn, table_name, schema, full, page_size, max_concurrency, log_level):
+    import asyncio
+
+    from .client import BaseClient
+    from .sink import PostgresSink
+
+    logging.basicConfig(level=log_level)
+
+    async def _load():
+        client = await BaseClient.from_api_token(api_token=api_token)
+        # [NOTE] table 하나에 connection 하나 - asyncpg 기본 min_size (10)가 max_size보다 크지 않도록 함
+        async with PostgresSink(dsn=dsn, schema=schema, min_size=1, max_size=max_concurrency) as sink:
+            return await sink.load_base(
+                client=client,
+                table_names=list(table_name) or None,
+                incremental=not full,
+                page_size=page_size,
+                max_concurrency=max_concurrency,
+            )
+
+    for name, result in asyncio.run(_load()).items():
+        print(name, result)
+
+
+@sink.command()
+@click.option("--api-token", type=str, envvar="SEATABLE_API_TOKEN", required=True)
+@click.option("--bootstrap-servers", type=str, envvar="KAFKA_BOOTSTRAP_SERVERS", required=True)
+@click.option("-t", "--table-name", type=str, multiple=True, help="publish only these tables")
+@click.option("-f", "--format", type=click.Choice(["json", "avro"]), default="json")
+@click.option("--topic-prefix", type=str, default="plantable")
+@click.option("--compression", type=str, default="gzip")
+@click.option("--state-file", type=click.Path(dir_okay=False), default=None, help="watermarks are kept here")
+@click.option("--no-snapshot", is_flag=True, help="publish changes from now on (default: all rows first)")
+@click.option("--interval", type=float, default=60)
+@click.option("--once", is_flag=True)
+@click.option("--log-level", type=LogLevel(), default=logging.INFO)
+def kafka(
+    api_token,
+    bootstrap_servers,
+    table_name,
+    format,
+    topic_prefix,
+    compression,
+    state_file,
+    no_snapshot,
+    interval,
+    once,
+    log_level,
+):
+    import asyncio
+    import os
+
+    import orjson
+
+    from .client import BaseClient
+    from .sink.kafka import CDCPublisher, create_producer
+
+    logging.basicConfig(level=log_level)
+
+    state = dict()
+    if state_file and os.path.exists(state_file):
+        with open(state_file, "rb") as f:
+            state = orjson.loads(f.read())
+
+    def save_state(publisher):
+        if state_file:
+            with open(state_file, "wb") as f:
+                f.write(orjson.dumps(publisher.state))
+
+    async def _publish():
+        client = await BaseClient.from_api_token(api_token=api_token)
+        producer = create_producer(bootstrap_servers=bootstrap_servers.split(","), compression_type=compression)
+        publisher = CDCPublisher(
+            client=client,
+            producer=producer,
+            format=format,
+            table_names=list(table_name) or None,
+            topic_prefix=topic_prefix,
+            snapshot=not no_snapshot,
+            state=state,
+        )
+        await producer.start()
+        try:
+            while True:
+                for name, result in (await publisher.publish()).items():
+                    print(name, result)
+                save_state(publisher)
+                if once:
+                    break
+                await asyncio.sleep(interval)
+        finally:
+            save_state(publisher)
+            await producer.stop()
+
+    asyncio.run(_publish())
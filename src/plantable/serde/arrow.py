@@ -0,0 +1,32 @@
+from datetime import date, datetime
+from typing import List
+
+import pyarrow as pa
+
+from ..const import TZ
+from .deserializer import ToPython
+from .deserializer.to_python import PythonLink, PythonLinkFormula
+
+PYTHON_TO_ARROW = {
+    bool: pa.bool_(),
+    str: pa.string(),
+    int: pa.int64(),
+    float: pa.float64(),
+    date: pa.date32(),
+    datetime: pa.timestamp("us", tz=TZ.zone),
+    List[str]: pa.list_(pa.string()),
+}
+
+
+# Arrow Schema from ToPython Deserializer
+def generate_arrow_schema(deserializer: ToPython) -> pa.Schema:
+    fields = list()
+    for name, column in deserializer.columns.items():
+        _type = PYTHON_TO_ARROW.get(column.schema(), pa.string())
+        # link (is_multiple), link-formula (array)는 list로 반환
+        if isinstance(column, PythonLink) and column.is_multiple:
+            _type = pa.list_(_type)
+        if isinstance(column, PythonLinkFormula) and column.data["result_type"] == "array":
+            _type = pa.list_(_type)
+        fields.append(pa.field(name, _type))
+    return pa.schema(fields)
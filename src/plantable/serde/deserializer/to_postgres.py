@@ -291,7 +291,11 @@ class PostgresLink(ColumnDeserializer):
         self.is_multiple = self.data["is_multiple"]
 
     def schema(self):
-        return self.sub_deserializer.schema()
+        # [NOTE] multiple link는 list로 convert됨 - ARRAY로 선언해야 COPY 가능
+        column = self.sub_deserializer.schema()
+        if self.is_multiple and not isinstance(column.type, ARRAY):
+            return sa.Column(self.name, ARRAY(column.type), nullable=True)
+        return column
 
     def convert(self, x):
         x = [self.sub_deserializer(_x.get("display_value")) for _x in x]
@@ -4,12 +4,22 @@ from typing import Annotated
 from fastapi import Depends, FastAPI
 
 from . import router
-from .conf import AWS_S3_BUCKET_NAME, DEV, PROD
+from .conf import AWS_S3_BUCKET_NAME, DEV, EXPORT_DESTINATION, PROD
+from .registry import client_registry
+from .webhook import webhook_dispatcher
 from .util import generate_obj_key
 
 app = FastAPI(title="FASTO API")
 app.include_router(router.user.router)
 app.include_router(router.api_token.router)
+app.include_router(router.job.router)
+app.include_router(router.webhook.router)
+
+
+@app.on_event("shutdown")
+async def close_clients():
+    await webhook_dispatcher.close()
+    await client_registry.close()
 
 
 ################################################################
@@ -36,6 +46,7 @@ async def info_detination_s3():
     ]
     return {
         "bucket": AWS_S3_BUCKET_NAME,
+        "destination": EXPORT_DESTINATION,
         **{
             f"key {'w/' if group else 'w/o'} view group for {PROD if prod else DEV}": generate_obj_key(
                 format=format,
@@ -1,6 +1,5 @@
 import os
 
-import aioboto3
 from dasida import get_secrets
 from dotenv import load_dotenv
 
@@ -11,10 +10,19 @@ PROD = "prod"
 DEV = "dev"
 SEATABLE_VIEW_SUFFIX_TO_WATCH = "__sync"
 
+# Export Jobs
+EXPORT_MAX_WORKERS = int(os.getenv("EXPORT_MAX_WORKERS", 4))
+EXPORT_JOB_TTL = int(os.getenv("EXPORT_JOB_TTL", 3600))
+
 # AWS S3
 AWS_S3_BUCKET_NAME = os.getenv("AWS_S3_BUCKET_NAME")
 AWS_S3_BUCKET_PREFIX = os.getenv("AWS_S3_BUCKET_PREFIX")
 
+# Export Destination - s3://<bucket>/<prefix>, file:///<path>, memory://<name>
+EXPORT_DESTINATION = os.getenv("EXPORT_DESTINATION", f"s3://{AWS_S3_BUCKET_NAME or ''}")
+S3_PART_SIZE = int(os.getenv("S3_PART_SIZE", 8 * 1024 * 1024))
+S3_MAX_CONCURRENCY = int(os.getenv("S3_MAX_CONCURRENCY", 4))
+
 # From Dasida
 SM_AWS_S3 = os.getenv("SM_AWS_S3")
 if SM_AWS_S3:
@@ -25,3 +33,20 @@ if SM_AWS_S3:
     )
 else:
     AIOBOTO3_CONF = None
+
+# Webhook
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+WEBHOOK_DEBOUNCE = float(os.getenv("WEBHOOK_DEBOUNCE", 10))
+# subscription의 api token은 이 key (Fernet)로 암호화해서 redis에 보관 - 없으면 process 안에서만 보관
+WEBHOOK_SUBSCRIPTION_KEY = os.getenv("WEBHOOK_SUBSCRIPTION_KEY")
+WEBHOOK_SUBSCRIPTION_TTL = int(os.getenv("WEBHOOK_SUBSCRIPTION_TTL", 30 * 24 * 3600))
+
+# Client Registry
+CLIENT_CACHE_TTL = int(os.getenv("CLIENT_CACHE_TTL", 3600))
+CLIENT_CACHE_SIZE = int(os.getenv("CLIENT_CACHE_SIZE", 128))
+
+# Shared Cache - CACHE_REDIS_URL이 없으면 process 안에서만 cache
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+CACHE_SIZE = int(os.getenv("CACHE_SIZE", 1024))
+CACHE_TTL = int(os.getenv("CACHE_TTL", 300))
+CACHE_REALTIME = os.getenv("CACHE_REALTIME", "false").lower() in ["true", "1"]
@@ -0,0 +1,229 @@
+import asyncio
+import io
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import List
+
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ..client.base import BaseClient
+from ..const import TZ
+from ..serde.arrow import generate_arrow_schema
+from ..utils import extract_deleted_row_ids, parse_str_datetime
+from .conf import AWS_S3_BUCKET_PREFIX, DEV, PROD
+from .destination import Destination, ObjectNotFound
+
+logger = logging.getLogger()
+
+DATASET_FORMAT = "dataset"
+PARTITION_KEY = "mtime_date"
+MANIFEST = "_manifest.json"
+TOMBSTONES = "_tombstones"
+
+TOMBSTONE_SCHEMA = pa.schema(
+    [
+        pa.field("_id", pa.string()),
+        pa.field("op_type", pa.string()),
+        pa.field("op_time", pa.timestamp("us", tz=TZ.zone)),
+        pa.field("log", pa.string()),
+    ]
+)
+
+
+# Generate Dataset Prefix
+def generate_dataset_prefix(
+    prod: bool,
+    workspace_name: str,
+    base_name: str,
+    table_name: str,
+    aws_s3_bucket_prefix: str = AWS_S3_BUCKET_PREFIX,
+) -> str:
+    keys = [aws_s3_bucket_prefix, DATASET_FORMAT, PROD if prod else DEV, workspace_name, base_name, table_name]
+    return "/".join([k for k in keys if k])
+
+
+# Generate Part Filename
+def generate_part_filename(now: datetime) -> str:
+    return f"part-{now.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+
+
+# Table to Parquet Bytes
+def arrow_to_parquet(tbl: pa.Table, compression: str = "zstd") -> bytes:
+    with io.BytesIO() as buffer:
+        pq.write_table(table=tbl, where=buffer, compression=compression)
+        return buffer.getvalue()
+
+
+# Concat Tables - 파일마다 column이 다를 수 있음 (column 추가 등), 없는 column은 null로 채움
+# [NOTE] pa.concat_tables(promote_options=...)는 pyarrow 14부터 - schema를 직접 맞춤
+def concat_tables(tables: List[pa.Table]) -> pa.Table:
+    schema = pa.unify_schemas([tbl.schema for tbl in tables])
+    tables = [
+        pa.Table.from_arrays(
+            [
+                tbl[field.name].cast(field.type) if field.name in tbl.column_names else pa.nulls(len(tbl), field.type)
+                for field in schema
+            ],
+            schema=schema,
+        )
+        for tbl in tables
+    ]
+    return pa.concat_tables(tables)
+
+
+# Read Manifest
+async def read_manifest(destination: Destination, prefix: str) -> dict:
+    try:
+        content = await destination.get(f"{prefix}/{MANIFEST}")
+    except ObjectNotFound:
+        return {}
+    return orjson.loads(content)
+
+
+# Write Manifest
+async def write_manifest(destination: Destination, prefix: str, manifest: dict):
+    await destination.put(key=f"{prefix}/{MANIFEST}", content=orjson.dumps(manifest))
+
+
+# Incremental Export Table to Parquet Dataset
+# [NOTE] 마지막 watermark 이후 변경된 row만 읽어서 mtime_date 별로 새 파일 추가, 삭제는 tombstone 파일로 기록
+#  - 같은 _id가 여러 파일에 있을 수 있음 - 읽을 때 _id 별 최신 _mtime만 사용하고 tombstone의 _id는 제외
+async def table_to_dataset(
+    destination: Destination,
+    client: BaseClient,
+    table_name: str,
+    prefix: str,
+    force: bool = False,
+):
+    started_at = datetime.now(TZ)
+
+    manifest = {} if force else await read_manifest(destination=destination, prefix=prefix)
+    watermark = manifest.get("watermark")
+    deleted_since = manifest.get("deleted_since")
+
+    # read changed rows
+    rows = await client.read_table(
+        table_name=table_name, modified_after=parse_str_datetime(watermark) if watermark else None
+    )
+    deserializer = await client.get_deserializer(table_name=table_name, refresh=False)
+    schema = generate_arrow_schema(deserializer)
+
+    # write partitions
+    partitions = defaultdict(list)
+    for row in rows:
+        partitions[row["_mtime"].date().isoformat()].append(row)
+
+    filename = generate_part_filename(now=started_at)
+    coros = list()
+    for partition, records in partitions.items():
+        content = arrow_to_parquet(pa.Table.from_pylist(records, schema=schema))
+        key = f"{prefix}/{PARTITION_KEY}={partition}/{filename}"
+        coros.append(destination.put(key=key, content=content))
+
+    # write tombstones
+    deleted_row_ids = 0
+    if deleted_since:
+        logs = await client.list_table_delete_logs_since(table_name=table_name, op_time=deleted_since)
+        tombstones = [
+            {
+                "_id": row_id,
+                "op_type": log.get("op_type"),
+                "op_time": parse_str_datetime(log["op_time"]),
+                "log": orjson.dumps(log).decode(),
+            }
+            for log in logs
+            for row_id in extract_deleted_row_ids(log)
+        ]
+        if tombstones:
+            deleted_row_ids = len(tombstones)
+            content = arrow_to_parquet(pa.Table.from_pylist(tombstones, schema=TOMBSTONE_SCHEMA))
+            key = f"{prefix}/{TOMBSTONES}/{filename}"
+            coros.append(destination.put(key=key, content=content))
+
+    _ = await asyncio.gather(*coros)
+
+    # update manifest - 파일을 다 쓴 다음에 watermark 갱신
+    last_mtime = max([row["_mtime"] for row in rows]) if rows else None
+    manifest.update(
+        {
+            "watermark": last_mtime.isoformat() if last_mtime else watermark,
+            "deleted_since": started_at.isoformat(),
+            "updated_at": datetime.now(TZ).isoformat(),
+        }
+    )
+    await write_manifest(destination=destination, prefix=prefix, manifest=manifest)
+
+    return {
+        "url": destination.url(prefix),
+        "rows": len(rows),
+        "partitions": sorted(partitions),
+        "tombstones": deleted_row_ids,
+        "watermark": manifest["watermark"],
+    }
+
+
+# Compact Parquet Dataset
+# [NOTE] partition 안의 작은 파일들을 하나로 합침 - partition 안에서 _id 별 최신 _mtime만 남기고 tombstone의 _id는 제외
+async def compact_dataset(
+    destination: Destination,
+    prefix: str,
+    min_files: int = 2,
+):
+    keys = await destination.list(prefix=prefix)
+
+    # group by directory (partition or tombstones)
+    groups = defaultdict(list)
+    for key in keys:
+        if not key.endswith(".parquet"):
+            continue
+        groups[key.rsplit("/", 1)[0]].append(key)
+
+    # tombstones - {_id: 마지막 삭제 시각}
+    tombstones_directory = f"{prefix}/{TOMBSTONES}"
+    deleted = dict()
+    if groups.get(tombstones_directory):
+        contents = await asyncio.gather(*[destination.get(key) for key in groups[tombstones_directory]])
+        for content in contents:
+            for row in pq.read_table(io.BytesIO(content), columns=["_id", "op_time"]).to_pylist():
+                if row["_id"] not in deleted or row["op_time"] > deleted[row["_id"]]:
+                    deleted[row["_id"]] = row["op_time"]
+
+    compacted = dict()
+    for directory, keys in groups.items():
+        if len(keys) < min_files:
+            continue
+
+        # read
+        contents = await asyncio.gather(*[destination.get(key) for key in keys])
+        tbl = concat_tables([pq.read_table(io.BytesIO(content)) for content in contents])
+
+        # keep latest version per _id
+        if "_mtime" in tbl.column_names:
+            tbl = tbl.sort_by([("_id", "ascending"), ("_mtime", "descending")])
+            ids = tbl["_id"].to_pylist()
+            mask = [i == 0 or ids[i] != ids[i - 1] for i in range(len(ids))]
+            tbl = tbl.filter(pa.array(mask))
+
+        # drop rows deleted after their last modification - tombstone 파일은 그대로 둠 (다른 partition에도 적용)
+        if deleted and directory != tombstones_directory:
+            ids = tbl["_id"].to_pylist()
+            mtimes = tbl["_mtime"].to_pylist() if "_mtime" in tbl.column_names else [None] * len(ids)
+            mask = [
+                _id not in deleted or (mtime is not None and mtime > deleted[_id]) for _id, mtime in zip(ids, mtimes)
+            ]
+            tbl = tbl.filter(pa.array(mask, type=pa.bool_()))
+
+        # write compacted file first, then delete old files
+        key = f"{directory}/{generate_part_filename(now=datetime.now(TZ))}"
+        await destination.put(key=key, content=arrow_to_parquet(tbl))
+        _ = await asyncio.gather(*[destination.delete(k) for k in keys])
+        compacted[directory] = {"files": len(keys), "rows": tbl.num_rows, "key": key}
+
+        _msg = f"compacted {len(keys)} files into '{key}' ({tbl.num_rows} rows)."
+        logger.info(_msg)
+
+    return {"url": destination.url(prefix), "compacted": compacted}
@@ -0,0 +1,445 @@
+import asyncio
+import logging
+import os
+import uuid
+from typing import Dict, List
+from urllib.parse import urlparse
+
+import aioboto3
+import orjson
+from botocore.exceptions import ClientError
+
+from .conf import AIOBOTO3_CONF, S3_MAX_CONCURRENCY, S3_PART_SIZE
+
+logger = logging.getLogger()
+
+# [NOTE] S3 multipart upload는 마지막 part 제외하고 최소 5MB
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class ObjectNotFound(Exception):
+    pass
+
+
+class UnknownDestination(Exception):
+    pass
+
+
+# Run in Thread - python 3.8 호환 (asyncio.to_thread는 3.9부터)
+async def run_in_thread(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+################################################################
+# Destination
+################################################################
+class Destination:
+    """
+    export 결과를 쓰는 곳 - url scheme으로 선택 (get_destination)
+     - s3://<bucket>/<prefix>
+     - file:///<path> (또는 scheme 없는 path)
+     - memory://<name>
+    key는 '/'로 구분된 상대 경로.
+    """
+
+    scheme = None
+
+    def __init__(self, location: str, prefix: str = None):
+        self.location = location
+        self.prefix = prefix.strip("/") if prefix else None
+
+    def url(self, key: str = None) -> str:
+        keys = [k for k in [self.prefix, key] if k]
+        return f"{self.scheme}://{self.location}/{'/'.join(keys)}"
+
+    def _key(self, key: str) -> str:
+        return "/".join([k for k in [self.prefix, key] if k])
+
+    # open writer - async with destination.open(key) as writer: await writer.write(b"...")
+    def open(self, key: str, metadata: dict = None):
+        raise NotImplementedError
+
+    async def put(self, key: str, content: bytes, metadata: dict = None):
+        async with self.open(key=key, metadata=metadata) as writer:
+            await writer.write(content)
+        return writer.size
+
+    async def get(self, key: str) -> bytes:
+        raise NotImplementedError
+
+    # metadata, None if not exists
+    async def head(self, key: str) -> dict:
+        raise NotImplementedError
+
+    async def list(self, prefix: str = None) -> List[str]:
+        raise NotImplementedError
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+
+################################################################
+# S3
+################################################################
+# S3 Multipart Upload
+class S3MultipartUpload:
+    def __init__(
+        self, client, bucket: str, key: str, metadata: dict = None, max_concurrency: int = S3_MAX_CONCURRENCY
+    ):
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.metadata = metadata or {}
+
+        self.upload_id = None
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.tasks = list()
+        self.size = 0
+
+    async def __aenter__(self):
+        response = await self.client.create_multipart_upload(Bucket=self.bucket, Key=self.key, Metadata=self.metadata)
+        self.upload_id = response["UploadId"]
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            try:
+                parts = await asyncio.gather(*self.tasks)
+                await self.client.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=self.key,
+                    UploadId=self.upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+                return
+            except Exception as ex:
+                exc = ex
+        for task in self.tasks:
+            task.cancel()
+        _ = await asyncio.gather(*self.tasks, return_exceptions=True)
+        await self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+        _msg = f"multipart upload aborted - bucket '{self.bucket}', key '{self.key}': {exc}"
+        logger.error(_msg)
+        if exc_type is None:
+            raise exc
+
+    # upload part in background - max_concurrency 만큼 upload 중이면 자리가 날 때까지 대기
+    async def upload_part(self, content: bytes):
+        await self.semaphore.acquire()
+        part_number = len(self.tasks) + 1
+        self.size += len(content)
+        self.tasks.append(asyncio.ensure_future(self._upload_part(part_number=part_number, content=content)))
+
+    async def _upload_part(self, part_number: int, content: bytes):
+        try:
+            response = await self.client.upload_part(
+                Bucket=self.bucket, Key=self.key, PartNumber=part_number, UploadId=self.upload_id, Body=content
+            )
+        finally:
+            self.semaphore.release()
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+
+# S3 Writer - part_size 만큼 모이면 upload
+class S3Writer:
+    def __init__(self, destination: "S3Destination", key: str, metadata: dict = None):
+        self.destination = destination
+        self.key = key
+        self.metadata = metadata
+
+        self.buffer = bytearray()
+        self.size = 0
+        self._client = None
+        self._upload = None
+
+    async def __aenter__(self):
+        self._client = await self.destination.session.client("s3").__aenter__()
+        self._upload = S3MultipartUpload(
+            client=self._client,
+            bucket=self.destination.bucket,
+            key=self.key,
+            metadata=self.metadata,
+            max_concurrency=self.destination.max_concurrency,
+        )
+        await self._upload.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            # last part
+            if exc_type is None:
+                await self._upload.upload_part(bytes(self.buffer))
+                self.buffer = bytearray()
+            await self._upload.__aexit__(exc_type, exc, tb)
+        finally:
+            await self._client.__aexit__(None, None, None)
+
+    async def write(self, content: bytes):
+        self.buffer += content
+        self.size += len(content)
+        part_size = self.destination.part_size
+        while len(self.buffer) >= part_size:
+            await self._upload.upload_part(bytes(self.buffer[:part_size]))
+            del self.buffer[:part_size]
+
+
+class S3Destination(Destination):
+    scheme = "s3"
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = None,
+        part_size: int = S3_PART_SIZE,
+        max_concurrency: int = S3_MAX_CONCURRENCY,
+        aioboto3_conf: dict = None,
+    ):
+        super().__init__(location=bucket, prefix=prefix)
+        self.bucket = bucket
+        self.part_size = max(part_size, S3_MIN_PART_SIZE)
+        self.max_concurrency = max_concurrency
+        self.aioboto3_conf = aioboto3_conf if aioboto3_conf is not None else AIOBOTO3_CONF
+
+        self._session = None
+
+    @property
+    def session(self):
+        # [NOTE] 처음 사용할 때 생성 - conf 없으면 기본 credential chain 사용
+        if self._session is None:
+            self._session = aioboto3.Session(**(self.aioboto3_conf or {}))
+        return self._session
+
+    def open(self, key: str, metadata: dict = None):
+        return S3Writer(destination=self, key=self._key(key), metadata=metadata)
+
+    async def put(self, key: str, content: bytes, metadata: dict = None):
+        # 작은 object는 multipart 없이 한 번에
+        if len(content) >= self.part_size:
+            return await super().put(key=key, content=content, metadata=metadata)
+        async with self.session.client("s3") as client:
+            await client.put_object(Bucket=self.bucket, Key=self._key(key), Body=content, Metadata=metadata or {})
+        return len(content)
+
+    async def get(self, key: str) -> bytes:
+        async with self.session.client("s3") as client:
+            try:
+                response = await client.get_object(Bucket=self.bucket, Key=self._key(key))
+            except ClientError as ex:
+                if ex.response["Error"]["Code"] in ["404", "NoSuchKey", "NotFound"]:
+                    raise ObjectNotFound(self.url(key))
+                raise ex
+            return await response["Body"].read()
+
+    async def head(self, key: str) -> dict:
+        async with self.session.client("s3") as client:
+            try:
+                response = await client.head_object(Bucket=self.bucket, Key=self._key(key))
+            except ClientError as ex:
+                if ex.response["Error"]["Code"] in ["404", "NoSuchKey", "NotFound"]:
+                    return None
+                raise ex
+        return response.get("Metadata") or {}
+
+    async def list(self, prefix: str = None) -> List[str]:
+        _prefix = self._key(prefix)
+        keys = list()
+        async with self.session.client("s3") as client:
+            paginator = client.get_paginator("list_objects_v2")
+            async for page in paginator.paginate(Bucket=self.bucket, Prefix=f"{_prefix}/" if _prefix else ""):
+                keys += [obj["Key"] for obj in page.get("Contents", [])]
+        if self.prefix:
+            keys = [key[len(self.prefix) + 1 :] for key in keys]
+        return keys
+
+    async def delete(self, key: str):
+        async with self.session.client("s3") as client:
+            await client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+
+################################################################
+# Local Filesystem
+################################################################
+# Local Writer - 임시 파일에 쓰고 끝나면 rename (atomic)
+class LocalWriter:
+    def __init__(self, destination: "LocalDestination", path: str, metadata: dict = None):
+        self.destination = destination
+        self.path = path
+        self.metadata = metadata
+
+        dirname, basename = os.path.split(path)
+        self.tmp_path = os.path.join(dirname, f".{basename}.{uuid.uuid4().hex[:8]}.tmp")
+        self.size = 0
+        self._file = None
+
+    async def __aenter__(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.tmp_path, "wb")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._file.close()
+        if exc_type is not None:
+            os.remove(self.tmp_path)
+            return
+        if self.metadata:
+            await run_in_thread(self.destination._write_metadata, self.path, self.metadata)
+        os.replace(self.tmp_path, self.path)
+
+    async def write(self, content: bytes):
+        await run_in_thread(self._file.write, content)
+        self.size += len(content)
+
+
+class LocalDestination(Destination):
+    scheme = "file"
+
+    def __init__(self, root: str, prefix: str = None):
+        super().__init__(location=os.path.abspath(root), prefix=prefix)
+        self.root = self.location
+
+    def url(self, key: str = None) -> str:
+        return f"{self.scheme}://{self._path(key)}"
+
+    def _path(self, key: str = None) -> str:
+        _key = self._key(key)
+        return os.path.join(self.root, *_key.split("/")) if _key else self.root
+
+    # [NOTE] metadata는 '.'으로 시작하는 sidecar 파일에 저장 - spark 등은 '.', '_'로 시작하는 파일 무시
+    @staticmethod
+    def _metadata_path(path: str) -> str:
+        dirname, basename = os.path.split(path)
+        return os.path.join(dirname, f".{basename}.metadata.json")
+
+    def _write_metadata(self, path: str, metadata: dict):
+        metadata_path = self._metadata_path(path)
+        tmp_path = f"{metadata_path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(metadata))
+        os.replace(tmp_path, metadata_path)
+
+    def open(self, key: str, metadata: dict = None):
+        return LocalWriter(destination=self, path=self._path(key), metadata=metadata)
+
+    async def get(self, key: str) -> bytes:
+        path = self._path(key)
+        if not os.path.isfile(path):
+            raise ObjectNotFound(self.url(key))
+        with open(path, "rb") as f:
+            return await run_in_thread(f.read)
+
+    async def head(self, key: str) -> dict:
+        path = self._path(key)
+        if not os.path.isfile(path):
+            return None
+        metadata_path = self._metadata_path(path)
+        if not os.path.isfile(metadata_path):
+            return {}
+        with open(metadata_path, "rb") as f:
+            return orjson.loads(f.read())
+
+    async def list(self, prefix: str = None) -> List[str]:
+        root = self._path(prefix)
+        keys = list()
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.startswith("."):
+                    continue
+                relpath = os.path.relpath(os.path.join(dirpath, filename), self._path())
+                keys.append(relpath.replace(os.sep, "/"))
+        return sorted(keys)
+
+    async def delete(self, key: str):
+        path = self._path(key)
+        for _path in [path, self._metadata_path(path)]:
+            if os.path.isfile(_path):
+                os.remove(_path)
+
+
+################################################################
+# Memory
+################################################################
+# Memory Writer
+class MemoryWriter:
+    def __init__(self, destination: "MemoryDestination", key: str, metadata: dict = None):
+        self.destination = destination
+        self.key = key
+        self.metadata = metadata
+
+        self.buffer = bytearray()
+        self.size = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.destination.objects[self.key] = (bytes(self.buffer), dict(self.metadata or {}))
+
+    async def write(self, content: bytes):
+        self.buffer += content
+        self.size += len(content)
+
+
+class MemoryDestination(Destination):
+    scheme = "memory"
+
+    # [NOTE] 같은 이름이면 같은 저장소 공유
+    STORES: Dict[str, dict] = dict()
+
+    def __init__(self, name: str = "default", prefix: str = None):
+        super().__init__(location=name, prefix=prefix)
+        self.objects = self.STORES.setdefault(name, dict())  # {key: (content, metadata)}
+
+    def open(self, key: str, metadata: dict = None):
+        return MemoryWriter(destination=self, key=self._key(key), metadata=metadata)
+
+    async def get(self, key: str) -> bytes:
+        _key = self._key(key)
+        if _key not in self.objects:
+            raise ObjectNotFound(self.url(key))
+        return self.objects[_key][0]
+
+    async def head(self, key: str) -> dict:
+        _key = self._key(key)
+        if _key not in self.objects:
+            return None
+        return self.objects[_key][1]
+
+    async def list(self, prefix: str = None) -> List[str]:
+        _prefix = self._key(prefix)
+        keys = [key for key in self.objects if not _prefix or key.startswith(f"{_prefix}/")]
+        if self.prefix:
+            keys = [key[len(self.prefix) + 1 :] for key in keys]
+        return sorted(keys)
+
+    async def delete(self, key: str):
+        self.objects.pop(self._key(key), None)
+
+
+################################################################
+# Get Destination
+################################################################
+DESTINATIONS = {
+    S3Destination.scheme: S3Destination,
+    LocalDestination.scheme: LocalDestination,
+    MemoryDestination.scheme: MemoryDestination,
+}
+
+
+def get_destination(url: str, **kwargs) -> Destination:
+    """
+    url scheme으로 destination 생성.
+     - kwargs는 destination에 전달 (e.g. S3의 part_size, max_concurrency)
+    """
+    parsed = urlparse(url)
+    scheme = parsed.scheme or LocalDestination.scheme
+
+    if scheme not in DESTINATIONS:
+        _msg = f"unknown destination scheme '{scheme}' - available schemes are {list(DESTINATIONS)}."
+        raise UnknownDestination(_msg)
+
+    if scheme == LocalDestination.scheme:
+        return LocalDestination(root=parsed.path if parsed.scheme else url, **kwargs)
+    if scheme == S3Destination.scheme:
+        return S3Destination(bucket=parsed.netloc, prefix=parsed.path, **kwargs)
+    return MemoryDestination(name=parsed.netloc or "default", prefix=parsed.path, **kwargs)
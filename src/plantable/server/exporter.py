@@ -0,0 +1,341 @@
+import csv
+import gzip
+import io
+import logging
+from datetime import date, datetime
+from typing import Callable, List
+
+import fastavro
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ..client.base import BaseClient
+from ..serde.arrow import generate_arrow_schema
+from .destination import Destination
+from .util import META_LAST_MTIME, META_ROW_COUNT, PARQUET_ROW_GROUP_SIZE, PartBuffer, get_source_state
+
+logger = logging.getLogger()
+
+SNAPSHOT_MANIFEST = "_metadata.json"
+
+
+class UnknownFormat(Exception):
+    pass
+
+
+################################################################
+# Exporter
+################################################################
+class Exporter:
+    """
+    schema (generate_arrow_schema) 기반으로 rows를 encoding.
+     - write(rows)는 지금까지 encoding된 bytes를 반환 (없으면 b"")
+     - close()는 남은 bytes (footer 등)를 반환
+    """
+
+    format = None
+    extension = None
+    content_type = "application/octet-stream"
+
+    def __init__(self, schema: pa.Schema):
+        self.schema = schema
+        self.sink = PartBuffer()
+
+    def write(self, rows: List[dict]) -> bytes:
+        raise NotImplementedError
+
+    def close(self) -> bytes:
+        raise NotImplementedError
+
+    # bytes written so far (including bytes not taken yet)
+    def tell(self) -> int:
+        return self.sink.tell()
+
+
+# Parquet
+class ParquetExporter(Exporter):
+    format = "parquet"
+    extension = "parquet"
+
+    def __init__(
+        self,
+        schema: pa.Schema,
+        compression: str = "zstd",
+        compression_level: int = None,
+        row_group_size: int = PARQUET_ROW_GROUP_SIZE,
+        use_dictionary: bool = True,
+        version: str = "2.6",
+    ):
+        super().__init__(schema=schema)
+        self.row_group_size = row_group_size
+        self.writer = pq.ParquetWriter(
+            self.sink,
+            schema=schema,
+            compression=compression,
+            compression_level=compression_level,
+            use_dictionary=use_dictionary,
+            version=version,
+        )
+        self.records = list()
+
+    def write(self, rows: List[dict]) -> bytes:
+        # [NOTE] row group 크기가 작으면 압축률, read 성능 모두 나빠짐 - row_group_size까지 모아서 씀
+        self.records += rows
+        if len(self.records) >= self.row_group_size:
+            self.writer.write_table(pa.Table.from_pylist(self.records, schema=self.schema))
+            self.records = list()
+        return self.sink.take()
+
+    def close(self) -> bytes:
+        if self.records:
+            self.writer.write_table(pa.Table.from_pylist(self.records, schema=self.schema))
+            self.records = list()
+        self.writer.close()
+        return self.sink.take()
+
+
+# Arrow IPC (Feather V2)
+class ArrowExporter(Exporter):
+    format = "arrow"
+    extension = "arrow"
+    content_type = "application/vnd.apache.arrow.file"
+
+    def __init__(self, schema: pa.Schema, compression: str = "zstd"):
+        super().__init__(schema=schema)
+        self.writer = pa.ipc.new_file(
+            self.sink, schema=schema, options=pa.ipc.IpcWriteOptions(compression=compression)
+        )
+
+    def write(self, rows: List[dict]) -> bytes:
+        if rows:
+            self.writer.write_table(pa.Table.from_pylist(rows, schema=self.schema))
+        return self.sink.take()
+
+    def close(self) -> bytes:
+        self.writer.close()
+        return self.sink.take()
+
+
+# Avro Object Container File
+class AvroExporter(Exporter):
+    format = "avro"
+    extension = "avro"
+    content_type = "application/avro"
+
+    def __init__(self, schema: pa.Schema, compression: str = "deflate", name: str = "row"):
+        super().__init__(schema=schema)
+        self.avro_schema = fastavro.parse_schema(generate_avro_schema(schema, name=name))
+        self.writer = fastavro.write.Writer(self.sink, self.avro_schema, codec=compression or "null")
+
+    def write(self, rows: List[dict]) -> bytes:
+        for row in rows:
+            self.writer.write(row)
+        # [NOTE] block 단위로 씀 - flush하지 않으면 sync_interval까지 writer 내부에 쌓임
+        self.writer.flush()
+        return self.sink.take()
+
+    def close(self) -> bytes:
+        self.writer.flush()
+        return self.sink.take()
+
+
+# CSV (gzip)
+class CsvExporter(Exporter):
+    format = "csv"
+    extension = "csv.gz"
+    content_type = "application/gzip"
+
+    def __init__(self, schema: pa.Schema, compression: str = "gzip", compression_level: int = 6):
+        if compression not in ["gzip", None]:
+            _msg = f"csv supports 'gzip' compression only, not '{compression}'."
+            raise KeyError(_msg)
+        super().__init__(schema=schema)
+        self.gzip = (
+            gzip.GzipFile(fileobj=self.sink, mode="wb", compresslevel=compression_level) if compression else None
+        )
+        self.text = io.TextIOWrapper(self.gzip or self.sink, encoding="utf-8", newline="", write_through=True)
+        self.writer = csv.DictWriter(self.text, fieldnames=schema.names, extrasaction="ignore")
+        self.writer.writeheader()
+
+    @staticmethod
+    def _serialize(value):
+        if value is None:
+            return None
+        if isinstance(value, (list, dict)):
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        return value
+
+    def write(self, rows: List[dict]) -> bytes:
+        self.writer.writerows([{k: self._serialize(v) for k, v in row.items()} for row in rows])
+        return self.sink.take()
+
+    def close(self) -> bytes:
+        self.text.flush()
+        self.text.detach()
+        if self.gzip:
+            self.gzip.close()
+        return self.sink.take()
+
+
+EXPORTERS = {
+    ParquetExporter.format: ParquetExporter,
+    ArrowExporter.format: ArrowExporter,
+    AvroExporter.format: AvroExporter,
+    CsvExporter.format: CsvExporter,
+}
+
+
+################################################################
+# Helpers
+################################################################
+# Get Exporter Class
+def get_exporter(format: str) -> Exporter:
+    if format not in EXPORTERS:
+        _msg = f"unknown format '{format}' - available formats are {list(EXPORTERS)}."
+        raise UnknownFormat(_msg)
+    return EXPORTERS[format]
+
+
+# Avro Type from Arrow Type
+def arrow_to_avro_type(_type: pa.DataType):
+    if pa.types.is_boolean(_type):
+        return "boolean"
+    if pa.types.is_integer(_type):
+        return "long"
+    if pa.types.is_floating(_type):
+        return "double"
+    if pa.types.is_date(_type):
+        return {"type": "int", "logicalType": "date"}
+    if pa.types.is_timestamp(_type):
+        return {"type": "long", "logicalType": "timestamp-micros"}
+    if pa.types.is_list(_type):
+        return {"type": "array", "items": ["null", arrow_to_avro_type(_type.value_type)]}
+    return "string"
+
+
+# Avro Schema from Arrow Schema - _id 외에는 모두 nullable
+def generate_avro_schema(schema: pa.Schema, name: str = "row") -> dict:
+    fields = list()
+    for field in schema:
+        _type = arrow_to_avro_type(field.type)
+        if field.name != "_id":
+            fields.append({"name": field.name, "type": ["null", _type], "default": None})
+        else:
+            fields.append({"name": field.name, "type": _type})
+    return {"type": "record", "name": name, "fields": fields}
+
+
+################################################################
+# Export
+################################################################
+# Stream View to Destination
+# [NOTE] page 단위로 읽어서 encoding, 쓰여진 bytes는 바로 destination으로 - 메모리는 row group 하나 수준
+async def export_view(
+    destination: Destination,
+    client: BaseClient,
+    table_name: str,
+    view_name: str,
+    key: str,
+    format: str = "parquet",
+    progress: Callable[[int, int], None] = None,
+    force: bool = False,
+    **options,
+):
+    Exporter = get_exporter(format)
+
+    # skip if unchanged - source table의 last _mtime, row 수가 마지막 export와 같으면 skip
+    source_state = await get_source_state(client=client, table_name=table_name)
+    if not force:
+        metadata = await destination.head(key)
+        exported_state = {k: metadata.get(k) for k in [META_LAST_MTIME, META_ROW_COUNT]} if metadata else None
+        if exported_state == source_state:
+            _msg = (
+                f"skip export - '{destination.url(key)}' is up to date (last mtime: {source_state[META_LAST_MTIME]})."
+            )
+            logger.info(_msg)
+            return {"url": destination.url(key), "skipped": True, "last_mtime": source_state[META_LAST_MTIME]}
+
+    deserializer = await client.get_deserializer(table_name=table_name)
+    exporter = Exporter(schema=generate_arrow_schema(deserializer), **options)
+
+    num_rows = 0
+    async with destination.open(key=key, metadata=source_state) as writer:
+        async for rows in client.iter_view(table_name=table_name, view_name=view_name, deserializer=deserializer):
+            num_rows += len(rows)
+            await writer.write(exporter.write(rows))
+            if progress:
+                progress(num_rows, exporter.tell())
+        await writer.write(exporter.close())
+    if progress:
+        progress(num_rows, writer.size)
+
+    return {
+        "url": destination.url(key),
+        "format": format,
+        "size": writer.size,
+        "rows": num_rows,
+        "skipped": False,
+        "last_mtime": source_state[META_LAST_MTIME],
+    }
+
+
+# Snapshot Base to Destination
+# [NOTE] table 별 파일을 모두 쓴 다음 마지막에 _metadata.json을 씀 - _metadata.json이 있어야 완전한 snapshot
+async def export_base(
+    destination: Destination,
+    client: BaseClient,
+    prefix: str,
+    format: str = "parquet",
+    table_names: List[str] = None,
+    max_concurrency: int = 4,
+    progress: Callable[[int, int], None] = None,
+    **options,
+):
+    Exporter = get_exporter(format)
+    total = {"rows": 0, "bytes": 0}
+
+    async def write_table(table_name: str, deserializer, pages):
+        exporter = Exporter(schema=generate_arrow_schema(deserializer), **options)
+        key = f"{prefix}/{table_name}.{Exporter.extension}"
+        num_rows = 0
+        async with destination.open(key=key) as writer:
+            async for rows in pages:
+                num_rows += len(rows)
+                await writer.write(exporter.write(rows))
+                total["rows"] += len(rows)
+                if progress:
+                    progress(total["rows"], total["bytes"] + writer.size)
+            await writer.write(exporter.close())
+        total["bytes"] += writer.size
+        return {"key": key, "rows": num_rows, "size": writer.size}
+
+    snapshot = await client.snapshot_base(
+        table_names=table_names, consumer=write_table, max_concurrency=max_concurrency
+    )
+
+    # metadata
+    manifest = {
+        "base_uuid": client.dtable_uuid,
+        "workspace_id": client.workspace_id,
+        "base_name": client.base_name,
+        "format": format,
+        "started_at": snapshot["started_at"],
+        "finished_at": snapshot["finished_at"],
+        "tables": snapshot["tables"],
+        "metadata": snapshot["metadata"].dict(by_alias=True),
+        "collaborators": [c.dict() for c in snapshot["collaborators"]],
+    }
+    await destination.put(key=f"{prefix}/{SNAPSHOT_MANIFEST}", content=orjson.dumps(manifest))
+    if progress:
+        progress(total["rows"], total["bytes"])
+
+    return {
+        "url": destination.url(prefix),
+        "format": format,
+        "tables": len(snapshot["tables"]),
+        "rows": total["rows"],
+        "size": total["bytes"],
+    }
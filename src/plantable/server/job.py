@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict
+
+import aiohttp
+from pydantic import BaseModel, Field
+
+from ..client.core import HttpClient
+from .conf import EXPORT_JOB_TTL, EXPORT_MAX_WORKERS
+from .registry import client_registry
+
+logger = logging.getLogger()
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+################################################################
+# Models
+################################################################
+class Job(BaseModel):
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    name: str = None
+    status: str = QUEUED
+    rows: int = 0
+    bytes: int = 0
+    result: Any = None
+    error: str = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: datetime = None
+    finished_at: datetime = None
+
+    def is_finished(self):
+        return self.status in [DONE, FAILED]
+
+    def update_progress(self, rows: int, bytes: int):
+        self.rows = rows
+        self.bytes = bytes
+
+
+################################################################
+# JobQueue
+################################################################
+class JobQueue:
+    """
+    export 같은 오래 걸리는 작업을 HTTP request 밖에서 실행.
+     - 동시 실행 수는 max_workers로 제한
+     - 같은 key의 작업이 진행 중이면 새로 만들지 않고 진행 중인 job 반환 (dedupe)
+     - 끝난 job은 ttl 초 동안 보관
+     - client를 넘기면 job이 끝날 때까지 lease를 잡음 - 401이면 client_registry에서 invalidate
+     - job은 submit한 client의 credential hash로만 조회 가능
+    """
+
+    def __init__(self, max_workers: int = EXPORT_MAX_WORKERS, ttl: int = EXPORT_JOB_TTL):
+        self.max_workers = max_workers
+        self.ttl = ttl
+
+        self.jobs: Dict[str, Job] = dict()
+        self.in_flight: Dict[tuple, str] = dict()  # {key: job_id}
+        self.tasks = dict()
+        self.owners: Dict[str, set] = dict()  # {job_id: {credential hash}}
+        self._semaphore = None
+
+    @property
+    def semaphore(self):
+        # [NOTE] event loop 안에서 생성
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        return self._semaphore
+
+    # Submit
+    def submit(
+        self, key: tuple, func: Callable[[Job], Awaitable[Any]], name: str = None, client: HttpClient = None
+    ) -> Job:
+        self.evict()
+        owner = client_registry.get_key(client) if client is not None else None
+
+        if key in self.in_flight:
+            job_id = self.in_flight[key]
+            if owner is not None:
+                self.owners[job_id].add(owner)
+            return self.jobs[job_id]
+
+        job = Job(name=name)
+        self.jobs[job.id] = job
+        self.in_flight[key] = job.id
+        self.owners[job.id] = {owner} if owner is not None else set()
+        # [NOTE] 대기 중에 evict되어도 session이 닫히지 않도록 submit할 때 lease를 잡음
+        if client is not None:
+            client_registry.acquire(client)
+        self.tasks[job.id] = asyncio.ensure_future(self._run(key=key, job=job, func=func, client=client))
+
+        return job
+
+    # Get
+    def get(self, job_id: str, owner: str) -> Job:
+        self.evict()
+        if owner not in self.owners.get(job_id, set()):
+            return None
+        return self.jobs.get(job_id)
+
+    # List
+    def list_jobs(self, owner: str):
+        self.evict()
+        return [job for job_id, job in self.jobs.items() if owner in self.owners.get(job_id, set())]
+
+    # Evict Expired Jobs
+    def evict(self):
+        now = datetime.now()
+        expired = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.is_finished() and (now - job.finished_at).total_seconds() > self.ttl
+        ]
+        for job_id in expired:
+            self.jobs.pop(job_id)
+            self.owners.pop(job_id, None)
+
+    async def _run(self, key: tuple, job: Job, func: Callable[[Job], Awaitable[Any]], client: HttpClient = None):
+        try:
+            async with self.semaphore:
+                job.status = RUNNING
+                job.started_at = datetime.now()
+                job.result = await func(job)
+                job.status = DONE
+        except aiohttp.ClientResponseError as ex:
+            # 401이면 다음 요청에서 다시 인증
+            if ex.status == 401 and client is not None:
+                await client_registry.invalidate_client(client)
+            self._fail(job=job, ex=ex)
+        except Exception as ex:
+            self._fail(job=job, ex=ex)
+        finally:
+            job.finished_at = datetime.now()
+            self.in_flight.pop(key, None)
+            self.tasks.pop(job.id, None)
+            if client is not None:
+                client_registry.release(client)
+
+    @staticmethod
+    def _fail(job: Job, ex: Exception):
+        job.status = FAILED
+        job.error = str(ex)
+        _msg = f"job '{job.name}' ({job.id}) failed: {ex}"
+        logger.error(_msg)
+
+
+job_queue = JobQueue()
@@ -0,0 +1,219 @@
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import aiohttp
+
+from ..cache import LRUCache, RedisCache, TieredCache
+from ..client import BaseClient, UserClient
+from ..client.core import HttpClient
+from ..realtime import RealtimeListener
+from .conf import CACHE_REALTIME, CACHE_REDIS_URL, CACHE_SIZE, CACHE_TTL, CLIENT_CACHE_SIZE, CLIENT_CACHE_TTL
+
+logger = logging.getLogger()
+
+# lease 없이 사용 중일 수 있는 evict된 client의 session은 잠시 기다렸다가 닫음
+SESSION_CLOSE_DELAY = 60
+
+
+# Hash Credential - credential 원문은 key로 보관하지 않음
+def hash_credential(*credential: str) -> str:
+    return hashlib.sha256("\x00".join(credential).encode()).hexdigest()
+
+
+################################################################
+# ClientRegistry
+################################################################
+class ClientRegistry:
+    """
+    request마다 client를 만들고 (blocking) 인증하지 않도록 credential hash 별로 client를 재사용.
+     - client는 async로 인증하고 pooled session을 열어둠
+     - ttl 초가 지나거나 max_size를 넘으면 (LRU) evict하면서 session을 닫음
+     - request, job은 lease를 잡고 사용 - evict되어도 lease가 모두 반납된 뒤에 session을 닫음
+     - base token은 만료되었을 때만 다시 발급, 401이면 invalidate
+     - base token, metadata, collaborators, row id map은 cache로 worker 간 공유
+     - realtime이면 base client 별로 socket.io listener를 띄워서 cache를 바로 갱신
+    """
+
+    def __init__(
+        self,
+        ttl: int = CLIENT_CACHE_TTL,
+        max_size: int = CLIENT_CACHE_SIZE,
+        cache: TieredCache = None,
+        realtime: bool = False,
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.cache = cache
+        self.realtime = realtime
+
+        self.clients = OrderedDict()  # {key: (client, created_at)}
+        self.locks = dict()
+        self.listeners = dict()  # {key: listener}
+        self.leases = dict()  # {id(client): count}
+        self.retired = dict()  # {id(client): client} - evict되었지만 lease가 남아 있는 client
+
+    # Get Base Client
+    async def get_base_client(self, api_token: str) -> BaseClient:
+        key = hash_credential("api-token", api_token)
+
+        async def create():
+            return await BaseClient.from_api_token(api_token=api_token, cache=self.cache)
+
+        client = await self._get_or_create(key=key, create=create)
+
+        # re-authenticate only on expiry
+        if client.is_base_token_expired():
+            await client.refresh_base_token()
+
+        if self.realtime and key not in self.listeners:
+            self._start_listener(key=key, client=client)
+
+        return client
+
+    # Get User Client
+    async def get_user_client(self, username: str, password: str) -> UserClient:
+        key = hash_credential("user", username, password)
+
+        async def create():
+            client = UserClient(seatable_username=username, seatable_password=password, auto_login=False)
+            await client.async_login()
+            return client
+
+        return await self._get_or_create(key=key, create=create)
+
+    # Invalidate
+    async def invalidate(self, key: str, delay: float = SESSION_CLOSE_DELAY):
+        if key in self.clients:
+            client, _ = self.clients.pop(key)
+            self._close(client, delay=delay)
+        await self._stop_listener(key)
+
+    # Invalidate Client
+    async def invalidate_client(self, client: HttpClient):
+        if self.cache and isinstance(client, BaseClient) and client.api_token:
+            await self.cache.delete_base_token(api_token=client.api_token)
+        key = self.get_key(client)
+        if key is not None:
+            await self.invalidate(key)
+
+    # Get Credential Hash of Client
+    def get_key(self, client: HttpClient) -> str:
+        for key, (_client, _) in self.clients.items():
+            if _client is client:
+                return key
+
+    # Acquire Lease
+    def acquire(self, client: HttpClient):
+        self.leases[id(client)] = self.leases.get(id(client), 0) + 1
+
+    # Release Lease - 마지막 lease가 반납되면 evict된 client의 session을 닫음
+    def release(self, client: HttpClient):
+        count = self.leases.get(id(client), 0) - 1
+        if count > 0:
+            self.leases[id(client)] = count
+            return
+        self.leases.pop(id(client), None)
+        if id(client) in self.retired:
+            self._close(self.retired.pop(id(client)))
+
+    # Lease - 401이면 invalidate해서 다음 요청에서 다시 인증
+    @asynccontextmanager
+    async def lease(self, client: HttpClient):
+        self.acquire(client)
+        try:
+            yield client
+        except aiohttp.ClientResponseError as ex:
+            if ex.status == 401:
+                await self.invalidate_client(client)
+            raise ex
+        finally:
+            self.release(client)
+
+    # Close All
+    async def close(self):
+        clients = [client for client, _ in self.clients.values()] + list(self.retired.values())
+        self.clients.clear()
+        self.retired.clear()
+        await asyncio.gather(*[self._stop_listener(key) for key in list(self.listeners)], return_exceptions=True)
+        await asyncio.gather(*[client.close_session() for client in clients], return_exceptions=True)
+        if self.cache:
+            await self.cache.close()
+
+    async def _get_or_create(self, key: str, create):
+        await self._evict()
+
+        if key in self.clients:
+            self.clients.move_to_end(key)
+            return self.clients[key][0]
+
+        # 같은 credential로 동시에 들어온 요청은 한 번만 인증
+        if key not in self.locks:
+            self.locks[key] = asyncio.Lock()
+        async with self.locks[key]:
+            if key in self.clients:
+                self.clients.move_to_end(key)
+                return self.clients[key][0]
+            client = await create()
+            await client.open_session()
+            self.clients[key] = (client, datetime.now())
+        self.locks.pop(key, None)
+
+        await self._evict()
+
+        return client
+
+    async def _evict(self):
+        now = datetime.now()
+        expired = [
+            key for key, (_, created_at) in self.clients.items() if (now - created_at).total_seconds() > self.ttl
+        ]
+        for key in expired:
+            await self.invalidate(key)
+        while len(self.clients) > self.max_size:
+            key, (client, _) = self.clients.popitem(last=False)
+            self._close(client, delay=SESSION_CLOSE_DELAY)
+            await self._stop_listener(key)
+
+    def _start_listener(self, key: str, client: BaseClient):
+        listener = RealtimeListener(client=client, cache=self.cache)
+        self.listeners[key] = listener
+
+        def _on_done(task: asyncio.Task):
+            if not task.cancelled() and task.exception():
+                _msg = f"realtime listener failed - base '{client.dtable_uuid}': {task.exception()}"
+                logger.warning(_msg)
+                if self.listeners.get(key) is listener:
+                    self.listeners.pop(key)
+
+        task = asyncio.ensure_future(listener.connect(wait=False))
+        task.add_done_callback(_on_done)
+
+    async def _stop_listener(self, key: str):
+        listener = self.listeners.pop(key, None)
+        if listener:
+            await listener.close()
+
+    def _close(self, client: HttpClient, delay: float = 0):
+        # [NOTE] lease가 남아 있으면 release에서 닫음
+        if id(client) in self.leases:
+            self.retired[id(client)] = client
+            return
+
+        def _on_done(task: asyncio.Task):
+            if not task.cancelled() and task.exception():
+                _msg = f"close client session failed: {task.exception()}"
+                logger.warning(_msg)
+
+        task = asyncio.ensure_future(client.close_session(delay=delay))
+        task.add_done_callback(_on_done)
+
+
+client_cache = TieredCache(
+    local=LRUCache(max_size=CACHE_SIZE, ttl=CACHE_TTL),
+    remote=RedisCache(url=CACHE_REDIS_URL, ttl=CACHE_TTL) if CACHE_REDIS_URL else None,
+)
+client_registry = ClientRegistry(cache=client_cache, realtime=CACHE_REALTIME)
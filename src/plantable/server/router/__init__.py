@@ -1 +1 @@
-from . import api_token, user
+from . import api_token, job, user, webhook
@@ -1,12 +1,19 @@
-import aioboto3
-from fastapi import APIRouter, Depends
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import APIKeyHeader
 
 from ...client import BaseClient
-from ..conf import AIOBOTO3_CONF
-from ..util import upload_to_s3, view_to_parquet
+from ...const import TZ
+from ..conf import EXPORT_DESTINATION
+from ..dataset import compact_dataset, generate_dataset_prefix, table_to_dataset
+from ..destination import get_destination
+from ..exporter import UnknownFormat, export_base, export_view, get_exporter
+from ..job import Job, job_queue
+from ..registry import client_registry
+from ..util import generate_obj_key, generate_snapshot_prefix
 
-session = aioboto3.Session(**AIOBOTO3_CONF)
+destination = get_destination(EXPORT_DESTINATION)
 router = APIRouter(prefix="/api-token", tags=["ApiTokenClient"])
 
 api_key_header = APIKeyHeader(name="Token")
@@ -16,8 +23,10 @@ api_key_header = APIKeyHeader(name="Token")
 # Basic Auth
 ################################################################
 async def get_base_client(api_token: str = Depends(api_key_header)) -> BaseClient:
-    bc = BaseClient(api_token=api_token)
-    return bc
+    bc = await client_registry.get_base_client(api_token=api_token)
+    # 401이면 다음 요청에서 다시 인증
+    async with client_registry.lease(bc):
+        yield bc
 
 
 ################################################################
@@ -31,27 +40,164 @@ async def info_my_seatable_api_token(
     return base_client.base_token
 
 
-# Export View to S3 Parquet
+# Export View
+# [NOTE] /export/parquet/view는 이전 버전 호환용
+@router.get("/export/view")
 @router.get("/export/parquet/view")
-async def export_view_to_s3_with_parquet(
+async def export_view_to_destination(
     workspace_name: str,
     base_name: str,
     table_name: str,
     view_name: str,
+    format: str = "parquet",
+    compression: str = None,
     group: str = None,
     prod: bool = False,
+    wait: bool = False,
+    force: bool = False,
     base_client: BaseClient = Depends(get_base_client),
 ):
-    content = await view_to_parquet(client=base_client, table_name=table_name, view_name=view_name)
-
-    return await upload_to_s3(
-        session=session,
-        content=content,
-        format="parquet",
+    try:
+        Exporter = get_exporter(format)
+    except UnknownFormat as ex:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ex))
+    obj_key = generate_obj_key(
+        format=format,
         prod=prod,
         workspace_name=workspace_name,
         base_name=base_name,
         table_name=table_name,
         view_name=view_name,
         group=group,
+        extension=Exporter.extension,
+    )
+    options = {"compression": compression} if compression else {}
+
+    async def export(job: Job = None):
+        return await export_view(
+            destination=destination,
+            client=base_client,
+            table_name=table_name,
+            view_name=view_name,
+            key=obj_key,
+            format=format,
+            progress=job.update_progress if job else None,
+            force=force,
+            **options,
+        )
+
+    if wait:
+        return await export()
+
+    # 같은 base, table, view, format, key에 대한 export가 진행 중이면 해당 job 반환
+    return job_queue.submit(
+        key=(base_client.dtable_uuid, table_name, view_name, format, obj_key),
+        func=export,
+        name=f"export {obj_key}",
+        client=base_client,
+    )
+
+
+# Incremental Export Table to Parquet Dataset
+@router.get("/export/dataset/table")
+async def export_table_to_dataset(
+    workspace_name: str,
+    base_name: str,
+    table_name: str,
+    prod: bool = False,
+    wait: bool = False,
+    force: bool = False,
+    base_client: BaseClient = Depends(get_base_client),
+):
+    prefix = generate_dataset_prefix(
+        prod=prod, workspace_name=workspace_name, base_name=base_name, table_name=table_name
+    )
+
+    async def export(job: Job = None):
+        return await table_to_dataset(
+            destination=destination, client=base_client, table_name=table_name, prefix=prefix, force=force
+        )
+
+    if wait:
+        return await export()
+
+    # [NOTE] 같은 dataset에 대한 export, compact는 manifest를 공유하므로 같은 key 사용
+    return job_queue.submit(
+        key=(base_client.dtable_uuid, table_name, "dataset", prefix),
+        func=export,
+        name=f"export dataset {prefix}",
+        client=base_client,
+    )
+
+
+# Compact Parquet Dataset
+@router.get("/compact/dataset/table")
+async def compact_table_dataset(
+    workspace_name: str,
+    base_name: str,
+    table_name: str,
+    prod: bool = False,
+    min_files: int = 2,
+    wait: bool = False,
+    base_client: BaseClient = Depends(get_base_client),
+):
+    prefix = generate_dataset_prefix(
+        prod=prod, workspace_name=workspace_name, base_name=base_name, table_name=table_name
+    )
+
+    async def compact(job: Job = None):
+        return await compact_dataset(destination=destination, prefix=prefix, min_files=min_files)
+
+    if wait:
+        return await compact()
+
+    return job_queue.submit(
+        key=(base_client.dtable_uuid, table_name, "dataset", prefix),
+        func=compact,
+        name=f"compact dataset {prefix}",
+        client=base_client,
+    )
+
+
+# Snapshot Base
+@router.get("/export/base")
+async def export_base_to_destination(
+    workspace_name: str,
+    base_name: str,
+    format: str = "parquet",
+    compression: str = None,
+    prod: bool = False,
+    max_concurrency: int = 4,
+    wait: bool = False,
+    base_client: BaseClient = Depends(get_base_client),
+):
+    try:
+        get_exporter(format)
+    except UnknownFormat as ex:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ex))
+    prefix = generate_snapshot_prefix(
+        prod=prod, workspace_name=workspace_name, base_name=base_name, snapshot_at=datetime.now(TZ)
+    )
+    options = {"compression": compression} if compression else {}
+
+    async def export(job: Job = None):
+        return await export_base(
+            destination=destination,
+            client=base_client,
+            prefix=prefix,
+            format=format,
+            max_concurrency=max_concurrency,
+            progress=job.update_progress if job else None,
+            **options,
+        )
+
+    if wait:
+        return await export()
+
+    # 같은 base에 대한 snapshot이 진행 중이면 해당 job 반환
+    return job_queue.submit(
+        key=(base_client.dtable_uuid, "snapshot", format),
+        func=export,
+        name=f"snapshot {prefix}",
+        client=base_client,
     )
@@ -0,0 +1,48 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import APIKeyHeader, HTTPBasic, HTTPBasicCredentials
+
+from ..job import Job, job_queue
+from ..registry import hash_credential
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+api_key_header = APIKeyHeader(name="Token", auto_error=False)
+security = HTTPBasic(auto_error=False)
+
+
+################################################################
+# Auth
+################################################################
+# [NOTE] job을 submit한 credential (API Token 또는 Basic Auth)의 hash - client_registry의 key와 같음
+async def get_owner(
+    api_token: str = Depends(api_key_header), credentials: HTTPBasicCredentials = Depends(security)
+) -> str:
+    if api_token:
+        return hash_credential("api-token", api_token)
+    if credentials:
+        return hash_credential("user", credentials.username, credentials.password)
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token header or basic auth is required",
+        headers={"WWW-Authenticate": "Basic"},
+    )
+
+
+################################################################
+# Endpoints
+################################################################
+# List Jobs
+@router.get("")
+async def list_jobs(owner: str = Depends(get_owner)) -> List[Job]:
+    return job_queue.list_jobs(owner=owner)
+
+
+# Get Job
+@router.get("/{job_id}")
+async def get_job(job_id: str, owner: str = Depends(get_owner)) -> Job:
+    job = job_queue.get(job_id, owner=owner)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"job '{job_id}' not found!")
+    return job
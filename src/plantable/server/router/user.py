@@ -1,14 +1,21 @@
+from datetime import datetime
 from typing import Annotated
 
-import aioboto3
+import aiohttp
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 
 from ...client import UserClient
-from ..conf import AIOBOTO3_CONF
-from ..util import upload_to_s3, view_to_parquet
+from ...const import TZ
+from ..conf import EXPORT_DESTINATION
+from ..dataset import generate_dataset_prefix, table_to_dataset
+from ..destination import get_destination
+from ..exporter import UnknownFormat, export_base, export_view, get_exporter
+from ..job import Job, job_queue
+from ..registry import client_registry
+from ..util import generate_obj_key, generate_snapshot_prefix
 
-session = aioboto3.Session(**AIOBOTO3_CONF)
+destination = get_destination(EXPORT_DESTINATION)
 router = APIRouter(prefix="/user", tags=["UserClient"])
 security = HTTPBasic()
 
@@ -17,10 +24,9 @@ security = HTTPBasic()
 # Basic Auth
 ################################################################
 async def get_user_client(credentials: Annotated[HTTPBasicCredentials, Depends(security)]):
-    uc = UserClient(seatable_username=credentials.username, seatable_password=credentials.password)
     try:
-        _ = await uc.login()
-    except Exception as ex:
+        uc = await client_registry.get_user_client(username=credentials.username, password=credentials.password)
+    except aiohttp.ClientResponseError as ex:
         if ex.status == 400:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -28,7 +34,9 @@ async def get_user_client(credentials: Annotated[HTTPBasicCredentials, Depends(s
                 headers={"WWW-Authenticate": "Basic"},
             )
         raise ex
-    return uc
+    # 401이면 다음 요청에서 다시 로그인
+    async with client_registry.lease(uc):
+        yield uc
 
 
 ################################################################
@@ -40,30 +48,144 @@ async def info_my_seatable_account(user_client: Annotated[dict, Depends(get_user
     return await user_client.get_account_info()
 
 
-# Export View to S3 Parquet
+# Export View
+# [NOTE] /export/parquet/view는 이전 버전 호환용
+@router.get("/export/view")
 @router.get("/export/parquet/view")
-async def export_view_to_s3_with_parquet(
+async def export_view_to_destination(
     user_client: Annotated[dict, Depends(get_user_client)],
     workspace_name: str,
     base_name: str,
     table_name: str,
     view_name: str,
+    format: str = "parquet",
+    compression: str = None,
     group: str = None,
     prod: bool = False,
+    wait: bool = False,
+    force: bool = False,
 ):
     base_client = await user_client.get_base_client_with_account_token(
         workspace_name_or_id=workspace_name, base_name=base_name
     )
-    content = await view_to_parquet(client=base_client, table_name=table_name, view_name=view_name)
-
-    return await upload_to_s3(
-        session=session,
-        content=content,
-        format="parquet",
+    try:
+        Exporter = get_exporter(format)
+    except UnknownFormat as ex:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ex))
+    obj_key = generate_obj_key(
+        format=format,
         prod=prod,
         workspace_name=workspace_name,
         base_name=base_name,
         table_name=table_name,
         view_name=view_name,
         group=group,
+        extension=Exporter.extension,
+    )
+    options = {"compression": compression} if compression else {}
+
+    async def export(job: Job = None):
+        return await export_view(
+            destination=destination,
+            client=base_client,
+            table_name=table_name,
+            view_name=view_name,
+            key=obj_key,
+            format=format,
+            progress=job.update_progress if job else None,
+            force=force,
+            **options,
+        )
+
+    if wait:
+        return await export()
+
+    # 같은 base, table, view, format, key에 대한 export가 진행 중이면 해당 job 반환
+    return job_queue.submit(
+        key=(base_client.dtable_uuid, table_name, view_name, format, obj_key),
+        func=export,
+        name=f"export {obj_key}",
+        client=user_client,
+    )
+
+
+# Incremental Export Table to Parquet Dataset
+@router.get("/export/dataset/table")
+async def export_table_to_dataset(
+    user_client: Annotated[dict, Depends(get_user_client)],
+    workspace_name: str,
+    base_name: str,
+    table_name: str,
+    prod: bool = False,
+    wait: bool = False,
+    force: bool = False,
+):
+    base_client = await user_client.get_base_client_with_account_token(
+        workspace_name_or_id=workspace_name, base_name=base_name
+    )
+    prefix = generate_dataset_prefix(
+        prod=prod, workspace_name=workspace_name, base_name=base_name, table_name=table_name
+    )
+
+    async def export(job: Job = None):
+        return await table_to_dataset(
+            destination=destination, client=base_client, table_name=table_name, prefix=prefix, force=force
+        )
+
+    if wait:
+        return await export()
+
+    # [NOTE] 같은 dataset에 대한 export, compact는 manifest를 공유하므로 같은 key 사용
+    return job_queue.submit(
+        key=(base_client.dtable_uuid, table_name, "dataset", prefix),
+        func=export,
+        name=f"export dataset {prefix}",
+        client=user_client,
+    )
+
+
+# Snapshot Base
+@router.get("/export/base")
+async def export_base_to_destination(
+    user_client: Annotated[dict, Depends(get_user_client)],
+    workspace_name: str,
+    base_name: str,
+    format: str = "parquet",
+    compression: str = None,
+    prod: bool = False,
+    max_concurrency: int = 4,
+    wait: bool = False,
+):
+    base_client = await user_client.get_base_client_with_account_token(
+        workspace_name_or_id=workspace_name, base_name=base_name
+    )
+    try:
+        get_exporter(format)
+    except UnknownFormat as ex:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ex))
+    prefix = generate_snapshot_prefix(
+        prod=prod, workspace_name=workspace_name, base_name=base_name, snapshot_at=datetime.now(TZ)
+    )
+    options = {"compression": compression} if compression else {}
+
+    async def export(job: Job = None):
+        return await export_base(
+            destination=destination,
+            client=base_client,
+            prefix=prefix,
+            format=format,
+            max_concurrency=max_concurrency,
+            progress=job.update_progress if job else None,
+            **options,
+        )
+
+    if wait:
+        return await export()
+
+    # 같은 base에 대한 snapshot이 진행 중이면 해당 job 반환
+    return job_queue.submit(
+        key=(base_client.dtable_uuid, "snapshot", format),
+        func=export,
+        name=f"snapshot {prefix}",
+        client=user_client,
     )
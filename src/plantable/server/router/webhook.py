@@ -0,0 +1,143 @@
+import logging
+from typing import List
+
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from pydantic import ValidationError
+
+from ...client import BaseClient
+from ...model.event import Event
+from ..conf import EXPORT_DESTINATION, WEBHOOK_SECRET
+from ..dataset import generate_dataset_prefix, table_to_dataset
+from ..destination import get_destination
+from ..job import RUNNING, Job, job_queue
+from ..registry import client_registry
+from ..webhook import (
+    DELIVERY_HEADER,
+    SIGNATURE_HEADER,
+    Subscription,
+    TableChanges,
+    get_delivery_id,
+    subscription_store,
+    verify_signature,
+    webhook_dispatcher,
+)
+from .api_token import get_base_client
+
+logger = logging.getLogger()
+
+destination = get_destination(EXPORT_DESTINATION)
+router = APIRouter(prefix="/webhook", tags=["Webhook"])
+
+
+################################################################
+# Handlers
+################################################################
+# Incremental Export Changed Table
+@webhook_dispatcher.register
+async def export_changed_table(changes: TableChanges):
+    subscription = await subscription_store.get(changes.dtable_uuid)
+    if subscription is None:
+        return
+
+    client = await client_registry.get_base_client(api_token=subscription.api_token)
+    prefix = generate_dataset_prefix(
+        prod=subscription.prod,
+        workspace_name=subscription.workspace_name,
+        base_name=subscription.base_name,
+        table_name=changes.table_name,
+    )
+
+    async def export(job: Job = None):
+        return await table_to_dataset(
+            destination=destination, client=client, table_name=changes.table_name, prefix=prefix
+        )
+
+    job = job_queue.submit(
+        key=(changes.dtable_uuid, changes.table_name, "dataset", prefix),
+        func=export,
+        name=f"export dataset {prefix}",
+        client=client,
+    )
+
+    # [NOTE] 이미 실행 중인 export는 이번 변경을 못 읽었을 수 있음 - 다음 window에 다시 처리
+    if job.status == RUNNING:
+        for event in changes.events:
+            webhook_dispatcher.push(event)
+
+
+################################################################
+# Endpoints
+################################################################
+# Receive Webhook
+@router.post("")
+async def receive_webhook(
+    request: Request,
+    signature: str = Header(None, alias=SIGNATURE_HEADER),
+    delivery: str = Header(None, alias=DELIVERY_HEADER),
+):
+    if not WEBHOOK_SECRET:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="webhook secret is not configured!")
+
+    body = await request.body()
+    if not verify_signature(body=body, secret=WEBHOOK_SECRET, signature=signature):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid webhook signature!")
+
+    try:
+        payload = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid webhook payload!")
+
+    # row event가 아니거나 형식이 다른 event는 무시
+    delivery = get_delivery_id(body=body, delivery=delivery)
+    payloads = payload if isinstance(payload, list) else [payload]
+    queued = 0
+    for i, p in enumerate(payloads):
+        try:
+            event = Event(**p)
+        except (ValidationError, TypeError) as ex:
+            _msg = f"invalid webhook event ignored - delivery '{delivery}', event #{i}: {ex}"
+            logger.warning(_msg)
+            continue
+        queued += webhook_dispatcher.push(event)
+
+    return {"received": len(payloads), "queued": queued}
+
+
+# Subscribe
+@router.post("/subscriptions")
+async def subscribe(
+    workspace_name: str,
+    base_name: str,
+    prod: bool = False,
+    base_client: BaseClient = Depends(get_base_client),
+) -> dict:
+    subscription = Subscription(
+        dtable_uuid=base_client.dtable_uuid,
+        workspace_name=workspace_name,
+        base_name=base_name,
+        prod=prod,
+        api_token=base_client.api_token,
+    )
+    await subscription_store.set(subscription)
+    return subscription.dict(exclude={"api_token"})
+
+
+# List Subscriptions - 등록할 때와 같은 API Token의 base subscription만 반환
+@router.get("/subscriptions")
+async def list_subscriptions(base_client: BaseClient = Depends(get_base_client)) -> List[dict]:
+    subscription = await subscription_store.get(base_client.dtable_uuid)
+    if subscription is None:
+        return []
+    return [subscription.dict(exclude={"api_token"})]
+
+
+# Unsubscribe
+@router.delete("/subscriptions")
+async def unsubscribe(base_client: BaseClient = Depends(get_base_client)) -> dict:
+    subscription = await subscription_store.delete(base_client.dtable_uuid)
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"base '{base_client.dtable_uuid}' is not subscribed!"
+        )
+    return subscription.dict(exclude={"api_token"})
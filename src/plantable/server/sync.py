@@ -0,0 +1,256 @@
+import asyncio
+import copy
+import logging
+import random
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from ..client import BaseClient, UserClient
+from ..const import TZ
+from ..templates import SYNC_TABLE, SYNC_TABLE_NAME
+from .conf import SEATABLE_VIEW_SUFFIX_TO_WATCH
+from .destination import Destination
+from .exporter import export_view, get_exporter
+from .util import generate_obj_key
+
+logger = logging.getLogger()
+
+SYNC_INTERVAL = 300
+SYNC_JITTER = 0.2
+SYNC_MAX_CONCURRENCY = 4
+SYNC_FULL_EVERY = 12
+DISCOVER_INTERVAL = 3600
+
+
+################################################################
+# Sync Target
+################################################################
+class SyncTarget:
+    """
+    base 하나와 그 base의 감시 대상 view들 (이름이 SEATABLE_VIEW_SUFFIX_TO_WATCH로 끝나는 view).
+    """
+
+    def __init__(self, workspace_name: str, client: BaseClient, views: List[Tuple[str, str, str]]):
+        self.workspace_name = workspace_name
+        self.client = client
+        self.views = views  # [(sync id, table name, view name)]
+
+        # {table name: last mtime at last sync}
+        self.synced_mtimes: Dict[str, datetime] = dict()
+        self.cycles = 0
+
+    @property
+    def base_name(self):
+        return self.client.base_name
+
+    @property
+    def tables(self):
+        return sorted(set([table_name for _, table_name, _ in self.views]))
+
+
+################################################################
+# SyncDaemon
+################################################################
+class SyncDaemon:
+    """
+    '__sync' view들을 주기적으로 export.
+     - base 별로 interval (± jitter) 마다 table 별 last _mtime만 조회, 바뀐 table의 view만 export
+     - full_every 번째 cycle은 전체 확인 (삭제는 _mtime을 바꾸지 않음 - export_view의 row 수 비교로 확인)
+     - export 동시 실행 수는 max_concurrency로 제한
+     - 결과 (LastUpdated, LastSync, Log)는 base 별로 '__sync' table에 한 번에 upsert
+    """
+
+    def __init__(
+        self,
+        user_client: UserClient,
+        destination: Destination,
+        format: str = "parquet",
+        prod: bool = False,
+        workspace_names: List[str] = None,
+        interval: float = SYNC_INTERVAL,
+        jitter: float = SYNC_JITTER,
+        max_concurrency: int = SYNC_MAX_CONCURRENCY,
+        full_every: int = SYNC_FULL_EVERY,
+        discover_interval: float = DISCOVER_INTERVAL,
+        suffix: str = SEATABLE_VIEW_SUFFIX_TO_WATCH,
+    ):
+        self.user_client = user_client
+        self.destination = destination
+        self.format = format
+        self.prod = prod
+        self.workspace_names = workspace_names
+        self.interval = interval
+        self.jitter = jitter
+        self.full_every = full_every
+        self.discover_interval = discover_interval
+        self.suffix = suffix
+
+        self.Exporter = get_exporter(format)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.targets: Dict[str, SyncTarget] = dict()  # {base uuid: target}
+        self.tasks: Dict[str, asyncio.Task] = dict()
+
+    # Discover Targets
+    async def discover(self) -> Dict[str, SyncTarget]:
+        workspaces = await self.user_client.list_workspaces(detail=True)
+
+        targets = dict()
+        for workspace in workspaces:
+            if self.workspace_names and workspace.name not in self.workspace_names:
+                continue
+            for base in workspace.bases or []:
+                try:
+                    async with self.semaphore:
+                        base_token = await self.user_client.get_base_token_with_account_token(
+                            workspace_id=workspace.id, base_name=base.name
+                        )
+                        client = BaseClient(base_token=base_token)
+                        tables = await client.list_tables()
+                except Exception as ex:
+                    _msg = f"discover failed - workspace '{workspace.name}', base '{base.name}': {ex}"
+                    logger.warning(_msg)
+                    continue
+                views = [
+                    (f"{table.id}/{view.id}", table.name, view.name)
+                    for table in tables
+                    if table.name != SYNC_TABLE_NAME
+                    for view in table.views
+                    if view.name.endswith(self.suffix)
+                ]
+                if views:
+                    targets[client.dtable_uuid] = SyncTarget(workspace_name=workspace.name, client=client, views=views)
+
+        _msg = f"discovered {sum([len(t.views) for t in targets.values()])} views in {len(targets)} bases."
+        logger.info(_msg)
+
+        return targets
+
+    # Sync Target
+    async def sync(self, target: SyncTarget, full: bool = False) -> List[dict]:
+        client = target.client
+
+        # poll last mtime per table
+        async def get_last_mtime(table_name):
+            async with self.semaphore:
+                return await client.get_last_mtime(table_name=table_name)
+
+        last_mtimes = dict(zip(target.tables, await asyncio.gather(*[get_last_mtime(t) for t in target.tables])))
+        changed = [
+            t
+            for t in target.tables
+            if full or t not in target.synced_mtimes or last_mtimes[t] != target.synced_mtimes[t]
+        ]
+        if not changed:
+            return []
+
+        # export changed views
+        async def export(sync_id, table_name, view_name):
+            key = generate_obj_key(
+                format=self.format,
+                prod=self.prod,
+                workspace_name=target.workspace_name,
+                base_name=target.base_name,
+                table_name=table_name,
+                view_name=view_name,
+                extension=self.Exporter.extension,
+            )
+            record = {"Id": sync_id, "Table": table_name, "View": view_name}
+            try:
+                async with self.semaphore:
+                    result = await export_view(
+                        destination=self.destination,
+                        client=client,
+                        table_name=table_name,
+                        view_name=view_name,
+                        key=key,
+                        format=self.format,
+                        force=not full,
+                    )
+            except Exception as ex:
+                _msg = f"sync failed - base '{target.base_name}', table '{table_name}', view '{view_name}': {ex}"
+                logger.error(_msg)
+                return {**record, "Log": _msg}
+            if result["skipped"]:
+                return None
+            return {
+                **record,
+                "LastUpdated": last_mtimes[table_name],
+                "LastSync": datetime.now(TZ),
+                "Log": f"{result['rows']} rows, {result['size']} bytes -> {result['url']}",
+            }
+
+        records = await asyncio.gather(*[export(*view) for view in target.views if view[1] in changed])
+        records = [r for r in records if r]
+
+        # [NOTE] 실패한 view가 있는 table은 다음 cycle에 다시 시도
+        failed = set([r["Table"] for r in records if "LastSync" not in r])
+        for table_name in changed:
+            if table_name not in failed:
+                target.synced_mtimes[table_name] = last_mtimes[table_name]
+
+        if records:
+            await self.write_sync_table(target=target, records=records)
+
+        return records
+
+    # Write Results into '__sync' Table
+    async def write_sync_table(self, target: SyncTarget, records: List[dict]):
+        client = target.client
+        try:
+            tables = await client.list_tables(refresh=False)
+            if SYNC_TABLE_NAME not in [t.name for t in tables]:
+                await client.create_table(table_name=SYNC_TABLE_NAME, columns=copy.deepcopy(SYNC_TABLE["columns"]))
+            await client.upsert_rows(table_name=SYNC_TABLE_NAME, rows=records)
+        except Exception as ex:
+            _msg = f"write '{SYNC_TABLE_NAME}' failed - base '{target.base_name}': {ex}"
+            logger.error(_msg)
+
+    # Run Target Loop
+    async def run_target(self, target: SyncTarget):
+        # [NOTE] 시작 시점을 흩어서 모든 base가 동시에 조회하지 않도록 함
+        await asyncio.sleep(random.uniform(0, self.interval))
+        while True:
+            full = target.cycles % self.full_every == 0
+            try:
+                records = await self.sync(target=target, full=full)
+                if records:
+                    _msg = (
+                        f"synced {len(records)} views - base '{target.base_name}' ({'full' if full else 'changed'})."
+                    )
+                    logger.info(_msg)
+            except Exception as ex:
+                _msg = f"sync cycle failed - base '{target.base_name}': {ex}"
+                logger.error(_msg)
+            target.cycles += 1
+            await asyncio.sleep(self.interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    # Run Once
+    async def run_once(self):
+        targets = await self.discover()
+        results = await asyncio.gather(*[self.sync(target=target, full=True) for target in targets.values()])
+        return {target.base_name: records for target, records in zip(targets.values(), results)}
+
+    # Run Forever
+    async def run(self):
+        try:
+            while True:
+                targets = await self.discover()
+
+                # stop removed bases, start new bases - 기존 base는 sync 상태 유지
+                for uuid in list(self.tasks):
+                    if uuid not in targets:
+                        self.tasks.pop(uuid).cancel()
+                        self.targets.pop(uuid, None)
+                for uuid, target in targets.items():
+                    if uuid in self.targets:
+                        self.targets[uuid].client = target.client
+                        self.targets[uuid].views = target.views
+                        continue
+                    self.targets[uuid] = target
+                    self.tasks[uuid] = asyncio.ensure_future(self.run_target(target))
+
+                await asyncio.sleep(self.discover_interval)
+        finally:
+            for task in self.tasks.values():
+                task.cancel()
+            _ = await asyncio.gather(*self.tasks.values(), return_exceptions=True)
@@ -1,26 +1,18 @@
+import asyncio
 import io
-from typing import List
-
-import aioboto3
-import pyarrow as pa
-import pyarrow.parquet as pq
+import logging
+from datetime import datetime
 
 from ..client.base import BaseClient
-from .conf import AWS_S3_BUCKET_NAME, AWS_S3_BUCKET_PREFIX, DEV, PROD
+from .conf import AWS_S3_BUCKET_PREFIX, DEV, PROD
 
+logger = logging.getLogger()
 
-# Generate Filename
-def generate_filename(
-    workspace_name: str,
-    base_name: str,
-    table_name: str,
-    view_name: str = None,
-    format: str = "parquet",
-):
-    names = [workspace_name, base_name, table_name]
-    if view_name:
-        names.append(view_name)
-    return ".".join(["_".join(names), format])
+PARQUET_ROW_GROUP_SIZE = 50000
+
+# S3 object metadata for conditional export
+META_LAST_MTIME = "plantable-last-mtime"
+META_ROW_COUNT = "plantable-row-count"
 
 
 # Generate S3 Object Key
@@ -33,6 +25,7 @@ def generate_obj_key(
     view_name: str,
     group: str = None,
     aws_s3_bucket_prefix: str = AWS_S3_BUCKET_PREFIX,
+    extension: str = None,
 ) -> str:
     keys = [
         aws_s3_bucket_prefix,
@@ -52,75 +45,65 @@ def generate_obj_key(
     names = [workspace_name, base_name, table_name]
     if view_name:
         names.append(view_name)
-    filename = ".".join(["_".join(names), format])
+    filename = ".".join(["_".join(names), extension or format])
     keys.append(filename)
 
-    return "/".join(keys)
+    return "/".join([k for k in keys if k])
 
 
-# Python List to Parquet Bytes
-def pylist_to_parquet(records: List[dict], version: str = "1.0") -> bytes:
-    tbl = pa.Table.from_pylist(records)
-    with io.BytesIO() as buffer:
-        pq.write_table(table=tbl, where=buffer, version=version)
-        buffer.seek(0)
-        content = buffer.read()
-    return content
-
-
-# Read Table using BaseClient as Parquet
-async def table_to_parquet(client: BaseClient, table_name: str, modified_before: str, modified_after: str):
-    records = await client.read_table(
-        table_name=table_name,
-        modified_before=modified_before,
-        modified_after=modified_after,
-    )
-    return pylist_to_parquet(records)
+# Generate Snapshot Prefix
+def generate_snapshot_prefix(
+    prod: bool,
+    workspace_name: str,
+    base_name: str,
+    snapshot_at: datetime,
+    aws_s3_bucket_prefix: str = AWS_S3_BUCKET_PREFIX,
+) -> str:
+    keys = [
+        aws_s3_bucket_prefix,
+        "snapshot",
+        PROD if prod else DEV,
+        workspace_name,
+        base_name,
+        f"snapshot_at={snapshot_at.strftime('%Y%m%dT%H%M%S')}",
+    ]
+    return "/".join([k for k in keys if k])
 
 
-# Read Table using BaseClient as Parquet
-async def view_to_parquet(client: BaseClient, table_name: str, view_name: str):
-    records = await client.read_view(table_name=table_name, view_name=view_name)
-    return pylist_to_parquet(records)
+# Part Buffer for Streaming Writer
+class PartBuffer(io.RawIOBase):
+    """
+    ParquetWriter의 sink - 쓰여진 bytes를 part 단위로 꺼낼 수 있음.
+    tell()은 전체 쓰여진 위치를 반환 (parquet footer offset 계산에 필요).
+    """
 
+    def __init__(self):
+        self.buffer = bytearray()
+        self.position = 0
 
-# Upload to S3
-async def upload_to_s3(
-    session: aioboto3.Session,
-    content: bytes,
-    format: str,
-    prod: bool,
-    workspace_name: str,
-    base_name: str,
-    table_name: str,
-    view_name: str = None,
-    group: str = None,
-):
-    obj_key = generate_obj_key(
-        format=format,
-        prod=prod,
-        workspace_name=workspace_name,
-        base_name=base_name,
-        table_name=table_name,
-        view_name=view_name,
-        group=group,
-    )
+    def writable(self):
+        return True
 
-    async with session.client("s3") as client:
-        await client.upload_fileobj(io.BytesIO(content), AWS_S3_BUCKET_NAME, obj_key)
+    def write(self, b):
+        self.buffer += b
+        self.position += len(b)
+        return len(b)
 
-    return {"bucket": AWS_S3_BUCKET_NAME, "key": obj_key, "size": len(content)}
+    def tell(self):
+        return self.position
 
+    def take(self) -> bytes:
+        content, self.buffer = bytes(self.buffer), bytearray()
+        return content
 
-# Download from S3
-async def download_from_s3(
-    session: aioboto3.Session,
-    bucket: str,
-    key: str,
-):
-    async with session.resource("s3") as client:
-        object = await client.Object(bucket, key)
-        results = await object.get()
-        content = await results["Body"].read()
 
-    return content
+# Get Source State
+# [NOTE] 삭제는 _mtime을 바꾸지 않으므로 row 수도 함께 비교
+async def get_source_state(client: BaseClient, table_name: str) -> dict:
+    last_mtime, row_count = await asyncio.gather(
+        client.get_last_mtime(table_name=table_name), client.count_rows(table_name=table_name)
+    )
+    return {
+        META_LAST_MTIME: last_mtime.isoformat() if last_mtime else "",
+        META_ROW_COUNT: str(row_count),
+    }
@@ -0,0 +1,211 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from pydantic import BaseModel
+
+from ..cache import TieredCache
+from ..model.event import Event
+from .conf import WEBHOOK_DEBOUNCE, WEBHOOK_SUBSCRIPTION_KEY, WEBHOOK_SUBSCRIPTION_TTL
+from .registry import client_cache
+
+logger = logging.getLogger()
+
+# SeaTable은 secret이 있으면 payload의 HMAC-SHA256을 이 header로 보냄
+SIGNATURE_HEADER = "X-SeaTable-Signature"
+# 로그에 남길 delivery id - header가 없으면 payload hash 사용
+DELIVERY_HEADER = "X-SeaTable-Delivery"
+
+ROW_EVENTS = ["insert_row", "modify_row", "delete_row", "insert_rows", "modify_rows", "delete_rows"]
+
+
+# Verify Signature
+def verify_signature(body: bytes, secret: str, signature: str) -> bool:
+    if not secret or not signature:
+        return False
+    if signature.startswith("sha256="):
+        signature = signature[len("sha256=") :]
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(digest, signature)
+
+
+# Get Delivery ID
+def get_delivery_id(body: bytes, delivery: str = None) -> str:
+    return delivery or hashlib.sha256(body).hexdigest()[:16]
+
+
+################################################################
+# Models
+################################################################
+class Subscription(BaseModel):
+    dtable_uuid: str
+    workspace_name: str
+    base_name: str
+    prod: bool = False
+    api_token: str
+
+
+class TableChanges(BaseModel):
+    dtable_uuid: str
+    table_id: str
+    table_name: str
+    events: List[Event]
+
+    @property
+    def op_types(self):
+        return sorted(set([e.data.op_type for e in self.events]))
+
+
+################################################################
+# SubscriptionStore
+################################################################
+class SubscriptionStore:
+    """
+    base 별 webhook subscription 저장소.
+     - cache에 redis가 있고 key (Fernet)가 있으면 redis에 ttl 초 동안 보관 - worker 간 공유, 재시작해도 유지
+     - api token은 key로 암호화해서 보관 - redis를 읽을 수 있어도 key 없이는 token을 알 수 없음
+     - redis나 key가 없으면 process 안에서만 보관 (token 원문을 밖에 쓰지 않음)
+     - ttl이 지나면 subscription이 사라지므로 주기적으로 다시 subscribe해야 함
+    """
+
+    def __init__(self, cache: TieredCache = None, key: str = None, ttl: int = WEBHOOK_SUBSCRIPTION_TTL):
+        self.cache = cache
+        self.ttl = ttl
+
+        self.local: Dict[str, Subscription] = dict()
+        self._fernet = None
+        if key:
+            from cryptography.fernet import Fernet
+
+            self._fernet = Fernet(key)
+        elif self.cache and self.cache.remote:
+            _msg = "webhook subscription key is not configured - subscriptions are kept in this process only."
+            logger.warning(_msg)
+
+    @property
+    def remote(self):
+        if self._fernet is None or self.cache is None:
+            return None
+        return self.cache.remote
+
+    @staticmethod
+    def _key(dtable_uuid: str) -> str:
+        return f"webhook-subscription:{dtable_uuid}"
+
+    # Get
+    async def get(self, dtable_uuid: str) -> Subscription:
+        if self.remote is None:
+            return self.local.get(dtable_uuid)
+        value = await self.remote.get(self._key(dtable_uuid))
+        if value is None:
+            return None
+        try:
+            api_token = self._fernet.decrypt(value.pop("encrypted_api_token").encode()).decode()
+        except Exception as ex:
+            _msg = f"decrypt webhook subscription failed - base '{dtable_uuid}': {ex!r}"
+            logger.warning(_msg)
+            return None
+        return Subscription(**value, api_token=api_token)
+
+    # Set
+    async def set(self, subscription: Subscription):
+        if self.remote is None:
+            self.local[subscription.dtable_uuid] = subscription
+            return
+        value = {
+            **subscription.dict(exclude={"api_token"}),
+            "encrypted_api_token": self._fernet.encrypt(subscription.api_token.encode()).decode(),
+        }
+        await self.remote.set(self._key(subscription.dtable_uuid), value, ttl=self.ttl)
+
+    # Delete
+    async def delete(self, dtable_uuid: str) -> Subscription:
+        subscription = await self.get(dtable_uuid)
+        if self.remote is None:
+            self.local.pop(dtable_uuid, None)
+        else:
+            await self.remote.delete(self._key(dtable_uuid))
+        return subscription
+
+
+################################################################
+# WebhookDispatcher
+################################################################
+class WebhookDispatcher:
+    """
+    webhook event를 (base, table) 별로 debounce 초 동안 모았다가 handler 호출.
+     - 같은 table에 대한 event가 연달아 와도 handler는 window 당 한 번만 호출
+     - handler(changes: TableChanges)는 등록 순서대로 실행, 실패해도 다음 handler는 실행
+    """
+
+    def __init__(self, debounce: float = WEBHOOK_DEBOUNCE):
+        self.debounce = debounce
+
+        self.handlers: List[Callable[[TableChanges], Awaitable]] = list()
+        self.pending: Dict[Tuple[str, str], TableChanges] = dict()
+        self.timers = dict()
+        self.tasks = set()
+
+    # Register Handler
+    def register(self, handler: Callable[[TableChanges], Awaitable]):
+        self.handlers.append(handler)
+        return handler
+
+    # Push Event
+    def push(self, event: Event) -> bool:
+        if event.data.op_type not in ROW_EVENTS:
+            return False
+
+        key = (event.data.dtable_uuid, event.data.table_id)
+        if key not in self.pending:
+            self.pending[key] = TableChanges(
+                dtable_uuid=event.data.dtable_uuid,
+                table_id=event.data.table_id,
+                table_name=event.data.table_name,
+                events=[],
+            )
+        changes = self.pending[key]
+        changes.table_name = event.data.table_name  # table 이름이 바뀌었을 수 있음
+        changes.events.append(event)
+
+        # [NOTE] 첫 event 기준으로 window 시작 - event가 계속 들어와도 debounce 초 안에는 한 번 처리됨
+        if key not in self.timers:
+            loop = asyncio.get_running_loop()
+            self.timers[key] = loop.call_later(self.debounce, self._spawn_flush, key)
+
+        return True
+
+    # Flush
+    async def flush(self, key: Tuple[str, str] = None):
+        keys = [key] if key else list(self.pending)
+        for _key in keys:
+            timer = self.timers.pop(_key, None)
+            if timer:
+                timer.cancel()
+            changes = self.pending.pop(_key, None)
+            if changes is None:
+                continue
+            for handler in self.handlers:
+                try:
+                    await handler(changes)
+                except Exception as ex:
+                    _msg = f"webhook handler '{handler.__name__}' failed - base '{changes.dtable_uuid}', table '{changes.table_name}': {ex}"
+                    logger.error(_msg)
+
+    # Close
+    async def close(self):
+        await self.flush()
+        if self.tasks:
+            _ = await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    def _spawn_flush(self, key: Tuple[str, str]):
+        self.timers.pop(key, None)
+        task = asyncio.ensure_future(self.flush(key))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+
+webhook_dispatcher = WebhookDispatcher()
+subscription_store = SubscriptionStore(cache=client_cache, key=WEBHOOK_SUBSCRIPTION_KEY)
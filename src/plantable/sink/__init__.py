@@ -0,0 +1,2 @@
+from .kafka import CDCPublisher
+from .postgres import PostgresSink
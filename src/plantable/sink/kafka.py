@@ -0,0 +1,250 @@
+import asyncio
+import io
+import logging
+from datetime import datetime
+from typing import Dict, List, Union
+
+import fastavro
+import orjson
+from aiokafka import AIOKafkaProducer
+
+from ..client.base import BaseClient
+from ..const import TZ
+from ..serde import ToPython
+from ..serde.arrow import generate_arrow_schema
+from ..server.exporter import generate_avro_schema
+from ..utils import parse_str_datetime
+
+logger = logging.getLogger()
+
+TOPIC_PREFIX = "plantable"
+PAGE_SIZE = 10000
+CDC_INTERVAL = 60
+
+OP_UPSERT = "upsert"
+OP_DELETE = "delete"
+
+# Avro single object encoding - marker(C3 01) + CRC-64-AVRO fingerprint(little endian) + body
+AVRO_SINGLE_OBJECT_MARKER = b"\xc3\x01"
+
+
+class UnknownSerializer(Exception):
+    pass
+
+
+################################################################
+# Serializers
+################################################################
+# Generate Avro Single Object Header
+# [NOTE] fastavro fingerprint (hex)는 이미 little endian byte 순서 - int로 바꾸어 pack하면 뒤집힘
+def generate_avro_header(parsed_schema) -> bytes:
+    canonical_form = fastavro.schema.to_parsing_canonical_form(parsed_schema)
+    fingerprint = fastavro.schema.fingerprint(canonical_form, "CRC-64-AVRO")
+    return AVRO_SINGLE_OBJECT_MARKER + bytes.fromhex(fingerprint)
+
+
+class JsonSerializer:
+    format = "json"
+    content_type = "application/json"
+
+    def __init__(self, deserializer: ToPython):
+        self.deserializer = deserializer
+
+    def __call__(self, row: dict) -> bytes:
+        return orjson.dumps(row, option=orjson.OPT_NON_STR_KEYS)
+
+
+class AvroSerializer:
+    format = "avro"
+    content_type = "application/avro"
+
+    def __init__(self, deserializer: ToPython):
+        self.deserializer = deserializer
+        self.schema = generate_avro_schema(generate_arrow_schema(deserializer), name="row")
+        self.parsed_schema = fastavro.parse_schema(self.schema)
+        self.header = generate_avro_header(self.parsed_schema)
+
+    def __call__(self, row: dict) -> bytes:
+        with io.BytesIO() as buffer:
+            buffer.write(self.header)
+            fastavro.schemaless_writer(buffer, self.parsed_schema, row)
+            return buffer.getvalue()
+
+
+SERIALIZERS = {
+    JsonSerializer.format: JsonSerializer,
+    AvroSerializer.format: AvroSerializer,
+}
+
+
+# Create Kafka Producer - 같은 _id의 순서가 유지되도록 idempotent producer 사용
+def create_producer(
+    bootstrap_servers: Union[str, List[str]],
+    compression_type: str = "gzip",
+    linger_ms: int = 50,
+    max_batch_size: int = 1048576,
+    **kwargs,
+) -> AIOKafkaProducer:
+    return AIOKafkaProducer(
+        bootstrap_servers=bootstrap_servers,
+        acks="all",
+        enable_idempotence=True,
+        compression_type=compression_type,
+        linger_ms=linger_ms,
+        max_batch_size=max_batch_size,
+        **kwargs,
+    )
+
+
+################################################################
+# CDCPublisher
+################################################################
+class CDCPublisher:
+    """
+    base의 table 변경분을 Kafka로 publish (table 별 topic, key는 _id).
+     - 변경된 row는 _mtime watermark 이후 row를 읽어서 op 'upsert'로, 삭제는 delete operation log에서 읽어서 value 없이 (tombstone) publish
+     - producer가 모든 message를 ack한 다음에 watermark를 올림 - at least once
+     - state ({table id: {table_name, watermark, deleted_since}})를 저장해두면 재시작 후 이어서 publish
+     - webhook이 있으면 handle_changes를 webhook_dispatcher에 등록 - interval을 기다리지 않고 바로 publish
+    """
+
+    def __init__(
+        self,
+        client: BaseClient,
+        producer: AIOKafkaProducer,
+        format: str = "json",
+        table_names: List[str] = None,
+        topic_prefix: str = TOPIC_PREFIX,
+        page_size: int = PAGE_SIZE,
+        snapshot: bool = True,
+        state: Dict[str, dict] = None,
+    ):
+        if format not in SERIALIZERS:
+            _msg = f"unknown format '{format}' - available formats are {list(SERIALIZERS)}."
+            raise UnknownSerializer(_msg)
+
+        self.client = client
+        self.producer = producer
+        self.format = format
+        self.table_names = table_names
+        self.topic_prefix = topic_prefix
+        self.page_size = page_size
+        self.snapshot = snapshot
+        self.state = state if state is not None else dict()
+
+        self.Serializer = SERIALIZERS[format]
+        self.locks: Dict[str, asyncio.Lock] = dict()
+
+    # Generate Topic - table 이름은 topic 이름에 쓸 수 없는 문자가 있을 수 있으므로 table id 사용
+    def generate_topic(self, table_id: str) -> str:
+        return ".".join([self.topic_prefix, self.client.dtable_uuid, table_id])
+
+    # Generate Headers
+    def generate_headers(self, op: str, table_name: str):
+        return [
+            ("op", op.encode()),
+            ("base", self.client.dtable_uuid.encode()),
+            ("table", table_name.encode()),
+            ("format", self.format.encode()),
+        ]
+
+    # Publish Table Changes
+    async def publish_table(self, table_name: str) -> dict:
+        table = await self.client.get_table(table_name=table_name)
+        if table.id not in self.locks:
+            self.locks[table.id] = asyncio.Lock()
+
+        # [NOTE] 같은 table은 동시에 publish하지 않음 - webhook과 polling이 겹칠 수 있음
+        async with self.locks[table.id]:
+            started_at = datetime.now(TZ)
+            state = self.state.get(table.id)
+            if state:
+                watermark = parse_str_datetime(state["watermark"]) if state["watermark"] else None
+                deleted_since = state["deleted_since"]
+            elif self.snapshot:
+                # 처음이면 전체 row를 publish
+                watermark, deleted_since = None, None
+            else:
+                # 처음이면 지금부터 변경된 row만 publish
+                watermark = await self.client.get_last_mtime(table_name=table_name)
+                deleted_since = started_at.isoformat()
+
+            topic = self.generate_topic(table.id)
+            deserializer = await self.client.get_deserializer(table_name=table_name, refresh=False)
+            serializer = self.Serializer(deserializer)
+            upsert_headers = self.generate_headers(op=OP_UPSERT, table_name=table_name)
+            delete_headers = self.generate_headers(op=OP_DELETE, table_name=table_name)
+
+            # upserts
+            futures = list()
+            last_mtime = watermark
+            num_upserts = 0
+            async for rows in self.client.iter_table(
+                table_name=table_name, modified_after=watermark, page_size=self.page_size, deserializer=deserializer
+            ):
+                for row in rows:
+                    futures.append(
+                        await self.producer.send(
+                            topic, value=serializer(row), key=row["_id"].encode(), headers=upsert_headers
+                        )
+                    )
+                    if row.get("_mtime") and (last_mtime is None or row["_mtime"] > last_mtime):
+                        last_mtime = row["_mtime"]
+                num_upserts += len(rows)
+
+            # deletes
+            num_deletes = 0
+            if deleted_since:
+                row_ids = await self.client.list_deleted_row_ids_since(table_name=table_name, op_time=deleted_since)
+                for row_id in row_ids:
+                    futures.append(
+                        await self.producer.send(topic, value=None, key=row_id.encode(), headers=delete_headers)
+                    )
+                num_deletes = len(row_ids)
+
+            # wait acks - 실패하면 state를 바꾸지 않음 (다음 publish에서 다시 보냄)
+            _ = await asyncio.gather(*futures)
+
+            self.state[table.id] = {
+                "table_name": table_name,
+                "watermark": last_mtime.isoformat() if last_mtime else None,
+                "deleted_since": started_at.isoformat(),
+                "updated_at": datetime.now(TZ).isoformat(),
+            }
+
+        if num_upserts or num_deletes:
+            _msg = f"published '{table_name}' to '{topic}' - {num_upserts} upserts, {num_deletes} deletes."
+            logger.info(_msg)
+
+        return {
+            "topic": topic,
+            "upserts": num_upserts,
+            "deletes": num_deletes,
+            "watermark": self.state[table.id]["watermark"],
+        }
+
+    # Publish All Tables
+    async def publish(self) -> Dict[str, dict]:
+        table_names = self.table_names or [table.name for table in await self.client.list_tables()]
+        results = dict()
+        for table_name in table_names:
+            try:
+                results[table_name] = await self.publish_table(table_name=table_name)
+            except Exception as ex:
+                _msg = f"publish failed - base '{self.client.base_name}', table '{table_name}': {ex}"
+                logger.error(_msg)
+        return results
+
+    # Webhook Handler (WebhookDispatcher)
+    async def handle_changes(self, changes):
+        if changes.dtable_uuid != self.client.dtable_uuid:
+            return
+        if self.table_names and changes.table_name not in self.table_names:
+            return
+        await self.publish_table(table_name=changes.table_name)
+
+    # Run Forever
+    async def run(self, interval: float = CDC_INTERVAL):
+        while True:
+            _ = await self.publish()
+            await asyncio.sleep(interval)
@@ -0,0 +1,189 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import List
+
+import asyncpg
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateColumn, CreateTable
+
+from ..client.base import BaseClient
+from ..const import TZ
+from ..serde import ToPostgres
+
+logger = logging.getLogger()
+
+PAGE_SIZE = 10000
+STAGING_TABLE = "_plantable_staging"
+
+DIALECT = postgresql.dialect()
+
+
+################################################################
+# PostgresSink
+################################################################
+class PostgresSink:
+    """
+    SeaTable table을 Postgres table로 bulk load (schema는 ToPostgres.schema() 사용).
+     - table이 없으면 생성, 새 column은 ADD COLUMN으로 추가 (column 삭제, type 변경은 하지 않음)
+     - page 단위로 binary COPY하여 임시 staging table에 쌓은 다음 INSERT ... ON CONFLICT (_id)로 한 번에 merge
+     - incremental이면 target의 max(_mtime) 이후 변경된 row만 읽고, 그 이후 삭제된 row는 target에서도 삭제
+    """
+
+    def __init__(self, dsn: str = None, pool: asyncpg.Pool = None, schema: str = "public", **pool_kwargs):
+        self.dsn = dsn
+        self.pool = pool
+        self.schema = schema
+        self.pool_kwargs = pool_kwargs
+
+        self.preparer = DIALECT.identifier_preparer
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    # Open Pool
+    async def open(self):
+        if self.pool is None:
+            self.pool = await asyncpg.create_pool(dsn=self.dsn, **self.pool_kwargs)
+        return self.pool
+
+    # Close Pool
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    # Generate Target Table
+    async def generate_table(self, client: BaseClient, table_name: str):
+        deserializer = await client.get_deserializer(table_name=table_name, Deserializer=ToPostgres)
+        table = deserializer.schema().to_metadata(sa.MetaData(), schema=self.schema)
+        return deserializer, table
+
+    # Create or Migrate Target Table
+    async def migrate(self, conn: asyncpg.Connection, table: sa.Table) -> List[str]:
+        existing = await conn.fetch(
+            "SELECT column_name FROM information_schema.columns WHERE table_schema = $1 AND table_name = $2",
+            table.schema,
+            table.name,
+        )
+        if not existing:
+            await conn.execute(f"CREATE SCHEMA IF NOT EXISTS {self.preparer.quote_schema(table.schema)}")
+            await conn.execute(str(CreateTable(table).compile(dialect=DIALECT)))
+            _msg = f"table '{self.preparer.format_table(table)}' created."
+            logger.info(_msg)
+            return [c.name for c in table.columns]
+
+        existing = set([r["column_name"] for r in existing])
+        added = list()
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = CreateColumn(column).compile(dialect=DIALECT)
+            await conn.execute(f"ALTER TABLE {self.preparer.format_table(table)} ADD COLUMN {ddl}")
+            added.append(column.name)
+        if added:
+            _msg = f"columns {added} added to '{self.preparer.format_table(table)}'."
+            logger.info(_msg)
+        return added
+
+    # Get Watermark
+    async def get_watermark(self, conn: asyncpg.Connection, table: sa.Table) -> datetime:
+        return await conn.fetchval(f'SELECT max("_mtime") FROM {self.preparer.format_table(table)}')
+
+    # Load Table
+    # [NOTE] staging table은 transaction이 끝나면 없어짐 - merge 전까지 target에는 lock을 잡지 않음
+    async def load_table(
+        self,
+        client: BaseClient,
+        table_name: str,
+        incremental: bool = True,
+        page_size: int = PAGE_SIZE,
+    ):
+        started_at = datetime.now(TZ)
+        await self.open()
+
+        deserializer, table = await self.generate_table(client=client, table_name=table_name)
+        target = self.preparer.format_table(table)
+        columns = [c.name for c in table.columns]
+        quoted = [self.preparer.quote(c) for c in columns]
+        updates = [f"{c} = EXCLUDED.{c}" for c in quoted if c != self.preparer.quote("_id")]
+
+        async with self.pool.acquire() as conn:
+            await self.migrate(conn=conn, table=table)
+            watermark = await self.get_watermark(conn=conn, table=table) if incremental else None
+
+            async with conn.transaction():
+                await conn.execute(
+                    f"CREATE TEMP TABLE {STAGING_TABLE} (LIKE {target} INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+
+                # copy pages into staging table
+                num_rows = 0
+                async for rows in client.iter_table(
+                    table_name=table_name, modified_after=watermark, page_size=page_size, deserializer=deserializer
+                ):
+                    records = [tuple([row.get(c) for c in columns]) for row in rows]
+                    await conn.copy_records_to_table(STAGING_TABLE, records=records, columns=columns)
+                    num_rows += len(records)
+
+                # merge - _mtime이 같은 row는 다시 쓰지 않음
+                status = await conn.execute(
+                    f"INSERT INTO {target} AS t ({', '.join(quoted)}) SELECT {', '.join(quoted)} FROM {STAGING_TABLE} "
+                    f"ON CONFLICT (\"_id\") DO UPDATE SET {', '.join(updates)} "
+                    f'WHERE t."_mtime" IS DISTINCT FROM EXCLUDED."_mtime"'
+                )
+                merged = int(status.split()[-1])
+
+                # delete
+                if watermark is None:
+                    status = await conn.execute(
+                        f"DELETE FROM {target} t WHERE NOT EXISTS "
+                        f'(SELECT 1 FROM {STAGING_TABLE} s WHERE s."_id" = t."_id")'
+                    )
+                else:
+                    row_ids = await client.list_deleted_row_ids_since(table_name=table_name, op_time=watermark)
+                    status = await conn.execute(f'DELETE FROM {target} WHERE "_id" = ANY($1::text[])', row_ids)
+                deleted = int(status.split()[-1])
+
+            last_mtime = await self.get_watermark(conn=conn, table=table)
+
+        _msg = f"loaded '{table_name}' into '{target}' - {num_rows} rows read, {merged} merged, {deleted} deleted."
+        logger.info(_msg)
+
+        return {
+            "table": target,
+            "mode": "incremental" if watermark else "full",
+            "rows": num_rows,
+            "merged": merged,
+            "deleted": deleted,
+            "watermark": last_mtime,
+            "elapsed": (datetime.now(TZ) - started_at).total_seconds(),
+        }
+
+    # Load Base
+    async def load_base(
+        self,
+        client: BaseClient,
+        table_names: List[str] = None,
+        incremental: bool = True,
+        page_size: int = PAGE_SIZE,
+        max_concurrency: int = 4,
+    ):
+        if table_names is None:
+            table_names = [table.name for table in await client.list_tables()]
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def load(table_name):
+            async with semaphore:
+                return await self.load_table(
+                    client=client, table_name=table_name, incremental=incremental, page_size=page_size
+                )
+
+        results = await asyncio.gather(*[load(table_name) for table_name in table_names])
+        return dict(zip(table_names, results))
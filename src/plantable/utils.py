@@ -1,5 +1,10 @@
 from datetime import datetime
+from functools import lru_cache
+from typing import List
+
+import orjson
 import sqlparse
+from pydantic import BaseModel
 
 from .const import DT_FMT, TZ
 
@@ -67,3 +72,137 @@ def extract_columns_from_select(sql):
             elif token.ttype is sqlparse.tokens.Keyword and token.value.upper() == "FROM":
                 break
     return columns
+
+
+# Parsed Query
+class ParsedQuery(BaseModel):
+    table_name: str
+    columns: List[str]  # 비어 있으면 전체 column
+    wildcard: bool = False
+    select_from: str  # SELECT ... FROM ...
+    where: str = None  # WHERE 조건 (WHERE 제외)
+    tail: str = None  # GROUP BY, ORDER BY 등 WHERE 다음 (LIMIT 전까지)
+    limit: int = None
+    offset: int = None
+    distinct: bool = False
+    group_by: bool = False
+    order_by: bool = False
+
+    # LIMIT, OFFSET만 바꾼 SQL
+    def render(self, limit: int, offset: int = None) -> str:
+        sql = " ".join([x for x in [self.select_from, f"WHERE {self.where}" if self.where else None, self.tail] if x])
+        sql = f"{sql} LIMIT {limit}"
+        if offset:
+            sql = f"{sql} OFFSET {offset}"
+        return sql
+
+    # _id keyset pagination SQL - WHERE에 `_id` 조건을 추가하고 _id 순서로 정렬
+    def render_keyset(self, limit: int, last_row_id: str = None) -> str:
+        conditions = [f"({self.where})" if self.where else None, f"`_id` > '{last_row_id}'" if last_row_id else None]
+        conditions = [x for x in conditions if x]
+        sql = " ".join(
+            [x for x in [self.select_from, f"WHERE {' AND '.join(conditions)}" if conditions else None] if x]
+        )
+        return f"{sql} ORDER BY `_id` ASC LIMIT {limit}"
+
+
+# parse query
+# [NOTE] 같은 SQL을 반복해서 parse하지 않도록 cache - 결과는 수정하지 말 것
+@lru_cache(maxsize=256)
+def parse_query(sql: str) -> ParsedQuery:
+    statement = sqlparse.parse(sql.strip().rstrip(";"))[0]
+
+    table_name, columns, wildcard = None, list(), False
+    select_from, where, tail, limit, offset = list(), None, list(), None, None
+    distinct = group_by = order_by = False
+
+    stage = "select"
+    tokens = [token for token in statement.tokens if not token.is_whitespace]
+    for i, token in enumerate(tokens):
+        keyword = token.value.upper() if token.ttype in (sqlparse.tokens.Keyword, sqlparse.tokens.DML) else None
+        if keyword == "LIMIT":
+            stage = "limit"
+            continue
+        if stage == "limit":
+            if isinstance(token, sqlparse.sql.IdentifierList):
+                # LIMIT offset, limit
+                offset, limit = [int(str(x)) for x in token.get_identifiers()]
+            elif keyword == "OFFSET":
+                offset = int(str(tokens[i + 1]))
+                break
+            elif token.ttype in sqlparse.tokens.Number:
+                limit = int(str(token))
+            continue
+        if isinstance(token, sqlparse.sql.Where):
+            where = str(token)[len("WHERE") :].strip()
+            stage = "tail"
+            continue
+        if stage == "select":
+            select_from.append(str(token))
+            if keyword == "DISTINCT":
+                distinct = True
+            elif keyword == "FROM":
+                stage = "from"
+            elif token.ttype is sqlparse.tokens.Wildcard:
+                wildcard = True
+            elif isinstance(token, sqlparse.sql.IdentifierList):
+                columns += [x.get_real_name() for x in token.get_identifiers()]
+            elif isinstance(token, sqlparse.sql.Identifier):
+                columns.append(token.get_real_name())
+            continue
+        if stage == "from" and table_name is None and not keyword:
+            select_from.append(str(token))
+            if isinstance(token, sqlparse.sql.IdentifierList):
+                token = list(token.get_identifiers())[0]
+            table_name = token.get_real_name()
+            continue
+        if keyword == "GROUP BY":
+            group_by = True
+        if keyword == "ORDER BY":
+            order_by = True
+        tail.append(str(token))
+
+    if table_name is None:
+        _msg = f"no table name found '{sql}'!"
+        raise NoTableName(_msg)
+
+    return ParsedQuery(
+        table_name=table_name,
+        columns=columns,
+        wildcard=wildcard,
+        select_from=" ".join(select_from),
+        where=where or None,
+        tail=" ".join(tail) or None,
+        limit=limit,
+        offset=offset,
+        distinct=distinct,
+        group_by=group_by,
+        order_by=order_by,
+    )
+
+
+# Extract Deleted Row IDs from Delete Operation Log
+# [NOTE] delete_row는 row 하나, delete_rows는 여러 row - detail 형식이 버전마다 달라 가능한 key 모두 확인
+def extract_deleted_row_ids(log: dict) -> List[str]:
+    detail = log.get("detail") or log.get("op_detail") or {}
+    if isinstance(detail, str):
+        try:
+            detail = orjson.loads(detail)
+        except orjson.JSONDecodeError:
+            detail = {}
+    if log.get("row_id"):
+        return [log["row_id"]]
+    if log.get("row_ids"):
+        return log["row_ids"]
+    if isinstance(detail, dict):
+        if detail.get("row_ids"):
+            return detail["row_ids"]
+        if detail.get("row_id"):
+            return [detail["row_id"]]
+        if detail.get("_id"):
+            return [detail["_id"]]
+        if detail.get("rows"):
+            return [r["_id"] for r in detail["rows"] if "_id" in r]
+    if isinstance(detail, list):
+        return [r["_id"] for r in detail if isinstance(r, dict) and "_id" in r]
+    return []
@@ -0,0 +1,85 @@
+import pytest
+
+from plantable.client import BaseClient
+from plantable.model import Metadata
+
+
+def column(key, name, type, data=None):
+    return {"key": key, "name": name, "type": type, "width": 100, "editable": True, "resizable": True, "data": data}
+
+
+METADATA = {
+    "version": 1,
+    "format_version": 1,
+    "tables": [
+        {
+            "_id": "0000",
+            "name": "t",
+            "columns": [
+                column("0000", "Name", "text"),
+                column("0001", "Num", "number", {"enable_precision": True, "precision": 0}),
+                column("0002", "Tags", "multiple-select", {"options": [{"name": "a"}, {"name": "b"}]}),
+            ],
+            "views": [],
+        }
+    ],
+}
+
+
+def make_rows(n):
+    return [
+        {
+            "_id": f"id{i:06d}",
+            "Name": f"n{i}",
+            "Num": i,
+            "Tags": ["a"],
+            "_mtime": "2023-01-02T00:00:00.000+00:00",
+            "_ctime": "2023-01-01T00:00:00.000+00:00",
+        }
+        for i in range(n)
+    ]
+
+
+class FakeBaseClient(BaseClient):
+    """
+    network 없이 동작하는 BaseClient - list_rows_with_sql은 _id keyset 조건과 LIMIT만 해석
+    """
+
+    def __init__(self, rows=None, deleted_row_ids=None):
+        self.group_name = None
+        self.base_name = "base"
+        self.dtable_uuid = "uuid"
+        self.cache = None
+        self.metadata = Metadata(**METADATA)
+        self.rows = rows or list()
+        self.deleted_row_ids = deleted_row_ids or list()
+        self.sqls = list()
+
+    async def get_metadata(self, refresh: bool = True):
+        return self.metadata
+
+    async def list_collaborators(self, refresh: bool = True):
+        return list()
+
+    async def list_rows_with_sql(self, sql, convert_keys: bool = True):
+        sql = str(sql)
+        self.sqls.append(sql)
+        rows = self.rows
+        if "`_id`>'" in sql:
+            last_row_id = sql.split("`_id`>'")[1].split("'")[0]
+            rows = [r for r in rows if r["_id"] > last_row_id]
+        limit = int(sql.split("LIMIT ")[1].split()[0]) if "LIMIT " in sql else 100
+        return [dict(r) for r in rows[:limit]]
+
+    async def list_delete_operation_logs_since(self, op_type: str, op_time):
+        if op_type != "delete_rows" or not self.deleted_row_ids:
+            return list()
+        return [{"op_type": op_type, "table_id": "0000", "row_ids": self.deleted_row_ids}]
+
+    async def get_last_mtime(self, table_name: str):
+        return None
+
+
+@pytest.fixture
+def metadata():
+    return Metadata(**METADATA)
@@ -0,0 +1,66 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from plantable.client.base.builtin import BaseTokenSession
+from plantable.model import BaseToken
+
+from .conftest import FakeBaseClient
+
+
+def base_token(access_token, generated_at):
+    return BaseToken(
+        access_token=access_token,
+        dtable_uuid="uuid",
+        dtable_server="http://127.0.0.1/",
+        dtable_socket="http://127.0.0.1/",
+        generated_at=generated_at,
+    )
+
+
+class TokenBaseClient(FakeBaseClient):
+    def __init__(self, generated_at):
+        super().__init__()
+        self.seatable_url = "http://127.0.0.1"
+        self.headers = {"accept": "application/json"}
+        self._session = None
+        self._token_lock = None
+        self.workspace_id = None
+        self.api_token = "api-token"
+        self.access_token_refresh_sec = 60
+        self.base_token = base_token("old", generated_at)
+        self.refreshed = 0
+
+    def update_base_token(self):
+        raise AssertionError("blocking token refresh")
+
+    async def refresh_base_token(self):
+        self.refreshed += 1
+        await asyncio.sleep(0.01)
+        self.base_token = base_token("new", datetime.now())
+
+
+def test_expired_base_token_is_refreshed_once_without_blocking():
+    async def run():
+        client = TokenBaseClient(generated_at=datetime.now() - timedelta(seconds=120))
+
+        async def open_session():
+            async with client.session_maker() as session:
+                return session.headers["authorization"]
+
+        assert isinstance(client.session_maker(), BaseTokenSession)
+        headers = await asyncio.gather(*[open_session() for _ in range(3)])
+
+        assert client.refreshed == 1
+        assert headers == ["Bearer new"] * 3
+
+    asyncio.run(run())
+
+
+def test_valid_base_token_is_not_refreshed():
+    async def run():
+        client = TokenBaseClient(generated_at=datetime.now())
+        async with client.session_maker() as session:
+            assert session.headers["authorization"] == "Bearer old"
+        assert client.refreshed == 0
+
+    asyncio.run(run())
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from plantable.client.base.buffer import BufferedBaseClient, RowWriteBuffer
+from plantable.serde import FromPython
+
+from .conftest import FakeBaseClient
+
+
+class BatchBaseClient(FakeBaseClient):
+    """
+    batch write 호출을 기록 - fail이면 모든 batch 호출이 실패
+    """
+
+    def __init__(self, fail: bool = False):
+        super().__init__()
+        self.fail = fail
+        self.calls = list()
+
+    def _record(self, method, value):
+        self.calls.append((method, value))
+        if self.fail:
+            raise RuntimeError(f"{method} failed")
+
+    async def append_rows(self, table_name, rows, **kwargs):
+        self._record("append_rows", rows)
+        return {"row_ids": [f"new{i}" for i in range(len(rows))]}
+
+    async def update_rows(self, table_name, updates, **kwargs):
+        self._record("update_rows", updates)
+        return {"updated_rows": len(updates)}
+
+    async def delete_rows(self, table_name, row_ids, **kwargs):
+        self._record("delete_rows", row_ids)
+        return {"deleted_rows": len(row_ids)}
+
+
+class BufferedBatchBaseClient(BufferedBaseClient, BatchBaseClient):
+    pass
+
+
+def test_size_triggered_flush_issues_one_batch():
+    async def run():
+        client = BatchBaseClient()
+        buffer = RowWriteBuffer(client=client, table_name="t", max_size=3, flush_interval=60)
+
+        futures = [buffer.add_row({"Name": f"n{i}"}) for i in range(3)]
+        results = await asyncio.wait_for(asyncio.gather(*futures), timeout=1)
+
+        assert client.calls == [("append_rows", [{"Name": "n0"}, {"Name": "n1"}, {"Name": "n2"}])]
+        assert [r["_id"] for r in results] == ["new0", "new1", "new2"]
+        assert len(buffer) == 0
+
+    asyncio.run(run())
+
+
+def test_timer_triggered_flush():
+    async def run():
+        client = BatchBaseClient()
+        buffer = RowWriteBuffer(client=client, table_name="t", max_size=100, flush_interval=0.01)
+
+        future = buffer.delete_row("r1")
+        await asyncio.sleep(0)
+        assert client.calls == []
+
+        assert await asyncio.wait_for(future, timeout=1) == {"deleted_rows": 1}
+        assert client.calls == [("delete_rows", ["r1"])]
+
+    asyncio.run(run())
+
+
+def test_updates_to_same_row_are_merged_and_flushed_in_order():
+    async def run():
+        client = BatchBaseClient()
+        buffer = RowWriteBuffer(client=client, table_name="t", max_size=100, flush_interval=60)
+
+        futures = [
+            buffer.delete_row("r2"),
+            buffer.update_row("r1", {"Name": "x"}),
+            buffer.update_row("r1", {"Num": 1}),
+            buffer.add_row({"Name": "y"}),
+        ]
+        await buffer.flush()
+
+        assert await asyncio.gather(*futures) == [{"deleted_rows": 1}, True, True, {"Name": "y", "_id": "new0"}]
+        assert client.calls == [
+            ("append_rows", [{"Name": "y"}]),
+            ("update_rows", [{"row_id": "r1", "row": {"Name": "x", "Num": 1}}]),
+            ("delete_rows", ["r2"]),
+        ]
+
+    asyncio.run(run())
+
+
+def test_failing_batch_sets_exception_on_every_future():
+    async def run():
+        client = BatchBaseClient(fail=True)
+        buffer = RowWriteBuffer(client=client, table_name="t", max_size=100, flush_interval=60)
+
+        appends = [buffer.add_row({"Name": "a"}), buffer.add_row({"Name": "b"})]
+        updates = [buffer.update_row("r1", {"Name": "x"}), buffer.update_row("r1", {"Num": 1})]
+        await buffer.flush()
+
+        for future in [*appends, *updates]:
+            with pytest.raises(RuntimeError):
+                await future
+
+    asyncio.run(run())
+
+
+def test_buffered_add_row_returns_add_row_shape(metadata):
+    async def run():
+        async with BufferedBatchBaseClient(max_size=2, flush_interval=60) as client:
+            rows = [{"Name": "a", "Num": 3, "Tags": ["a"]}, {"Name": "b"}]
+            results = await asyncio.gather(*[client.add_row(table_name="t", row=row) for row in rows])
+
+        # add_row는 server가 돌려준 serialize된 row + _id를 반환
+        serializer = FromPython(metadata.tables[0])
+        assert results == [{**serializer(row), "_id": f"new{i}"} for i, row in enumerate(rows)]
+        assert [method for method, _ in client.calls] == ["append_rows"]
+
+    asyncio.run(run())
@@ -0,0 +1,69 @@
+import asyncio
+import io
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from plantable.const import TZ
+from plantable.server.dataset import TOMBSTONE_SCHEMA, arrow_to_parquet, compact_dataset
+from plantable.server.destination import MemoryDestination
+
+PREFIX = "dataset/dev/w/b/t"
+
+
+def at(hour):
+    return TZ.localize(datetime(2024, 1, 1, hour))
+
+
+def rows_to_parquet(rows, schema=None):
+    return arrow_to_parquet(pa.Table.from_pylist(rows, schema=schema))
+
+
+def test_compact_dataset_unifies_schemas_and_applies_tombstones():
+    async def run():
+        destination = MemoryDestination(name="test-compact")
+        partition = f"{PREFIX}/mtime_date=2024-01-01"
+
+        # 두 번째 파일에는 나중에 추가된 column 'Extra'가 있음
+        await destination.put(
+            key=f"{partition}/part-1.parquet",
+            content=rows_to_parquet(
+                [
+                    {"_id": "a", "Name": "a1", "_mtime": at(1)},
+                    {"_id": "b", "Name": "b1", "_mtime": at(1)},
+                    {"_id": "c", "Name": "c1", "_mtime": at(1)},
+                ]
+            ),
+        )
+        await destination.put(
+            key=f"{partition}/part-2.parquet",
+            content=rows_to_parquet(
+                [
+                    {"_id": "a", "Name": "a2", "Extra": 1, "_mtime": at(2)},
+                    {"_id": "c", "Name": "c2", "Extra": 2, "_mtime": at(5)},
+                ]
+            ),
+        )
+
+        # b는 마지막 수정 이후 삭제, c는 삭제된 다음 다시 수정됨
+        tombstone = {"op_type": "delete_row", "log": "{}"}
+        for i, (row_id, hour) in enumerate([("b", 3), ("c", 4)]):
+            await destination.put(
+                key=f"{PREFIX}/_tombstones/part-{i}.parquet",
+                content=rows_to_parquet([{"_id": row_id, "op_time": at(hour), **tombstone}], schema=TOMBSTONE_SCHEMA),
+            )
+
+        results = await compact_dataset(destination=destination, prefix=PREFIX)
+
+        compacted = results["compacted"][partition]
+        assert (compacted["files"], compacted["rows"]) == (2, 2)
+        tbl = pq.read_table(io.BytesIO(await destination.get(compacted["key"])))
+        assert sorted(tbl.column_names) == ["Extra", "Name", "_id", "_mtime"]
+        assert sorted((r["_id"], r["Name"], r["Extra"]) for r in tbl.to_pylist()) == [("a", "a2", 1), ("c", "c2", 2)]
+
+        # tombstone 파일은 합쳐지기만 하고 남아 있음
+        assert results["compacted"][f"{PREFIX}/_tombstones"]["rows"] == 2
+        assert len(await destination.list(prefix=partition)) == 1
+
+    asyncio.run(run())
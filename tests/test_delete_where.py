@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from .conftest import FakeBaseClient, make_rows
+
+
+class DeletingBaseClient(FakeBaseClient):
+    """
+    `Name` IN (...) 조건만 해석하고 delete_rows는 기록만 함
+    """
+
+    def __init__(self, rows):
+        super().__init__(rows=rows)
+        self.deleted = list()
+
+    async def list_rows_with_sql(self, sql, convert_keys: bool = True):
+        rows = await super().list_rows_with_sql(sql, convert_keys=convert_keys)
+        sql = str(sql)
+        if "`Name` IN (" in sql:
+            names = [v.strip("'") for v in sql.split("`Name` IN (")[1].split(")")[0].split(",")]
+            rows = [r for r in rows if r["Name"] in names]
+        return rows
+
+    async def delete_rows(self, table_name, row_ids, max_concurrency: int = 4):
+        self.deleted += row_ids
+        return {"deleted_rows": len(row_ids)}
+
+
+@pytest.mark.parametrize("where", [None, {}, "", {"Name": {"not_in": []}}])
+def test_delete_where_without_condition_raises(where):
+    client = DeletingBaseClient(rows=make_rows(5))
+
+    with pytest.raises(ValueError):
+        asyncio.run(client.delete_where(table_name="t", where=where))
+    assert client.deleted == []
+
+
+def test_delete_where_deletes_only_matching_rows():
+    client = DeletingBaseClient(rows=make_rows(5))
+
+    results = asyncio.run(client.delete_where(table_name="t", where={"Name": ["n1", "n3"]}))
+
+    assert results == {"deleted_rows": 2}
+    assert client.deleted == ["id000001", "id000003"]
+
+
+def test_delete_where_allow_all():
+    client = DeletingBaseClient(rows=make_rows(5))
+
+    results = asyncio.run(client.delete_where(table_name="t", where=None, allow_all=True))
+
+    assert results == {"deleted_rows": 5}
@@ -0,0 +1,16 @@
+import asyncio
+
+from .conftest import FakeBaseClient
+
+
+class CountingBaseClient(FakeBaseClient):
+    async def list_rows_with_sql(self, sql, convert_keys: bool = True):
+        self.sqls.append(str(sql))
+        return [{"COUNT(*)": 3}]
+
+
+def test_count_rows_quotes_table_name():
+    client = CountingBaseClient()
+
+    assert asyncio.run(client.count_rows(table_name="주문 목록-2024")) == 3
+    assert client.sqls == ["SELECT COUNT(*) FROM `주문 목록-2024`;"]
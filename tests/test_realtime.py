@@ -0,0 +1,108 @@
+import asyncio
+
+import socketio
+from aiohttp import web
+
+from plantable.model import BaseToken
+from plantable.realtime import JOIN_ROOM, KIND_METADATA, KIND_ROW, UPDATE_DTABLE, RealtimeListener
+
+from .conftest import FakeBaseClient
+
+OPERATIONS = [
+    {"op_type": "modify_row", "table_id": "0000", "row_id": "r1", "updated": {"0000": "renamed"}},
+    {"op_type": "insert_column", "table_id": "0000"},
+]
+
+
+class RealtimeBaseClient(FakeBaseClient):
+    def __init__(self, dtable_socket):
+        super().__init__()
+        self.api_token = None
+        self.base_token = BaseToken(
+            access_token="access-token", dtable_uuid="uuid", dtable_server=dtable_socket, dtable_socket=dtable_socket
+        )
+        self.views = dict()
+        self.select_options = dict()
+        self.row_id_map = {"t": {"Name": {"n0": "r0"}, "Num": {0: "r0"}}}
+        self.refreshed = 0
+        self._metadata = self.metadata
+
+    async def get_metadata(self, refresh: bool = True):
+        if refresh:
+            self.refreshed += 1
+            self.metadata = self._metadata
+        return self.metadata
+
+
+# [NOTE] python-socketio 4.x의 AsyncServer.emit은 python 3.11에서 동작하지 않음 - _emit_internal로 보냄
+async def start_server(joined):
+    sio = socketio.AsyncServer(async_mode="aiohttp")
+
+    @sio.on(JOIN_ROOM)
+    async def join_room(sid, dtable_uuid, access_token):
+        joined.append((dtable_uuid, access_token))
+        for operation in OPERATIONS:
+            await sio._emit_internal(sid, UPDATE_DTABLE, operation, "/")
+
+    app = web.Application()
+    sio.attach(app)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+
+    return runner, f"http://{host}:{port}/"
+
+
+def test_realtime_listener_invalidates_metadata_and_row_ids():
+    async def run():
+        joined = list()
+        runner, url = await start_server(joined)
+        client = RealtimeBaseClient(dtable_socket=url)
+        listener = RealtimeListener(client=client)
+
+        events = list()
+
+        async def collect():
+            async for event in listener.subscribe():
+                events.append(event)
+
+        task = asyncio.ensure_future(collect())
+        try:
+            await asyncio.sleep(0)
+            await listener.connect(timeout=5)
+            for _ in range(100):
+                if len(events) == len(OPERATIONS) and listener.refresh_task and listener.refresh_task.done():
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            await listener.close()
+            await asyncio.wait_for(task, timeout=5)
+            await runner.cleanup()
+
+        assert joined == [("uuid", "access-token")]
+        assert [(e.kind, e.table_name, e.row_ids) for e in events] == [
+            (KIND_ROW, "t", ["r1"]),
+            (KIND_METADATA, "t", []),
+        ]
+        # key column 'Name'의 값이 바뀐 경우만 해당 row id map을 버림
+        assert client.row_id_map == {"t": {"Num": {0: "r0"}}}
+        assert client.refreshed == 1
+        assert client.metadata is not None
+
+    asyncio.run(run())
+
+
+def test_close_with_full_subscriber_queue():
+    async def run():
+        listener = RealtimeListener(client=RealtimeBaseClient(dtable_socket="http://127.0.0.1/"), queue_size=1)
+        queue = asyncio.Queue(maxsize=1)
+        queue.put_nowait("event")
+        listener.subscribers.add(queue)
+
+        await listener.close()
+
+        assert queue.get_nowait() is None
+
+    asyncio.run(run())
@@ -0,0 +1,81 @@
+import asyncio
+from types import SimpleNamespace
+
+import aiohttp
+
+from plantable.server.job import FAILED, job_queue
+from plantable.server.registry import ClientRegistry, client_registry
+
+
+class FakeClient:
+    def __init__(self):
+        self.closed = 0
+
+    async def close_session(self, delay: float = 0):
+        self.closed += 1
+
+
+def test_evicted_client_closes_after_last_lease():
+    async def run():
+        registry = ClientRegistry()
+        client = FakeClient()
+        registry.clients["key"] = (client, None)
+
+        async with registry.lease(client):
+            registry.acquire(client)
+            await registry.invalidate("key")
+            await asyncio.sleep(0)
+            assert client.closed == 0
+        await asyncio.sleep(0)
+        assert client.closed == 0
+
+        registry.release(client)
+        await asyncio.sleep(0)
+        assert client.closed == 1
+        assert not registry.leases and not registry.retired
+
+    asyncio.run(run())
+
+
+def test_job_invalidates_client_on_401():
+    async def run():
+        client = FakeClient()
+        client_registry.clients["key"] = (client, None)
+
+        async def func(job):
+            raise aiohttp.ClientResponseError(request_info=SimpleNamespace(real_url="/"), history=(), status=401)
+
+        job = job_queue.submit(key=("test", "401"), func=func, client=client)
+        assert client_registry.leases[id(client)] == 1
+        await job_queue.tasks[job.id]
+
+        assert job.status == FAILED
+        assert "key" not in client_registry.clients
+        assert not client_registry.leases
+        await asyncio.sleep(0)
+        assert client.closed == 1
+
+    asyncio.run(run())
+
+
+def test_jobs_are_scoped_to_owner():
+    async def run():
+        client, other = FakeClient(), FakeClient()
+        client_registry.clients["owner"] = (client, None)
+        client_registry.clients["other"] = (other, None)
+
+        async def func(job):
+            return "ok"
+
+        job = job_queue.submit(key=("test", "owner"), func=func, client=client)
+        await job_queue.tasks[job.id]
+
+        assert job_queue.get(job.id, owner="owner") is job
+        assert job_queue.get(job.id, owner="other") is None
+        assert job in job_queue.list_jobs(owner="owner")
+        assert job not in job_queue.list_jobs(owner="other")
+
+        await client_registry.invalidate("owner", delay=0)
+        await client_registry.invalidate("other", delay=0)
+
+    asyncio.run(run())
@@ -0,0 +1,61 @@
+import asyncio
+
+from plantable.cache import TieredCache
+
+from .conftest import FakeBaseClient, make_rows
+
+
+class UpsertBaseClient(FakeBaseClient):
+    """
+    read_table 횟수를 세고 update_rows, append_rows는 기록만 함
+    """
+
+    def __init__(self, rows, cache):
+        super().__init__(rows=rows)
+        self.cache = cache
+        self.row_id_map = dict()
+        self.reads = 0
+        self.updates, self.appends = list(), list()
+
+    async def read_table(self, table_name, select=None, **kwargs):
+        self.reads += 1
+        return [{k: r[k] for k in select} for r in self.rows]
+
+    async def update_rows(self, table_name, updates, **kwargs):
+        self.updates += updates
+        return {"updated_rows": len(updates)}
+
+    async def append_rows(self, table_name, rows, **kwargs):
+        self.appends += rows
+        return {"appended_rows": len(rows)}
+
+
+def test_row_id_map_is_shared_through_cache():
+    async def run():
+        cache = TieredCache()
+        worker, other = UpsertBaseClient(make_rows(3), cache), UpsertBaseClient(make_rows(3), cache)
+
+        _ = await worker.get_row_id_map(table_name="t", key_column="Name")
+        row_ids = await other.get_row_id_map(table_name="t", key_column="Name", refresh=False)
+
+        assert row_ids == {"n0": "id000000", "n1": "id000001", "n2": "id000002"}
+        assert (worker.reads, other.reads) == (1, 0)
+
+    asyncio.run(run())
+
+
+def test_upsert_reads_row_ids_only_on_cache_miss():
+    async def run():
+        client = UpsertBaseClient(make_rows(3), TieredCache())
+
+        _ = await client.upsert_rows(table_name="t", rows=[{"Name": "n1", "Num": 10}])
+        _ = await client.upsert_rows(table_name="t", rows=[{"Name": "n2", "Num": 20}])
+        assert client.reads == 1
+        assert [u["row_id"] for u in client.updates] == ["id000001", "id000002"]
+
+        # cache에 없는 key는 다시 읽어서 확인한 다음 append
+        _ = await client.upsert_rows(table_name="t", rows=[{"Name": "new", "Num": 30}])
+        assert client.reads == 2
+        assert client.appends == [{"Name": "new", "Num": 30}]
+
+    asyncio.run(run())
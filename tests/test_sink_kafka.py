@@ -0,0 +1,65 @@
+import asyncio
+import io
+
+import fastavro
+import orjson
+
+from plantable.serde import ToPython
+from plantable.sink import CDCPublisher
+from plantable.sink.kafka import AvroSerializer, generate_avro_header
+
+from .conftest import FakeBaseClient, make_rows
+
+
+class FakeProducer:
+    def __init__(self):
+        self.messages = list()
+
+    async def send(self, topic, value=None, key=None, headers=None):
+        self.messages.append({"topic": topic, "key": key, "value": value, "headers": dict(headers)})
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(len(self.messages))
+        return future
+
+
+def test_avro_single_object_header():
+    # Avro spec - "null" schema의 CRC-64-AVRO fingerprint는 8a 8f 25 cc e7 24 dd 63 순서로 기록
+    header = generate_avro_header(fastavro.parse_schema("null"))
+    assert header == b"\xc3\x01" + bytes([0x8A, 0x8F, 0x25, 0xCC, 0xE7, 0x24, 0xDD, 0x63])
+
+
+def test_publish_json_upserts_and_tombstones():
+    client = FakeBaseClient(rows=make_rows(25), deleted_row_ids=["gone1", "gone2"])
+    producer = FakeProducer()
+    publisher = CDCPublisher(client=client, producer=producer, format="json", page_size=10)
+
+    results = asyncio.run(publisher.publish())
+
+    assert results["t"]["upserts"] == 25
+    upserts = [m for m in producer.messages if m["headers"]["op"] == b"upsert"]
+    assert [m["key"] for m in upserts] == [f"id{i:06d}".encode() for i in range(25)]
+    assert orjson.loads(upserts[0]["value"])["Name"] == "n0"
+    assert all(m["topic"] == "plantable.uuid.0000" for m in producer.messages)
+
+    # 처음 snapshot에는 delete log를 읽지 않음 - 다음 publish부터 tombstone
+    assert results["t"]["deletes"] == 0
+    results = asyncio.run(publisher.publish())
+    tombstones = [m for m in producer.messages if m["headers"]["op"] == b"delete"]
+    assert results["t"]["deletes"] == 2
+    assert [m["key"] for m in tombstones] == [b"gone1", b"gone2"]
+    assert all(m["value"] is None for m in tombstones)
+
+
+def test_publish_avro_round_trip():
+    client = FakeBaseClient(rows=make_rows(3))
+    producer = FakeProducer()
+    publisher = CDCPublisher(client=client, producer=producer, format="avro")
+
+    _ = asyncio.run(publisher.publish())
+
+    serializer = AvroSerializer(ToPython(metadata=client.metadata, table_name="t"))
+    value = producer.messages[0]["value"]
+    assert value[:10] == serializer.header
+    row = fastavro.schemaless_reader(io.BytesIO(value[10:]), serializer.parsed_schema)
+    assert row["_id"] == "id000000"
+    assert row["Name"] == "n0"
@@ -0,0 +1,12 @@
+import asyncio
+
+from .conftest import FakeBaseClient, make_rows
+
+
+def test_snapshot_base_reads_whole_table_by_keyset():
+    client = FakeBaseClient(rows=make_rows(25))
+
+    snapshot = asyncio.run(client.snapshot_base())
+
+    assert [row["_id"] for row in snapshot["tables"]["t"]] == [f"id{i:06d}" for i in range(25)]
+    assert client.sqls == ["SELECT * FROM `t` ORDER BY `_id` ASC LIMIT 10000"]
@@ -0,0 +1,65 @@
+import asyncio
+
+import orjson
+from cryptography.fernet import Fernet
+
+from plantable.cache import TieredCache
+from plantable.server.webhook import Subscription, SubscriptionStore
+
+
+class FakeRedisCache:
+    def __init__(self):
+        self.store = dict()
+
+    async def get(self, key):
+        value = self.store.get(key, (None, None))[0]
+        return orjson.loads(value) if value is not None else None
+
+    async def set(self, key, value, ttl=None):
+        self.store[key] = (orjson.dumps(value), ttl)
+
+    async def delete(self, key):
+        self.store.pop(key, None)
+
+
+SUBSCRIPTION = Subscription(dtable_uuid="uuid", workspace_name="w", base_name="b", api_token="secret-api-token")
+
+
+def test_subscriptions_are_shared_encrypted_with_ttl():
+    async def run():
+        key = Fernet.generate_key().decode()
+        remote = FakeRedisCache()
+        store = SubscriptionStore(TieredCache(remote=remote), key=key, ttl=60)
+        other = SubscriptionStore(TieredCache(remote=remote), key=key, ttl=60)
+
+        await store.set(SUBSCRIPTION)
+        value, ttl = remote.store["webhook-subscription:uuid"]
+        assert b"secret-api-token" not in value
+        assert ttl == 60
+        assert await other.get("uuid") == SUBSCRIPTION
+
+        # 다른 key로는 token을 읽을 수 없음
+        assert await SubscriptionStore(TieredCache(remote=remote), key=Fernet.generate_key()).get("uuid") is None
+
+        # unsubscribe
+        assert await other.delete("uuid") == SUBSCRIPTION
+        assert remote.store == {}
+        assert await store.get("uuid") is None
+        assert await store.delete("uuid") is None
+
+    asyncio.run(run())
+
+
+def test_subscriptions_without_key_stay_in_process():
+    async def run():
+        remote = FakeRedisCache()
+        store = SubscriptionStore(TieredCache(remote=remote))
+
+        await store.set(SUBSCRIPTION)
+        assert remote.store == {}
+        assert await store.get("uuid") == SUBSCRIPTION
+
+        assert await store.delete("uuid") == SUBSCRIPTION
+        assert await store.get("uuid") is None
+
+    asyncio.run(run())
@@ -0,0 +1,28 @@
+from pypika import Query, Table
+
+from plantable.client.base.where import WhereCompiler
+
+
+def compile_sql(table, where):
+    return str(Query.from_(Table("t")).select("*").where(WhereCompiler(table)(where)))
+
+
+def test_empty_in_matches_nothing(metadata):
+    table = metadata.tables[0]
+    assert compile_sql(table, {"Name": []}) == 'SELECT * FROM "t" WHERE "Name" IS NULL AND NOT "Name" IS NULL'
+    assert compile_sql(table, {"Tags": {"contains": []}}) == (
+        'SELECT * FROM "t" WHERE "Tags" IS NULL AND NOT "Tags" IS NULL'
+    )
+
+
+def test_empty_not_in_adds_no_condition(metadata):
+    table = metadata.tables[0]
+    assert compile_sql(table, {"Name": {"not_in": []}}) == 'SELECT * FROM "t"'
+    assert compile_sql(table, {"Name": {"not_in": [], "ne": "x"}}) == 'SELECT * FROM "t" WHERE "Name"<>\'x\''
+
+
+def test_contains_escapes_like_wildcards(metadata):
+    table = metadata.tables[0]
+    assert compile_sql(table, {"Name": {"contains": "5%_a\\b"}}) == (
+        'SELECT * FROM "t" WHERE "Name" LIKE \'%5\\%\\_a\\\\b%\''
+    )